@@ -1,8 +1,18 @@
 // ── State ──────────────────────────────────────────────────────────────────
 let sortField = 'date_submitted';
 let sortOrder = 'desc';
+let sortChosen = false;   // until a column header is clicked, searches sort by relevance
 let editingId  = null;
 
+// Log paging — rows are fetched LOG_PAGE_SIZE at a time via the API cursor
+const LOG_PAGE_SIZE = 100;
+const LOG_FIELDS    = ['date_submitted', 'platform', 'client', 'role', 'role_type', 'viewed', 'liked',
+                       'booked', 'project_status', 'pay', 'pay_currency', 'notes'];
+let logCursor  = null;
+let logTotal   = 0;
+let logShown   = 0;
+let logRequest = 0;   // bumps on every fresh load so stale pages are dropped
+
 const filters = { search: '', platform: '', role_type: '', status: '' };
 
 // ── Init ───────────────────────────────────────────────────────────────────
@@ -134,8 +144,11 @@ function renderBreakdownTable(tableId, rows, keyField) {
 }
 
 // ── Log ────────────────────────────────────────────────────────────────────
-async function loadLog() {
-    const params = new URLSearchParams({ sort: sortField, order: sortOrder });
+async function loadLog(append = false) {
+    const sort   = filters.search && !sortChosen ? 'rank' : sortField;
+    const params = new URLSearchParams({
+        sort, order: sortOrder, limit: LOG_PAGE_SIZE, fields: LOG_FIELDS.join(','),
+    });
 
     if (filters.search)    params.set('search',    filters.search);
     if (filters.platform)  params.set('platform',  filters.platform);
@@ -146,20 +159,32 @@ async function loadLog() {
     if (filters.status === 'viewed')    params.set('viewed', '1');
     if (filters.status === 'not-viewed') params.set('viewed', '0');
 
-    const rows = await api(`/api/auditions?${params}`);
-    if (!rows) return;
+    if (append && logCursor) params.set('cursor', logCursor);
+    const request = append ? logRequest : ++logRequest;
+
+    const page = await api(`/api/auditions?${params}`);
+    if (!page || request !== logRequest) return;
 
+    const rows  = page.items;
     const tbody = document.getElementById('log-body');
     const empty = document.getElementById('log-empty');
 
-    if (!rows.length) {
+    logCursor = page.next_cursor;
+    if (!append) {
+        logTotal = page.total;
+        logShown = 0;
         tbody.innerHTML = '';
+    }
+    logShown += rows.length;
+    updateLoadMore();
+
+    if (!logShown) {
         empty.classList.remove('hidden');
         return;
     }
     empty.classList.add('hidden');
 
-    tbody.innerHTML = rows.map(r => `
+    tbody.insertAdjacentHTML('beforeend', rows.map(r => `
         <tr>
             <td>${r.date_submitted ? fmtDate(r.date_submitted) : '—'}</td>
             <td><span class="platform-badge ${r.platform}">${platformLabel(r.platform)}</span></td>
@@ -178,11 +203,19 @@ async function loadLog() {
                 </div>
             </td>
         </tr>
-    `).join('');
+    `).join(''));
+}
+
+function updateLoadMore() {
+    const btn = document.getElementById('log-more');
+    btn.classList.toggle('hidden', !logCursor);
+    btn.textContent = `load more (${logShown} of ${logTotal})`;
 }
 
 // ── Filters ────────────────────────────────────────────────────────────────
 function setupFilters() {
+    document.getElementById('log-more').addEventListener('click', () => loadLog(true));
+
     let searchTimer;
     document.getElementById('filter-search').addEventListener('input', e => {
         clearTimeout(searchTimer);
@@ -204,6 +237,7 @@ function setupSortHeaders() {
     document.querySelectorAll('.log-table th.sortable').forEach(th => {
         th.addEventListener('click', () => {
             const field = th.dataset.sort;
+            sortChosen = true;
             if (sortField === field) {
                 sortOrder = sortOrder === 'asc' ? 'desc' : 'asc';
             } else {
@@ -0,0 +1,349 @@
+"""
+Shared SQLite access for server.py and scraper.py.
+
+Connections come from a small pool: a thread checks one out on its first
+get_db() and hands it back with release_db() (server.py does that when
+each request ends), so the dev server's thread-per-request model reuses
+open, already-configured connections instead of reconnecting every time.
+All are opened in WAL mode so the API can keep reading while the cron
+scraper writes. busy_timeout makes a writer wait for the other one
+instead of failing with "database is locked".
+"""
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+
+DB_PATH = Path(__file__).parent / 'auditions.db'
+
+BUSY_TIMEOUT_MS = 5000
+POOL_SIZE       = 8        # idle connections kept per database; extras are closed on release
+CACHE_SIZE_KB   = 16384    # page cache per connection (negative cache_size = KiB)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS auditions (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    platform      TEXT NOT NULL,
+    external_id   TEXT,
+    project_id    TEXT,
+    date_submitted TEXT,
+    client        TEXT,
+    role          TEXT,
+    role_type     TEXT,
+    viewed        INTEGER DEFAULT 0,
+    liked         INTEGER DEFAULT 0,
+    booked        INTEGER DEFAULT 0,
+    pay           REAL,
+    pay_currency  TEXT DEFAULT 'USD',
+    project_status TEXT,
+    notes         TEXT,
+    created_at    TEXT DEFAULT (datetime('now')),
+    updated_at    TEXT DEFAULT (datetime('now'))
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_platform_external
+    ON auditions(platform, external_id)
+    WHERE external_id IS NOT NULL;
+"""
+
+# Indexes for what the Log tab actually asks for: every sortable column on
+# its own (so an unfiltered, sorted page is an index walk), and each filter
+# paired with the default date sort (so a filtered page is a range search
+# that comes back already ordered). The same indexes cover the filtered
+# COUNT(*). Rows within an index are ordered by id, which is the keyset
+# tie-breaker.
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_auditions_date      ON auditions(date_submitted);
+CREATE INDEX IF NOT EXISTS idx_auditions_client    ON auditions(client);
+CREATE INDEX IF NOT EXISTS idx_auditions_role      ON auditions(role);
+CREATE INDEX IF NOT EXISTS idx_auditions_pay       ON auditions(pay);
+CREATE INDEX IF NOT EXISTS idx_auditions_created   ON auditions(created_at);
+CREATE INDEX IF NOT EXISTS idx_auditions_platform  ON auditions(platform);
+CREATE INDEX IF NOT EXISTS idx_auditions_role_type ON auditions(role_type);
+CREATE INDEX IF NOT EXISTS idx_auditions_platform_date  ON auditions(platform, date_submitted);
+CREATE INDEX IF NOT EXISTS idx_auditions_role_type_date ON auditions(role_type, date_submitted);
+CREATE INDEX IF NOT EXISTS idx_auditions_viewed_date    ON auditions(viewed, date_submitted);
+CREATE INDEX IF NOT EXISTS idx_auditions_liked_date     ON auditions(liked, date_submitted);
+CREATE INDEX IF NOT EXISTS idx_auditions_booked_date    ON auditions(booked, date_submitted);
+"""
+
+# Full-text index over the free-text columns, kept in sync by triggers.
+# External-content table: the text lives only in auditions, the FTS table
+# holds just the index. prefix='2 3' makes short "word*" queries cheap.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS auditions_fts USING fts5(
+    client, role, notes,
+    content='auditions', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS auditions_fts_insert AFTER INSERT ON auditions BEGIN
+    INSERT INTO auditions_fts(rowid, client, role, notes) VALUES (new.id, new.client, new.role, new.notes);
+END;
+CREATE TRIGGER IF NOT EXISTS auditions_fts_delete AFTER DELETE ON auditions BEGIN
+    INSERT INTO auditions_fts(auditions_fts, rowid, client, role, notes)
+        VALUES ('delete', old.id, old.client, old.role, old.notes);
+END;
+CREATE TRIGGER IF NOT EXISTS auditions_fts_update AFTER UPDATE OF client, role, notes ON auditions BEGIN
+    INSERT INTO auditions_fts(auditions_fts, rowid, client, role, notes)
+        VALUES ('delete', old.id, old.client, old.role, old.notes);
+    INSERT INTO auditions_fts(rowid, client, role, notes) VALUES (new.id, new.client, new.role, new.notes);
+END;
+"""
+
+# /api/stats totals, kept per platform × role_type × month by triggers so the
+# dashboard reads a few hundred rollup rows instead of aggregating every
+# audition. Keys are never NULL: role_type NULL is stored as 'unset' (what
+# the stats report it as) and an undated audition's month as ''. Earnings are
+# whole cents so repeated add/subtract can't drift.
+ROLLUP_KEY = [
+    ('platform',  "{r}.platform"),
+    ('role_type', "COALESCE({r}.role_type, 'unset')"),
+    ('month',     "COALESCE(strftime('%Y-%m', {r}.date_submitted), '')"),
+]
+ROLLUP_MEASURES = [
+    ('total',                "1"),
+    ('viewed',               "COALESCE({r}.viewed, 0)"),
+    ('liked',                "COALESCE({r}.liked, 0)"),
+    ('booked',               "COALESCE({r}.booked, 0)"),
+    ('earnings_cents',       "CASE WHEN {r}.booked = 1 THEN CAST(ROUND(COALESCE({r}.pay, 0) * 100) AS INTEGER) ELSE 0 END"),
+    ('active',               "CASE WHEN {r}.booked = 0 AND COALESCE({r}.project_status, 'active') != 'awarded' THEN 1 ELSE 0 END"),
+    ('confirmed_rejections', "CASE WHEN {r}.booked = 0 AND {r}.project_status = 'awarded' THEN 1 ELSE 0 END"),
+]
+_ROLLUP_COLUMNS = ', '.join(col for col, _ in ROLLUP_KEY + ROLLUP_MEASURES)
+
+
+def _rollup_exprs(pairs, r):
+    return ', '.join(expr.format(r=r) for _, expr in pairs)
+
+
+def _rollup_key_match(r):
+    return ' AND '.join(f"{col} = {expr.format(r=r)}" for col, expr in ROLLUP_KEY)
+
+
+_ROLLUP_ADD = f"""
+    INSERT INTO audition_rollups ({_ROLLUP_COLUMNS})
+    SELECT {_rollup_exprs(ROLLUP_KEY + ROLLUP_MEASURES, 'new')} WHERE true
+    ON CONFLICT (platform, role_type, month) DO UPDATE SET
+        {', '.join(f"{col} = {col} + excluded.{col}" for col, _ in ROLLUP_MEASURES)};
+"""
+_ROLLUP_SUBTRACT = f"""
+    UPDATE audition_rollups SET
+        {', '.join(f"{col} = {col} - ({expr.format(r='old')})" for col, expr in ROLLUP_MEASURES)}
+     WHERE {_rollup_key_match('old')};
+    DELETE FROM audition_rollups WHERE {_rollup_key_match('old')} AND total <= 0;
+"""
+ROLLUP_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS audition_rollups (
+    platform             TEXT NOT NULL,
+    role_type            TEXT NOT NULL,
+    month                TEXT NOT NULL,
+    total                INTEGER NOT NULL DEFAULT 0,
+    viewed               INTEGER NOT NULL DEFAULT 0,
+    liked                INTEGER NOT NULL DEFAULT 0,
+    booked               INTEGER NOT NULL DEFAULT 0,
+    earnings_cents       INTEGER NOT NULL DEFAULT 0,
+    active               INTEGER NOT NULL DEFAULT 0,
+    confirmed_rejections INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (platform, role_type, month)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS auditions_rollup_insert AFTER INSERT ON auditions BEGIN
+    {_ROLLUP_ADD}
+END;
+CREATE TRIGGER IF NOT EXISTS auditions_rollup_delete AFTER DELETE ON auditions BEGIN
+    {_ROLLUP_SUBTRACT}
+END;
+CREATE TRIGGER IF NOT EXISTS auditions_rollup_update
+AFTER UPDATE OF platform, role_type, date_submitted, viewed, liked, booked, pay, project_status ON auditions BEGIN
+    {_ROLLUP_SUBTRACT}
+    {_ROLLUP_ADD}
+END;
+"""
+
+# A counter bumped by every change to auditions, whoever makes it (API or
+# scraper). server.py uses it as the cache key / ETag for its responses.
+VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS data_version (
+    id      INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0);
+CREATE TRIGGER IF NOT EXISTS auditions_version_insert AFTER INSERT ON auditions BEGIN
+    UPDATE data_version SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS auditions_version_update AFTER UPDATE ON auditions BEGIN
+    UPDATE data_version SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS auditions_version_delete AFTER DELETE ON auditions BEGIN
+    UPDATE data_version SET version = version + 1;
+END;
+"""
+
+# Where each platform's scraper got to, so a routine run only fetches what's
+# new (see scraper.py).
+SYNC_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_state (
+    platform          TEXT PRIMARY KEY,
+    newest_created_at TEXT,       -- high-water mark: the newest offer already synced
+    newest_offer_id   INTEGER,
+    open_checked_at   TEXT,       -- last run that re-fetched every offer still open
+    pending_since     TEXT,       -- oldest offer seen but not yet submitted (YYYY-MM-DD)
+    resume_page       INTEGER,    -- last page stored by an unfinished full-history walk
+    resume_created_at TEXT,       -- ...and the newest offer that walk has seen
+    resume_offer_id   INTEGER,
+    updated_at        TEXT DEFAULT (datetime('now'))
+);
+"""
+
+_local      = threading.local()   # this thread's checked-out connections, by db path
+_pools      = {}                  # db path -> queue.Queue of idle connections
+_pools_lock = threading.Lock()
+
+
+def connect(path=None):
+    """A new, fully configured connection — use get_db() unless you need your own."""
+    conn = sqlite3.connect(path or DB_PATH, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")          # safe with WAL, fsyncs only at checkpoints
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def _pool(key):
+    with _pools_lock:
+        return _pools.setdefault(key, queue.Queue(maxsize=POOL_SIZE))
+
+
+def get_db(path=None):
+    """
+    This thread's connection to path (default DB_PATH): the same one on
+    every call until release_db(), taken from the pool (or opened) on first
+    use. Don't close it — `with get_db() as conn:` commits or rolls back.
+    """
+    key = db_path(path)
+    conns = getattr(_local, 'conns', None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(key)
+    if conn is None:
+        try:
+            conn = _pool(key).get_nowait()
+        except queue.Empty:
+            conn = connect(key)
+        conns[key] = conn
+    return conn
+
+
+def release_db():
+    """Give this thread's connections back to the pool (end of a request, or a worker finishing)."""
+    for key, conn in getattr(_local, 'conns', {}).items():
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            _pool(key).put_nowait(conn)
+        except queue.Full:
+            conn.close()
+    _local.conns = {}
+
+
+def close_db():
+    """Release this thread's connections and close every pooled one (tests, shutdown)."""
+    release_db()
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def init_db(path=None):
+    """Create the schema and apply column/index migrations — safe to run repeatedly."""
+    conn = get_db(path)
+    with conn:
+        conn.executescript(SCHEMA)
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(auditions)")}
+        for col, defn in [('project_id', 'TEXT'), ('project_status', 'TEXT')]:
+            if col not in cols:
+                conn.execute(f"ALTER TABLE auditions ADD COLUMN {col} {defn}")
+        try:
+            conn.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_platform_project
+                    ON auditions(platform, project_id)
+                    WHERE project_id IS NOT NULL
+            """)
+        except sqlite3.OperationalError:
+            pass  # existing duplicate project rows — scraper dedupes by role instead
+        conn.executescript(INDEXES)
+        _init_fts(conn)
+        _init_rollups(conn)
+        conn.executescript(VERSION_SCHEMA)
+        conn.executescript(SYNC_SCHEMA)
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(sync_state)")}
+        for col, defn in [('resume_page', 'INTEGER'), ('resume_created_at', 'TEXT'), ('resume_offer_id', 'INTEGER')]:
+            if col not in cols:
+                conn.execute(f"ALTER TABLE sync_state ADD COLUMN {col} {defn}")
+    return conn
+
+
+def _init_fts(conn):
+    """Create the FTS index (and index existing rows) if this SQLite has FTS5."""
+    if has_fts(conn):
+        return
+    try:
+        conn.executescript(FTS_SCHEMA)
+    except sqlite3.OperationalError as e:
+        if 'fts5' not in str(e):
+            raise
+        return  # no FTS5 compiled in — search falls back to LIKE
+    conn.execute("INSERT INTO auditions_fts(auditions_fts) VALUES ('rebuild')")
+
+
+def _init_rollups(conn):
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='audition_rollups'"
+    ).fetchone()
+    conn.executescript(ROLLUP_SCHEMA)
+    if not exists:
+        rebuild_rollups(conn)
+
+
+def rebuild_rollups(conn):
+    """Recompute audition_rollups from scratch (first start, or after editing the db by hand)."""
+    keys = _rollup_exprs(ROLLUP_KEY, 'auditions')
+    sums = ', '.join(f"SUM({expr.format(r='auditions')})" for _, expr in ROLLUP_MEASURES)
+    conn.execute("DELETE FROM audition_rollups")
+    conn.execute(f"INSERT INTO audition_rollups ({_ROLLUP_COLUMNS}) SELECT {keys}, {sums} FROM auditions GROUP BY {keys}")
+
+
+def has_fts(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='auditions_fts'"
+    ).fetchone() is not None
+
+
+def get_sync_state(conn, platform):
+    row = conn.execute("SELECT * FROM sync_state WHERE platform = ?", [platform]).fetchone()
+    return dict(row) if row else {}
+
+
+def save_sync_state(conn, platform, **fields):
+    columns = ['platform', *fields]
+    conn.execute(f"""
+        INSERT INTO sync_state ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})
+        ON CONFLICT (platform) DO UPDATE SET
+            {', '.join(f"{col} = excluded.{col}" for col in fields)}, updated_at = datetime('now')
+    """, [platform, *fields.values()])
+
+
+def db_path(path=None):
+    """The key get_db() pools connections under: path, or the current DB_PATH."""
+    return str(path or DB_PATH)
+
+
+def data_version(conn):
+    return conn.execute("SELECT version FROM data_version WHERE id = 1").fetchone()[0]
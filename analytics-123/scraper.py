@@ -9,21 +9,36 @@ Token lasts ~24h. Refresh token lasts ~30 days and is used automatically.
 If both are expired, run auth.py again.
 """
 import base64
+import http.client
+import io
 import json
-import sqlite3
+import math
+import sys
+import threading
 import urllib.error
 import urllib.parse
 import urllib.request
-from datetime import datetime, timezone
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 
-DB_PATH           = Path(__file__).parent / 'auditions.db'
+from db import get_db, get_sync_state, init_db, save_sync_state
+
 LOCALSTORAGE_PATH = Path(__file__).parent / '.v123_localstorage.json'
 
 BASE_API      = 'https://voice123.com/api'
 ACCOUNTS_URL  = 'https://accounts.voice123.com/openid/token'
 OAUTH_CLIENT  = '450535'   # Voice123's OpenID Connect client ID
 PAGE_SIZE     = 50
+HTTP_TIMEOUT  = 30
+
+FETCH_PARALLELISM = 4     # offer pages in flight at once on a full sync (--parallel=N)
+
+OPEN_RECHECK_DAYS  = 30   # offers older than this are treated as settled
+OPEN_REFRESH_HOURS = 24   # how often a run pages back far enough to recheck open offers
 
 CURRENCY_MAP  = {1: 'USD', 2: 'EUR', 3: 'GBP', 4: 'CAD', 5: 'AUD'}
 
@@ -107,7 +122,23 @@ def get_token():
     return token, storage
 
 
-def _do_refresh(storage):
+_refresh_lock = threading.Lock()
+
+
+def _do_refresh(storage, rejected=None):
+    """
+    Swap the refresh token for a new access token and save it. Single
+    flight: when several page fetches get a 401 at once, the first one
+    refreshes and the rest (passing the token that was `rejected`) just
+    pick up the new one.
+    """
+    with _refresh_lock:
+        if rejected and storage.get('auth_token') not in (None, '', rejected):
+            return storage['auth_token']
+        return _refresh_storage(storage)
+
+
+def _refresh_storage(storage):
     rt = storage.get('rt', '')
     if not rt:
         raise SystemExit("No refresh token. Run: python3 auth.py")
@@ -124,22 +155,66 @@ def _do_refresh(storage):
 
 # ── API helpers ───────────────────────────────────────────────────────────────
 
+_API   = urllib.parse.urlsplit(BASE_API)
+_local = threading.local()
+_connections      = {}    # thread ident -> that thread's open connection, so pool shutdown can close them
+_connections_lock = threading.Lock()
+_REDIRECTS = (301, 302, 303, 307, 308)
+
+
+def _connection():
+    """This thread's keep-alive connection to the API host, opened on first use."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = _local.conn = http.client.HTTPSConnection(_API.netloc, timeout=HTTP_TIMEOUT)
+        with _connections_lock:
+            _connections[threading.get_ident()] = conn
+    return conn
+
+
+def _close_connections(threads):
+    """Close the keep-alive connections opened by these threads (finished fetch workers)."""
+    with _connections_lock:
+        conns = [_connections.pop(ident) for ident in threads if ident in _connections]
+    for conn in conns:
+        conn.close()
+
+
+def _get(path, token):
+    """GET on the thread's connection -> (status, reason, headers, body). Reconnects once if it was dropped."""
+    for attempt in range(2):
+        conn = _connection()
+        try:
+            conn.request('GET', path, headers={'Authorization': f'Bearer {token}', 'Accept': 'application/json'})
+            resp = conn.getresponse()
+            return resp.status, resp.reason, resp.headers, resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            _local.conn = None
+            if attempt:
+                raise
+
+
 def api_get(path, token, params=None, storage=None):
-    url = f'{BASE_API}/{path}'
+    url = f'{_API.path}/{path}'
     if params:
         url += '?' + urllib.parse.urlencode(params)
-    req = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
-    try:
-        with urllib.request.urlopen(req) as resp:
-            return json.loads(resp.read())
-    except urllib.error.HTTPError as e:
-        if e.code == 401 and storage is not None:
-            print("[auth] Token rejected (401), attempting refresh...")
-            new_token = _do_refresh(storage)
-            req2 = urllib.request.Request(url, headers={'Authorization': f'Bearer {new_token}'})
-            with urllib.request.urlopen(req2) as resp:
-                return json.loads(resp.read())
-        raise
+    if storage is not None:
+        token = storage.get('auth_token') or token   # another thread may have refreshed it
+    status, reason, headers, body = _get(url, token)
+    if status == 401 and storage is not None:
+        print("[auth] Token rejected (401), attempting refresh...")
+        token = _do_refresh(storage, rejected=token)
+        status, reason, headers, body = _get(url, token)
+    if status in _REDIRECTS and headers.get('Location'):
+        # urllib used to follow these; follow one, as long as it stays on the API host
+        location = urllib.parse.urlsplit(urllib.parse.urljoin(f'{_API.scheme}://{_API.netloc}{url}', headers['Location']))
+        if location.netloc == _API.netloc:
+            url = location.path + (f'?{location.query}' if location.query else '')
+            status, reason, headers, body = _get(url, token)
+    if not 200 <= status < 300:
+        raise urllib.error.HTTPError(f'{BASE_API}/{path}', status, reason, headers, io.BytesIO(body))
+    return json.loads(body)
 
 
 def get_provider_id(token, storage=None):
@@ -163,6 +238,72 @@ def fetch_offers_page(token, provider_id, page, storage=None):
     }, storage=storage)
 
 
+def _page_offers(data):
+    # API may return list or dict with results key
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        return data.get('results') or data.get('items') or data.get('data') or []
+    return None
+
+
+def _total_count(data):
+    if isinstance(data, dict):
+        for key in ('count', 'total', 'total_count'):
+            if isinstance(data.get(key), int):
+                return data[key]
+    return None
+
+
+def iter_offer_pages(token, provider_id, storage=None, parallel=1, start=1):
+    """
+    (page, offers) from page `start` on, in order, until a short page. With
+    parallel > 1, once the first page gives the total count the rest are fetched
+    up to `parallel` at a time, each worker on its own keep-alive
+    connection; only that many pages are ever in flight or held. Stop
+    iterating to stop fetching. A failed fetch raises.
+    """
+    data = fetch_offers_page(token, provider_id, start, storage=storage)
+    offers = _page_offers(data)
+    if offers is None:
+        return
+    yield start, offers
+    if len(offers) < PAGE_SIZE:
+        return
+
+    page = start + 1
+    total = _total_count(data) if parallel > 1 else None
+    if total:
+        last = math.ceil(total / PAGE_SIZE)
+        workers = set()
+        try:
+            with ThreadPoolExecutor(parallel, initializer=lambda: workers.add(threading.get_ident())) as pool:
+                in_flight = deque()
+                while in_flight or page <= last:
+                    while page <= last and len(in_flight) < parallel:
+                        in_flight.append((page, pool.submit(fetch_offers_page, token, provider_id, page, storage=storage)))
+                        page += 1
+                    done, future = in_flight.popleft()
+                    offers = _page_offers(future.result())
+                    if offers is None:
+                        return
+                    yield done, offers
+                    if len(offers) < PAGE_SIZE:
+                        return
+        finally:
+            _close_connections(workers)
+        # The last counted page was full: offers arrived since the first page, carry on one at a time
+
+    while True:
+        offers = _page_offers(fetch_offers_page(token, provider_id, page, storage=storage))
+        if offers is None:
+            return
+        yield page, offers
+        if len(offers) < PAGE_SIZE:
+            return
+        page += 1
+
+
 # ── Parsing ───────────────────────────────────────────────────────────────────
 
 def parse_offer(offer):
@@ -200,132 +341,254 @@ def parse_offer(offer):
 
 # ── Database ──────────────────────────────────────────────────────────────────
 
-def _find_project_dupe(conn, p):
-    """Find an existing row that represents the same Voice123 project."""
-    if p['project_id']:
-        row = conn.execute(
-            "SELECT id FROM auditions WHERE platform='voice123' AND project_id=?",
-            [p['project_id']]
-        ).fetchone()
-        if row:
-            return row
-    # Fallback: match by role name (handles rows created before project_id was stored)
-    if p['role']:
-        return conn.execute(
-            "SELECT id FROM auditions WHERE platform='voice123' AND role=? AND project_id IS NULL",
-            [p['role']]
-        ).fetchone()
-    return None
+# Merges a scraped offer into an existing row: statuses only ever go up, a
+# booked row keeps its pay, and known project details aren't overwritten.
+# {src} is ':' for a named-parameter UPDATE, 'excluded.' for the insert's ON CONFLICT.
+_MERGE_SET = """
+    viewed=MAX(COALESCE(viewed,0), {src}viewed), liked=MAX(COALESCE(liked,0), {src}liked),
+    booked=MAX(COALESCE(booked,0), {src}booked),
+    pay=CASE WHEN booked=1 THEN pay ELSE COALESCE(pay, {src}pay) END,
+    pay_currency=CASE WHEN booked=1 THEN pay_currency ELSE COALESCE(pay_currency, {src}pay_currency) END,
+    project_id=COALESCE(project_id, {src}project_id),
+    role_type=COALESCE(role_type, {src}role_type),
+    project_status=COALESCE({src}project_status, project_status),
+    updated_at=datetime('now')
+"""
+_INSERT_COLUMNS = ('platform', 'external_id', 'project_id', 'date_submitted', 'client', 'role',
+                   'role_type', 'viewed', 'liked', 'booked', 'pay', 'pay_currency', 'project_status')
+
+# Rows we already know are updated by id: an upsert that hits the conflict
+# still uses up an AUTOINCREMENT id. The conflict clause here only guards a
+# batch against an offer that turned up since the prefetch.
+INSERT_SQL = f"""
+    INSERT INTO auditions ({', '.join(_INSERT_COLUMNS)})
+    VALUES ({', '.join(':' + c for c in _INSERT_COLUMNS)})
+    ON CONFLICT (platform, external_id) WHERE external_id IS NOT NULL DO UPDATE SET
+    {_MERGE_SET.format(src='excluded.')}
+"""
+UPDATE_SQL = f"UPDATE auditions SET {_MERGE_SET.format(src=':')} WHERE id=:id"
+
+
+def _voice123_keys(conn):
+    """
+    Every Voice123 row's lookup keys, in one query: external_id -> row,
+    project_id -> row, and role -> rows with no project_id yet (oldest first,
+    for the pre-project_id fallback). unlinked maps those rows to their role;
+    linked is every row that has a project_id.
+    """
+    by_external, by_project, by_role, unlinked, linked = {}, {}, {}, {}, set()
+    for row_id, external_id, project_id, role in conn.execute(
+            "SELECT id, external_id, project_id, role FROM auditions WHERE platform='voice123' ORDER BY id"):
+        if external_id is not None:
+            by_external.setdefault(external_id, row_id)
+        if project_id is not None:
+            by_project.setdefault(project_id, row_id)
+            linked.add(row_id)
+        elif role is not None:
+            by_role.setdefault(role, []).append(row_id)
+            unlinked[row_id] = role
+    return by_external, by_project, by_role, unlinked, linked
+
+
+def _plan_upsert(conn, proposals):
+    """
+    Decide, offer by offer, what the row-at-a-time upsert would have done,
+    using the prefetched keys instead of a SELECT per offer. Returns the
+    operations in order — ('insert', p) for a new offer, ('update', row, p)
+    for one we already have, by external_id or as another offer of the same
+    project — plus the inserted/updated counts. Rows added earlier in the
+    same batch are identified by their external_id (a str) until they have
+    an id.
+    """
+    by_external, by_project, by_role, unlinked, linked = _voice123_keys(conn)
+    ops = []
+    inserted = updated = 0
 
+    for p in proposals:
+        target = by_external.get(p['external_id'])
+        if target is None:
+            # Voice123 creates a separate offer record when you win a booking.
+            # Check if we already have a row for this project before inserting.
+            target = by_project.get(p['project_id']) if p['project_id'] else None
+            if target is None and p['role'] and by_role.get(p['role']):
+                # Fallback: match by role name (rows created before project_id was stored)
+                target = by_role[p['role']][0]
+
+        if target is not None:
+            ops.append(('update', target, p))
+            updated += 1
+            # project_id=COALESCE(project_id, ?) links the row to this project from now on
+            if p['project_id'] and target not in linked:
+                linked.add(target)
+                by_project.setdefault(p['project_id'], target)
+                if target in unlinked:
+                    by_role[unlinked.pop(target)].remove(target)
+        else:
+            target = p['external_id']
+            ops.append(('insert', p))
+            inserted += 1
+            by_external[target] = target
+            if p['project_id']:
+                by_project.setdefault(p['project_id'], target)
+                linked.add(target)
+            elif p['role']:
+                by_role.setdefault(p['role'], []).append(target)
+                unlinked[target] = p['role']
+
+    return ops, inserted, updated
+
+
+def upsert(proposals, progress=None):
+    """
+    Insert new offers and merge updates into existing rows; returns
+    (inserted, updated). One key prefetch, then executemany over runs of
+    inserts and updates, in the offers' order, all in one transaction —
+    along with the Voice123 sync_state fields in `progress`, if given.
+    """
+    conn = get_db()
+    new_ids = {}   # external_id -> id for rows inserted by this call
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")   # nothing else writes between the prefetch and the writes
+        ops, inserted, updated = _plan_upsert(conn, proposals)
+        for kind, run in groupby(ops, key=itemgetter(0)):
+            run = list(run)
+            if kind == 'insert':
+                conn.executemany(INSERT_SQL, [p for _, p in run])
+                continue
+            pending = [row for _, row, _ in run if isinstance(row, str) and row not in new_ids]
+            if pending:
+                new_ids.update(conn.execute(
+                    f"SELECT external_id, id FROM auditions WHERE platform='voice123' "
+                    f"AND external_id IN ({', '.join('?' * len(pending))})", pending))
+            conn.executemany(UPDATE_SQL, [dict(p, id=new_ids.get(row, row)) for _, row, p in run])
+        if progress:
+            save_sync_state(conn, 'voice123', **progress)
+    return inserted, updated
 
-def upsert(proposals):
-    conn = sqlite3.connect(DB_PATH)
-    inserted = updated = 0
+
+# ── Sync ──────────────────────────────────────────────────────────────────────
+
+def _offer_key(offer):
+    """Position in the API's newest-first order, comparable with the stored high-water mark."""
+    return (offer.get('created_at') or '', offer.get('id') or 0)
+
+
+def is_submitted(offer):
+    return bool(offer.get('custom_sample') or offer.get('related_samples')) and offer.get('status') != 'created'
+
+
+def _recheck_cutoff(conn, state, now):
+    """
+    Date (YYYY-MM-DD) back to which offers can still change: the oldest
+    stored audition that isn't booked or rejected, or the oldest offer seen
+    before it was submitted — but nothing older than OPEN_RECHECK_DAYS.
+    None when there's nothing open.
+    """
+    window = (now - timedelta(days=OPEN_RECHECK_DAYS)).strftime('%Y-%m-%d')
+    oldest_open = conn.execute("""
+        SELECT MIN(date_submitted) FROM auditions
+         WHERE platform='voice123' AND booked=0 AND COALESCE(project_status, '') != 'awarded'
+           AND date_submitted >= ?
+    """, [window]).fetchone()[0]
+    candidates = [d for d in (oldest_open, state.get('pending_since')) if d]
+    return max(min(candidates), window) if candidates else None
+
+
+def _pending_dates(offers, window):
+    """Creation dates of offers that aren't submitted yet but still could be."""
+    return [o['created_at'][:10] for o in offers
+            if not is_submitted(o) and (o.get('created_at') or '')[:10] >= window]
+
+
+def sync_offers(token, provider_id, storage=None, full=False, parallel=FETCH_PARALLELISM):
+    """
+    Fetch offers newest first and upsert the submitted ones page by page as
+    they arrive, each page in its own transaction; returns (inserted,
+    updated). After the first run only new offers are fetched: paging
+    stops at the stored high-water mark, which only moves once a run gets
+    through without errors. Once every OPEN_REFRESH_HOURS a run keeps
+    going back to the oldest offer whose status can still change.
+    full=True walks the whole history, `parallel` pages at a time; a walk
+    saves its place with every page, and the next run resumes an
+    interrupted one.
+    """
+    conn   = get_db()
+    now    = datetime.now(timezone.utc)
+    window = (now - timedelta(days=OPEN_RECHECK_DAYS)).strftime('%Y-%m-%d')
+    state  = get_sync_state(conn, 'voice123')
+    mark   = (state['newest_created_at'], state['newest_offer_id']) if state.get('newest_created_at') else None
+
+    start, newest, pending_since, cutoff = 1, mark, None, None
+    checked = state.get('open_checked_at')
+    if state.get('resume_page') and not full:
+        mode  = f"full history, resuming after page {state['resume_page']}"
+        start = state['resume_page'] + 1
+        mark, newest = None, (state['resume_created_at'], state['resume_offer_id'])
+        pending_since = state.get('pending_since')
+    elif full or not mark:
+        mode, mark, newest = 'full history', None, None
+    elif not checked or datetime.fromisoformat(checked) <= now - timedelta(hours=OPEN_REFRESH_HOURS):
+        mode, cutoff = 'new + open', _recheck_cutoff(conn, state, now)
+    else:
+        mode = 'new'
+        pending_since = state.get('pending_since')
+    walk = mark is None
+
+    print(f"[scraper] Fetching offers ({mode})...")
+    inserted = updated = fetched = 0
+    page = start - 1
+    complete = True
+
+    # Incremental runs stop at a page only known once it's read, so they go one page at a time
+    pages = iter_offer_pages(token, provider_id, storage, parallel=parallel if walk else 1, start=start)
     try:
-        for p in proposals:
-            row = conn.execute(
-                "SELECT id FROM auditions WHERE platform='voice123' AND external_id=?",
-                [p['external_id']]
-            ).fetchone()
-            if row:
-                conn.execute("""
-                    UPDATE auditions
-                       SET viewed=MAX(COALESCE(viewed,0), ?), liked=MAX(COALESCE(liked,0), ?),
-                           booked=MAX(COALESCE(booked,0), ?),
-                           pay=CASE WHEN booked=1 THEN pay ELSE COALESCE(pay, ?) END,
-                           pay_currency=CASE WHEN booked=1 THEN pay_currency ELSE COALESCE(pay_currency, ?) END,
-                           project_id=COALESCE(project_id, ?),
-                           role_type=COALESCE(role_type, ?),
-                           project_status=COALESCE(?, project_status),
-                           updated_at=datetime('now')
-                     WHERE id=?
-                """, [p['viewed'], p['liked'], p['booked'], p['pay'], p['pay_currency'],
-                      p['project_id'], p['role_type'], p['project_status'], row[0]])
-                updated += 1
-            else:
-                # Voice123 creates a separate offer record when you win a booking.
-                # Check if we already have a row for this project before inserting.
-                dupe = _find_project_dupe(conn, p)
-                if dupe:
-                    conn.execute("""
-                        UPDATE auditions
-                           SET viewed=MAX(COALESCE(viewed,0), ?), liked=MAX(COALESCE(liked,0), ?),
-                               booked=MAX(COALESCE(booked,0), ?),
-                               pay=CASE WHEN booked=1 THEN pay ELSE COALESCE(pay, ?) END,
-                               pay_currency=CASE WHEN booked=1 THEN pay_currency ELSE COALESCE(pay_currency, ?) END,
-                               project_id=COALESCE(project_id, ?),
-                               role_type=COALESCE(role_type, ?),
-                               project_status=COALESCE(?, project_status),
-                               updated_at=datetime('now')
-                         WHERE id=?
-                    """, [p['viewed'], p['liked'], p['booked'], p['pay'], p['pay_currency'],
-                          p['project_id'], p['role_type'], p['project_status'], dupe[0]])
-                    updated += 1
-                else:
-                    conn.execute("""
-                        INSERT INTO auditions
-                            (platform, external_id, project_id, date_submitted, client, role,
-                             role_type, viewed, liked, booked, pay, pay_currency, project_status)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, [p[k] for k in ('platform', 'external_id', 'project_id', 'date_submitted',
-                                         'client', 'role', 'role_type', 'viewed', 'liked',
-                                         'booked', 'pay', 'pay_currency', 'project_status')])
-                    inserted += 1
-        conn.commit()
+        for page, offers in pages:
+            submitted = [o for o in offers if is_submitted(o)]
+            print(f"  Page {page}: {len(offers)} offers, {len(submitted)} with submitted audio")
+            fetched += len(offers)
+            newest = max([_offer_key(o) for o in offers] + ([newest] if newest else []), default=None)
+            pending_since = min(_pending_dates(offers, window) + ([pending_since] if pending_since else []),
+                                default=None)
+
+            progress = None
+            if walk and newest:
+                progress = {'resume_page': page, 'resume_created_at': newest[0], 'resume_offer_id': newest[1],
+                            'pending_since': pending_since}
+            page_inserted, page_updated = upsert([parse_offer(o) for o in submitted], progress=progress)
+            inserted += page_inserted
+            updated  += page_updated
+
+            oldest = offers[-1] if offers else {}
+            if mark and _offer_key(oldest) <= mark and (not cutoff or (oldest.get('created_at') or '')[:10] < cutoff):
+                break
+    except Exception as e:
+        print(f"  [error] Page {page + 1}: {e}")
+        complete = False
     finally:
-        conn.close()
+        pages.close()
+    print(f"[scraper] {fetched} offers fetched")
+
+    # Only move the mark after a clean run — if a page failed, the next run has to fetch the gap
+    if complete and newest:
+        fields = {'newest_created_at': newest[0], 'newest_offer_id': newest[1], 'pending_since': pending_since}
+        if mode != 'new' and start == 1:
+            # Every offer that could still change was just re-fetched. A resumed
+            # walk skipped the newest pages, so the next run rechecks them.
+            fields['open_checked_at'] = now.isoformat(timespec='seconds')
+        if walk:
+            fields.update(resume_page=None, resume_created_at=None, resume_offer_id=None)
+        with conn:
+            save_sync_state(conn, 'voice123', **fields)
+
     return inserted, updated
 
 
 # ── Main ──────────────────────────────────────────────────────────────────────
 
-TABLE_SCHEMA = """
-CREATE TABLE IF NOT EXISTS auditions (
-    id            INTEGER PRIMARY KEY AUTOINCREMENT,
-    platform      TEXT NOT NULL,
-    external_id   TEXT,
-    project_id    TEXT,
-    date_submitted TEXT,
-    client        TEXT,
-    role          TEXT,
-    role_type     TEXT,
-    viewed        INTEGER DEFAULT 0,
-    liked         INTEGER DEFAULT 0,
-    booked        INTEGER DEFAULT 0,
-    pay           REAL,
-    pay_currency  TEXT DEFAULT 'USD',
-    project_status TEXT,
-    notes         TEXT,
-    created_at    TEXT DEFAULT (datetime('now')),
-    updated_at    TEXT DEFAULT (datetime('now'))
-);
-CREATE UNIQUE INDEX IF NOT EXISTS idx_platform_external
-    ON auditions(platform, external_id)
-    WHERE external_id IS NOT NULL;
-"""
-
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.executescript(TABLE_SCHEMA)
-    cols = {row[1] for row in conn.execute("PRAGMA table_info(auditions)")}
-    if 'project_id' not in cols:
-        conn.execute("ALTER TABLE auditions ADD COLUMN project_id TEXT")
-        conn.commit()
-    if 'project_status' not in cols:
-        conn.execute("ALTER TABLE auditions ADD COLUMN project_status TEXT")
-        conn.commit()
-    try:
-        conn.execute("""
-            CREATE UNIQUE INDEX IF NOT EXISTS idx_platform_project
-                ON auditions(platform, project_id)
-                WHERE project_id IS NOT NULL
-        """)
-        conn.commit()
-    except sqlite3.OperationalError:
-        pass
-    conn.close()
-
 def main():
+    opts = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+    full = '--full' in sys.argv
+    parallel = max(1, int(opts.get('parallel', FETCH_PARALLELISM)))
     init_db()
     token, storage = get_token()
 
@@ -339,38 +602,7 @@ def main():
         print(f"[scraper] Error: {e}")
         return
 
-    print("[scraper] Fetching offers...")
-    all_offers = []
-    page = 1
-
-    while True:
-        try:
-            data = fetch_offers_page(token, provider_id, page, storage=storage)
-        except Exception as e:
-            print(f"  [error] Page {page}: {e}")
-            break
-
-        # API may return list or dict with results key
-        if isinstance(data, list):
-            offers = data
-        elif isinstance(data, dict):
-            offers = data.get('results') or data.get('items') or data.get('data') or []
-        else:
-            break
-
-        print(f"  Page {page}: {len(offers)} offers")
-        all_offers.extend(offers)
-
-        if len(offers) < PAGE_SIZE:
-            break
-        page += 1
-
-    submitted = [o for o in all_offers
-                 if (o.get('custom_sample') or o.get('related_samples'))
-                 and o.get('status') != 'created']
-    print(f"[scraper] {len(all_offers)} total offers, {len(submitted)} with submitted audio")
-    parsed = [parse_offer(o) for o in submitted]
-    inserted, updated = upsert(parsed)
+    inserted, updated = sync_offers(token, provider_id, storage=storage, full=full, parallel=parallel)
     print(f"[scraper] Done — {inserted} new, {updated} updated")
 
 
@@ -1,65 +1,32 @@
 import base64
+import hashlib
 import json
-import sqlite3
+import re
+import threading
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
 from flask import Flask, jsonify, request, send_file, abort
 
+from db import data_version, db_path, get_db, has_fts, init_db, release_db
+
 app = Flask(__name__, static_folder='.', static_url_path='')
-DB_PATH             = Path(__file__).parent / 'auditions.db'
 LOCALSTORAGE_PATH   = Path(__file__).parent / '.v123_localstorage.json'
 
-SCHEMA = """
-CREATE TABLE IF NOT EXISTS auditions (
-    id            INTEGER PRIMARY KEY AUTOINCREMENT,
-    platform      TEXT NOT NULL,
-    external_id   TEXT,
-    project_id    TEXT,
-    date_submitted TEXT,
-    client        TEXT,
-    role          TEXT,
-    role_type     TEXT,
-    viewed        INTEGER DEFAULT 0,
-    liked         INTEGER DEFAULT 0,
-    booked        INTEGER DEFAULT 0,
-    pay           REAL,
-    pay_currency  TEXT DEFAULT 'USD',
-    project_status TEXT,
-    notes         TEXT,
-    created_at    TEXT DEFAULT (datetime('now')),
-    updated_at    TEXT DEFAULT (datetime('now'))
-);
-CREATE UNIQUE INDEX IF NOT EXISTS idx_platform_external
-    ON auditions(platform, external_id)
-    WHERE external_id IS NOT NULL;
-"""
-
 VALID_SORTS = {'date_submitted', 'client', 'role', 'role_type', 'platform', 'pay', 'created_at'}
 FIELDS = ['platform', 'external_id', 'project_id', 'date_submitted', 'client', 'role',
           'role_type', 'viewed', 'liked', 'booked', 'pay', 'pay_currency', 'project_status', 'notes']
+COLUMNS = {'id', 'created_at', 'updated_at', *FIELDS}
+MAX_PAGE_SIZE = 500
+RESPONSE_CACHE_SIZE = 64   # serialized GET responses kept, least recently used dropped first
 
-
-def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+_cache_lock      = threading.Lock()
+_response_cache  = OrderedDict()   # (db path, data version, request key) -> JSON body
 
 
-def init_db():
-    with get_db() as conn:
-        conn.executescript(SCHEMA)
-        cols = {row[1] for row in conn.execute("PRAGMA table_info(auditions)")}
-        for col, defn in [('project_id', 'TEXT'), ('project_status', 'TEXT')]:
-            if col not in cols:
-                conn.execute(f"ALTER TABLE auditions ADD COLUMN {col} {defn}")
-        try:
-            conn.execute("""
-                CREATE UNIQUE INDEX IF NOT EXISTS idx_platform_project
-                    ON auditions(platform, project_id)
-                    WHERE project_id IS NOT NULL
-            """)
-        except Exception:
-            pass
+@app.teardown_request
+def _release_db(exc):
+    release_db()
 
 
 @app.route('/')
@@ -67,46 +34,219 @@ def index():
     return send_file('index.html')
 
 
-@app.route('/api/auditions', methods=['GET'])
-def list_auditions():
-    platform  = request.args.get('platform')
-    role_type = request.args.get('role_type')
-    viewed    = request.args.get('viewed')
-    liked     = request.args.get('liked')
-    booked    = request.args.get('booked')
-    search    = request.args.get('search', '')
-    sort_field = request.args.get('sort', 'date_submitted')
-    sort_order = request.args.get('order', 'desc')
+def _fts_match(search):
+    """User text -> FTS5 MATCH expression: every word must match, as a prefix."""
+    return ' '.join(f'"{token}"*' for token in re.findall(r'\w+', search.lower()))
 
-    if sort_field not in VALID_SORTS:
-        sort_field = 'date_submitted'
-    if sort_order not in ('asc', 'desc'):
-        sort_order = 'desc'
 
-    query  = "SELECT * FROM auditions WHERE 1=1"
+def _audition_query(args, conn):
+    """
+    (FROM source, WHERE clause, params) for the list filters in args. A
+    search goes through the auditions_fts index when there is one — joined
+    in as `fts`, with its bm25 score as fts.rank — and falls back to a LIKE
+    scan otherwise.
+    """
+    source = "auditions"
+    where  = ["1=1"]
     params = []
 
-    if platform:
-        query += " AND platform = ?"; params.append(platform)
-    if role_type:
-        query += " AND role_type = ?"; params.append(role_type)
-    if viewed is not None and viewed != '':
-        query += " AND viewed = ?"; params.append(1 if viewed == '1' else 0)
-    if liked is not None and liked != '':
-        query += " AND liked = ?";  params.append(1 if liked == '1' else 0)
-    if booked is not None and booked != '':
-        query += " AND booked = ?"; params.append(1 if booked == '1' else 0)
-    if search:
-        query += " AND (client LIKE ? OR role LIKE ? OR notes LIKE ?)"
+    platform  = args.get('platform')
+    role_type = args.get('role_type')
+    search    = args.get('search', '')
+
+    match = _fts_match(search) if search else ''
+    if match and has_fts(conn):
+        source = ("auditions JOIN (SELECT rowid AS fts_id, bm25(auditions_fts) AS rank FROM auditions_fts "
+                  "WHERE auditions_fts MATCH ?) AS fts ON fts.fts_id = auditions.id")
+        params.append(match)
+    elif search:
+        where.append("(client LIKE ? OR role LIKE ? OR notes LIKE ?)")
         like = f'%{search}%'
         params.extend([like, like, like])
 
-    query += f" ORDER BY COALESCE({sort_field}, '') {sort_order.upper()}"
+    if platform:
+        where.append("platform = ?"); params.append(platform)
+    if role_type:
+        where.append("role_type = ?"); params.append(role_type)
+    for flag in ('viewed', 'liked', 'booked'):
+        value = args.get(flag)
+        if value is not None and value != '':
+            where.append(f"{flag} = ?"); params.append(1 if value == '1' else 0)
+
+    return source, ' AND '.join(where), params
+
+
+def _encode_cursor(sort_key, row_id):
+    raw = json.dumps([sort_key, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_key, row_id = json.loads(raw)
+        if not isinstance(row_id, int) or not isinstance(sort_key, (str, int, float, type(None))):
+            raise ValueError
+        return sort_key, row_id
+    except (ValueError, TypeError):
+        abort(400)
 
+
+def _sort_spec(args, source):
+    """(sort column, 'asc'/'desc', nullable) for the request's sort/order."""
+    sort_field = args.get('sort', 'date_submitted')
+    sort_order = args.get('order', 'desc')
+    if sort_order not in ('asc', 'desc'):
+        sort_order = 'desc'
+
+    if sort_field == 'rank' and args.get('search'):
+        # bm25: lower is more relevant. Without the FTS index, rank is meaningless.
+        return ('fts.rank' if source != 'auditions' else 'id'), 'asc', False
+    if sort_field not in VALID_SORTS:
+        sort_field = 'date_submitted'
+    return sort_field, sort_order, sort_field != 'platform'   # platform is NOT NULL
+
+
+def _page_statements(columns, source, where, params, sort_spec, limit, cursor=None):
+    """
+    The (sql, params) statements for one page, to be run in order until
+    limit + 1 rows have come back.
+
+    Sorting is on the bare column (not COALESCE(col, '')) so it can walk an
+    index, and the cursor is a row-value seek (col, id) < (?, ?) — a range
+    search, not a scan. NULLs never compare, so they're paged as their own
+    segment: first in ascending order, last in descending, ordered by id.
+    """
+    sort_key, sort_order, nullable = sort_spec
+    op        = '<' if sort_order == 'desc' else '>'
+    direction = sort_order.upper()
+    select    = f"SELECT {columns}, {sort_key} AS _sort_key FROM {source} WHERE {where}"
+
+    segments = [('values', f"{sort_key} IS NOT NULL" if nullable else "1=1",
+                 f"{sort_key} {direction}, id {direction}")]
+    if nullable:
+        nulls = ('nulls', f"{sort_key} IS NULL", f"id {direction}")
+        segments = [nulls] + segments if sort_order == 'asc' else segments + [nulls]
+
+    if cursor:
+        after_key, after_id = cursor
+        names = [name for name, _, _ in segments]
+        start = 'nulls' if after_key is None else 'values'
+        segments = segments[names.index(start):] if start in names else []
+    statements = []
+    for i, (name, segment_where, order_by) in enumerate(segments):
+        segment_params = []
+        if cursor and i == 0:
+            if name == 'nulls':
+                segment_where += f" AND id {op} ?"
+                segment_params = [after_id]
+            else:
+                segment_where += f" AND ({sort_key}, id) {op} (?, ?)"
+                segment_params = [after_key, after_id]
+        statements.append((f"{select} AND {segment_where} ORDER BY {order_by} LIMIT ?",
+                           params + segment_params + [limit + 1]))
+    return statements
+
+
+def _data_version():
+    """(db path, data_version): one primary-key read, so every response is checked against the live data."""
     with get_db() as conn:
-        rows = conn.execute(query, params).fetchall()
+        return db_path(), data_version(conn)
+
+
+def _cached_json(build, *key):
+    """
+    JSON response for build(), cached per data version, with a strong ETag
+    for that version + key. A matching If-None-Match gets a 304 after just
+    the version read; an unchanged version is served from the cache without
+    running build().
+    """
+    path, version = _data_version()
+    cache_key = (path, version) + key
+    etag = hashlib.sha1(repr(cache_key).encode()).hexdigest()[:20]
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    with _cache_lock:
+        body = _response_cache.get(cache_key)
+        if body is not None:
+            _response_cache.move_to_end(cache_key)
+
+    response_etag = etag
+    if body is None:
+        body = jsonify(build()).get_data()
+        if _data_version()[1] == version:
+            with _cache_lock:
+                _response_cache[cache_key] = body
+                while len(_response_cache) > RESPONSE_CACHE_SIZE:
+                    _response_cache.popitem(last=False)
+        else:
+            response_etag = None  # data changed mid-build; don't label it with either version
+
+    response = app.response_class(body, mimetype='application/json')
+    if response_etag:
+        response.set_etag(response_etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/api/auditions', methods=['GET'])
+def list_auditions():
+    return _cached_json(lambda: _list_auditions(request.args),
+                        'auditions', tuple(sorted(request.args.items(multi=True))))
+
+
+def _list_auditions(args):
+    """
+    Without `limit`: every matching row as a JSON array (the original API).
+    With `limit`: one page, {items, next_cursor, total} — pass next_cursor
+    back as `cursor` for the following page. Pages are keyed on the sort
+    column plus id, so each one is an index seek rather than an OFFSET
+    scan. total is only counted for the first page (no cursor), null after.
+    `fields=a,b,c` limits the columns returned (id is always included).
+    `sort=rank` (with `search`) orders by full-text relevance, best first.
+    """
+    columns = 'auditions.*'
+    if args.get('fields'):
+        wanted = [f for f in args['fields'].split(',') if f in COLUMNS]
+        columns = ', '.join(['id'] + [f for f in wanted if f != 'id'])
+
+    conn = get_db()
+    source, where, params = _audition_query(args, conn)
+    sort_spec = _sort_spec(args, source)
+
+    if 'limit' not in args:
+        sort_key, sort_order, _ = sort_spec
+        direction = sort_order.upper()
+        query = f"SELECT {columns} FROM {source} WHERE {where} ORDER BY {sort_key} {direction}, id {direction}"
+        with conn:
+            rows = conn.execute(query, params).fetchall()
+        return [dict(r) for r in rows]
+
+    try:
+        limit = max(1, min(int(args['limit']), MAX_PAGE_SIZE))
+    except ValueError:
+        abort(400)
+    cursor = _decode_cursor(args['cursor']) if args.get('cursor') else None
 
-    return jsonify([dict(r) for r in rows])
+    rows = []
+    with conn:
+        for sql, sql_params in _page_statements(columns, source, where, params, sort_spec, limit, cursor):
+            rows += conn.execute(sql, sql_params).fetchall()
+            if len(rows) > limit:
+                break
+        total = None if cursor else conn.execute(f"SELECT COUNT(*) FROM {source} WHERE {where}", params).fetchone()[0]
+
+    items = [dict(r) for r in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = _encode_cursor(items[-1]['_sort_key'], items[-1]['id'])
+    for item in items:
+        del item['_sort_key']
+
+    return {'items': items, 'next_cursor': next_cursor, 'total': total}
 
 
 @app.route('/api/auditions', methods=['POST'])
@@ -151,49 +291,63 @@ def delete_audition(audition_id):
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
+    # The windowed stats are relative to SQLite's date('now') (UTC), so the day is part of the key
+    return _cached_json(_stats, 'stats', datetime.now(timezone.utc).date().isoformat())
+
+
+def _stats():
+    # Everything except the date-relative bits comes from audition_rollups
+    # (see db.py), so this costs the same however many auditions there are.
     with get_db() as conn:
         totals = conn.execute("""
             SELECT
-                COUNT(*)                                         AS all_count,
-                SUM(viewed)                                      AS viewed,
-                SUM(liked)                                       AS liked,
-                SUM(booked)                                      AS booked,
-                COALESCE(SUM(CASE WHEN booked=1 THEN pay END),0) AS earnings,
-                SUM(CASE WHEN booked=0 AND COALESCE(project_status,'active') != 'awarded'
-                         THEN 1 ELSE 0 END)                      AS active,
-                SUM(CASE WHEN booked=0 AND project_status = 'awarded'
-                         THEN 1 ELSE 0 END)                      AS confirmed_rejections
-            FROM auditions
+                SUM(total)                            AS all_count,
+                SUM(viewed)                           AS viewed,
+                SUM(liked)                            AS liked,
+                SUM(booked)                           AS booked,
+                COALESCE(SUM(earnings_cents), 0) / 100.0 AS earnings,
+                SUM(active)                           AS active,
+                SUM(confirmed_rejections)             AS confirmed_rejections
+            FROM audition_rollups
         """).fetchone()
 
         by_platform = conn.execute("""
             SELECT platform,
-                COUNT(*)                                         AS total,
-                SUM(viewed)                                      AS viewed,
-                SUM(liked)                                       AS liked,
-                SUM(booked)                                      AS booked,
-                COALESCE(SUM(CASE WHEN booked=1 THEN pay END),0) AS earnings
-            FROM auditions GROUP BY platform ORDER BY total DESC
+                SUM(total)                            AS total,
+                SUM(viewed)                           AS viewed,
+                SUM(liked)                            AS liked,
+                SUM(booked)                           AS booked,
+                COALESCE(SUM(earnings_cents), 0) / 100.0 AS earnings
+            FROM audition_rollups GROUP BY platform ORDER BY total DESC
         """).fetchall()
 
         by_role_type = conn.execute("""
-            SELECT COALESCE(role_type,'unset') AS role_type,
-                COUNT(*)                                         AS total,
-                SUM(viewed)                                      AS viewed,
-                SUM(liked)                                       AS liked,
-                SUM(booked)                                      AS booked,
-                COALESCE(SUM(CASE WHEN booked=1 THEN pay END),0) AS earnings
-            FROM auditions GROUP BY role_type ORDER BY total DESC
+            SELECT role_type,
+                SUM(total)                            AS total,
+                SUM(viewed)                           AS viewed,
+                SUM(liked)                            AS liked,
+                SUM(booked)                           AS booked,
+                COALESCE(SUM(earnings_cents), 0) / 100.0 AS earnings
+            FROM audition_rollups GROUP BY role_type ORDER BY total DESC
         """).fetchall()
 
+        # Whole months after the 12-month cutoff come from the rollups; the
+        # cutoff month itself only counts from the cutoff day, so that one
+        # is a short range search on idx_auditions_date.
         by_month = conn.execute("""
+            SELECT month, SUM(total) AS total, SUM(booked) AS booked
+            FROM audition_rollups
+            WHERE month > strftime('%Y-%m', date('now', '-12 months'))
+            GROUP BY month
+            UNION ALL
             SELECT strftime('%Y-%m', date_submitted) AS month,
                 COUNT(*)   AS total,
                 SUM(booked) AS booked
             FROM auditions
-            WHERE date_submitted IS NOT NULL
-              AND date_submitted >= date('now', '-12 months')
-            GROUP BY month ORDER BY month
+            WHERE date_submitted >= date('now', '-12 months')
+              AND date_submitted <  date('now', '-12 months', 'start of month', '+1 month')
+            GROUP BY month
+            ORDER BY month
         """).fetchall()
 
         recent = conn.execute("""
@@ -210,7 +364,7 @@ def get_stats():
     booked  = t['booked']    or 0
     earnings = round(t['earnings'] or 0, 2)
 
-    return jsonify({
+    return {
         'totals': {
             'all':      total,
             'viewed':   viewed,
@@ -236,7 +390,7 @@ def get_stats():
         'by_role_type': [dict(r) for r in by_role_type],
         'by_month':     [dict(r) for r in by_month],
         'recent_30d':   dict(recent) if recent else {'total': 0, 'booked': 0},
-    })
+    }
 
 
 def _token_expiry():
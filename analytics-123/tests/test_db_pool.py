@@ -0,0 +1,74 @@
+"""
+Connection pooling: the dev server runs every request on a new thread, so
+connections must go back to the pool when a request ends and be reused by
+the next one, not opened (and leaked) per thread.
+"""
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+import server
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_path, self.original_connect = db.DB_PATH, db.connect
+        db.DB_PATH = os.path.join(self.tmp.name, 'auditions.db')
+        db.init_db()
+        db.release_db()
+
+        self.opened = []
+
+        def counting_connect(path=None):
+            conn = self.original_connect(path)
+            self.opened.append(conn)
+            return conn
+        db.connect = counting_connect
+
+    def tearDown(self):
+        db.connect = self.original_connect
+        db.DB_PATH = self.original_path
+        db.close_db()
+        self.tmp.cleanup()
+
+    def request_on_new_thread(self, url, results):
+        def run():
+            results.append(server.app.test_client().get(url).status_code)
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread
+
+    def test_sequential_requests_reuse_one_connection(self):
+        results = []
+        for url in ['/api/stats', '/api/auditions', '/api/auditions?limit=5'] * 4:
+            self.request_on_new_thread(url, results).join()
+        self.assertEqual(results, [200] * 12)
+        self.assertEqual(self.opened, [])   # the connection init_db opened is the one reused
+
+    def test_concurrent_requests_stay_within_the_pool(self):
+        results = []
+        for _ in range(5):
+            threads = [self.request_on_new_thread('/api/auditions?sort=client', results) for _ in range(6)]
+            for thread in threads:
+                thread.join()
+        self.assertEqual(results, [200] * 30)
+        self.assertLessEqual(len(self.opened), 6)
+        self.assertLessEqual(db._pool(str(db.DB_PATH)).qsize(), db.POOL_SIZE)
+
+    def test_release_rolls_back_an_open_transaction(self):
+        conn = db.get_db()
+        conn.execute("INSERT INTO auditions (platform) VALUES ('acx')")
+        db.release_db()
+        self.assertIs(db.get_db(), conn)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM auditions").fetchone()[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
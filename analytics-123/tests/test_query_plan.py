@@ -0,0 +1,97 @@
+"""
+Query-plan checks for the Log tab's audition queries: every common
+filter/sort page must be answered from an index — no full table scan and no
+temp b-tree sort.
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+import server
+
+# What app.js sends: each sortable column with no filter, and each filter with the default sort
+SORTS   = ['date_submitted', 'platform', 'client', 'role', 'role_type', 'pay', 'created_at']
+FILTERS = [{}, {'platform': 'acx'}, {'role_type': 'narration'},
+           {'viewed': '1'}, {'viewed': '0'}, {'liked': '1'}, {'booked': '1'}]
+
+
+class TestAuditionQueryPlans(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.conn = db.init_db(os.path.join(cls.tmp.name, 'auditions.db'))
+        with cls.conn:
+            cls.conn.executemany(
+                "INSERT INTO auditions (platform, date_submitted, client, role, role_type, viewed, liked, booked, pay) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(['voice123', 'acx', 'ccc'][i % 3], None if i % 11 == 0 else f'2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}',
+                  None if i % 4 else f'client {i}', f'role {i}', [None, 'narration', 'character'][i % 3],
+                  i % 2, i % 5 == 0, i % 17 == 0, 100.0 if i % 17 == 0 else None)
+                 for i in range(500)]
+            )
+
+    @classmethod
+    def tearDownClass(cls):
+        db.close_db()
+        cls.tmp.cleanup()
+
+    def plan(self, sql, params):
+        return [row[3] for row in self.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+    def assert_indexed(self, sql, params):
+        plan = self.plan(sql, params)
+        for step in plan:
+            self.assertNotEqual(step, 'SCAN auditions', f"full scan: {sql}\n{plan}")
+            self.assertNotIn('TEMP B-TREE', step, f"sort not from an index: {sql}\n{plan}")
+
+    def statements(self, args, cursor=None):
+        source, where, params = server._audition_query(args, self.conn)
+        spec = server._sort_spec(args, source)
+        return server._page_statements('auditions.*', source, where, params, spec, 100, cursor)
+
+    def test_sorted_pages_use_an_index(self):
+        for sort in SORTS:
+            for order in ('asc', 'desc'):
+                args = {'sort': sort, 'order': order}
+                for cursor in (None, ('x', 250), (None, 250)):
+                    for sql, params in self.statements(args, cursor):
+                        self.assert_indexed(sql, params)
+
+    def test_filtered_pages_use_an_index(self):
+        for filters in FILTERS:
+            for cursor in (None, ('2025-06-01', 250), (None, 250)):
+                for sql, params in self.statements(dict(filters), cursor):
+                    self.assert_indexed(sql, params)
+
+            source, where, params = server._audition_query(filters, self.conn)
+            self.assert_indexed(f"SELECT COUNT(*) FROM {source} WHERE {where}", params)
+
+    def test_keyset_pages_match_full_ordering(self):
+        """Walking the cursor over NULL and non-NULL sort values visits every row once, in order."""
+        client = server.app.test_client()
+        original = db.DB_PATH
+        db.DB_PATH = os.path.join(self.tmp.name, 'auditions.db')
+        try:
+            for sort in ('client', 'pay', 'date_submitted'):
+                for order in ('asc', 'desc'):
+                    base = f'/api/auditions?sort={sort}&order={order}'
+                    expected = [r['id'] for r in client.get(base).get_json()]
+                    seen, cursor = [], None
+                    while True:
+                        page = client.get(f'{base}&limit=37' + (f'&cursor={cursor}' if cursor else '')).get_json()
+                        seen += [r['id'] for r in page['items']]
+                        cursor = page['next_cursor']
+                        if not cursor:
+                            break
+                    self.assertEqual(seen, expected, (sort, order))
+        finally:
+            db.DB_PATH = original
+
+
+if __name__ == '__main__':
+    unittest.main()
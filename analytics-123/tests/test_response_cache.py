@@ -0,0 +1,112 @@
+"""
+ETag / 304 and the per-data-version response cache: unchanged data is
+answered without re-running the query, and any write — through the API or
+straight into the db like the scraper does — changes the version.
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+import server
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original = db.DB_PATH
+        db.DB_PATH = os.path.join(self.tmp.name, 'auditions.db')
+        db.init_db()
+        self.client = server.app.test_client()
+
+    def tearDown(self):
+        db.DB_PATH = self.original
+        db.close_db()
+        self.tmp.cleanup()
+
+    def add(self, **fields):
+        fields.setdefault('platform', 'acx')
+        return self.client.post('/api/auditions', json=fields).get_json()
+
+    def test_unchanged_data_is_a_304(self):
+        self.add(client='a')
+        for url in ('/api/stats', '/api/auditions', '/api/auditions?limit=5&fields=client'):
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, 200)
+            etag = first.headers['ETag']
+            again = self.client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(again.status_code, 304, url)
+            self.assertEqual(again.headers['ETag'], etag)
+
+    def test_etag_differs_per_query(self):
+        self.add(client='a')
+        etags = {self.client.get(url).headers['ETag']
+                 for url in ('/api/stats', '/api/auditions', '/api/auditions?sort=client')}
+        self.assertEqual(len(etags), 3)
+
+    def test_unchanged_data_is_not_requeried(self):
+        self.add(client='a')
+        first = self.client.get('/api/auditions')
+        etag = first.headers['ETag']
+
+        build = server._list_auditions
+        server._list_auditions = lambda *a: self.fail('rebuilt the response for unchanged data')
+        try:
+            self.assertEqual(self.client.get('/api/auditions', headers={'If-None-Match': etag}).status_code, 304)
+            cached = self.client.get('/api/auditions')
+            self.assertEqual(cached.get_data(), first.get_data())
+        finally:
+            server._list_auditions = build
+
+    def test_write_within_one_mtime_tick_is_seen(self):
+        # The version is read every time, not inferred from file timestamps,
+        # so a write the filesystem's mtime granularity can't show still counts
+        row = self.add(client='a')
+        path = db.db_path()
+        stats = {name: os.stat(name) for name in (path, path + '-wal') if os.path.exists(name)}
+        etag = self.client.get('/api/auditions').headers['ETag']
+
+        with db.get_db() as conn:
+            conn.execute("UPDATE auditions SET client = 'b' WHERE id = ?", [row['id']])
+        for name, st in stats.items():
+            os.utime(name, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        response = self.client.get('/api/auditions', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()[0]['client'], 'b')
+
+    def test_api_writes_change_the_etag(self):
+        row = self.add(client='a')
+        etag = self.client.get('/api/stats').headers['ETag']
+
+        self.client.put(f"/api/auditions/{row['id']}", json={'booked': 1, 'pay': 100})
+        stats = self.client.get('/api/stats', headers={'If-None-Match': etag})
+        self.assertEqual(stats.status_code, 200)
+        self.assertEqual(stats.get_json()['totals']['booked'], 1)
+
+        etag = stats.headers['ETag']
+        self.client.delete(f"/api/auditions/{row['id']}")
+        stats = self.client.get('/api/stats', headers={'If-None-Match': etag})
+        self.assertEqual(stats.status_code, 200)
+        self.assertEqual(stats.get_json()['totals']['all'], 0)
+
+    def test_writes_from_another_connection_change_the_etag(self):
+        self.add(client='a')
+        etag = self.client.get('/api/auditions').headers['ETag']
+
+        scraper = db.connect()
+        with scraper:
+            scraper.execute("INSERT INTO auditions (platform, client) VALUES ('voice123', 'b')")
+        scraper.close()
+
+        response = self.client.get('/api/auditions', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(r['client'] for r in response.get_json()), ['a', 'b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
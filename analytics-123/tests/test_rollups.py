@@ -0,0 +1,138 @@
+"""
+audition_rollups must always agree with aggregating auditions directly —
+checked against the pre-rollup /api/stats queries after a mix of inserts,
+updates and deletes.
+"""
+import os
+import random
+import sys
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+import server
+
+DIRECT = {
+    'by_platform': """
+        SELECT platform, COUNT(*) AS total, SUM(viewed) AS viewed, SUM(liked) AS liked,
+               SUM(booked) AS booked, COALESCE(SUM(CASE WHEN booked=1 THEN pay END),0) AS earnings
+        FROM auditions GROUP BY platform ORDER BY platform
+    """,
+    'by_role_type': """
+        SELECT COALESCE(role_type,'unset') AS role_type, COUNT(*) AS total, SUM(viewed) AS viewed,
+               SUM(liked) AS liked, SUM(booked) AS booked,
+               COALESCE(SUM(CASE WHEN booked=1 THEN pay END),0) AS earnings
+        FROM auditions GROUP BY role_type ORDER BY role_type
+    """,
+    'by_month': """
+        SELECT strftime('%Y-%m', date_submitted) AS month, COUNT(*) AS total, SUM(booked) AS booked
+        FROM auditions
+        WHERE date_submitted IS NOT NULL AND date_submitted >= date('now', '-12 months')
+        GROUP BY month ORDER BY month
+    """,
+}
+
+
+def _random_audition(rng):
+    booked = int(rng.random() < 0.2)
+    day = date.today() - timedelta(days=rng.randrange(-10, 500))
+    return {
+        'platform': rng.choice(['voice123', 'acx', 'ccc']),
+        'date_submitted': None if rng.random() < 0.1 else day.isoformat(),
+        'role_type': rng.choice([None, 'narration', 'character']),
+        'viewed': rng.randrange(2), 'liked': rng.randrange(2), 'booked': booked,
+        'pay': round(rng.uniform(50, 500), 2) if booked or rng.random() < 0.3 else None,
+        'project_status': rng.choice([None, 'active', 'awarded']),
+    }
+
+
+class TestAuditionRollups(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'auditions.db')
+        self.conn = db.init_db(self.path)
+        self.rng = random.Random(45)
+
+    def tearDown(self):
+        db.close_db()
+        self.tmp.cleanup()
+
+    def insert(self, n):
+        with self.conn:
+            for _ in range(n):
+                row = _random_audition(self.rng)
+                self.conn.execute(
+                    f"INSERT INTO auditions ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                    list(row.values()))
+
+    def churn(self, n):
+        ids = [r[0] for r in self.conn.execute("SELECT id FROM auditions")]
+        with self.conn:
+            for audition_id in self.rng.sample(ids, n):
+                if self.rng.random() < 0.3:
+                    self.conn.execute("DELETE FROM auditions WHERE id = ?", (audition_id,))
+                else:
+                    row = _random_audition(self.rng)
+                    field = self.rng.choice(list(row))
+                    self.conn.execute(f"UPDATE auditions SET {field} = ? WHERE id = ?", (row[field], audition_id))
+
+    def stats(self):
+        original = db.DB_PATH
+        db.DB_PATH = self.path
+        try:
+            return server.app.test_client().get('/api/stats').get_json()
+        finally:
+            db.DB_PATH = original
+
+    def assert_matches_direct(self):
+        stats = self.stats()
+        for key, sql in DIRECT.items():
+            name = 'month' if key == 'by_month' else key[3:]
+            expected = [dict(r) for r in self.conn.execute(sql)]
+            actual = sorted(stats[key], key=lambda r: r[name])
+            self.assertEqual(len(actual), len(expected), key)
+            for got, want in zip(actual, expected):
+                for field, value in want.items():
+                    if field == 'earnings':
+                        self.assertAlmostEqual(got[field], value, places=6, msg=key)
+                    else:
+                        self.assertEqual(got[field], value, (key, field))
+
+        totals = self.conn.execute("""
+            SELECT COUNT(*), COALESCE(SUM(booked), 0),
+                   COALESCE(SUM(CASE WHEN booked=0 AND COALESCE(project_status,'active') != 'awarded' THEN 1 ELSE 0 END), 0),
+                   COALESCE(SUM(CASE WHEN booked=0 AND project_status = 'awarded' THEN 1 ELSE 0 END), 0)
+            FROM auditions
+        """).fetchone()
+        t = stats['totals']
+        self.assertEqual((t['all'], t['booked'], t['active'], t['confirmed_rejections']), tuple(totals))
+
+    def test_rollups_follow_inserts_updates_and_deletes(self):
+        self.insert(300)
+        self.assert_matches_direct()
+        for _ in range(3):
+            self.churn(80)
+            self.insert(20)
+            self.assert_matches_direct()
+
+    def test_rebuild_matches_triggers(self):
+        self.insert(200)
+        self.churn(60)
+        before = self.conn.execute("SELECT * FROM audition_rollups ORDER BY 1, 2, 3").fetchall()
+        with self.conn:
+            db.rebuild_rollups(self.conn)
+        after = self.conn.execute("SELECT * FROM audition_rollups ORDER BY 1, 2, 3").fetchall()
+        self.assertEqual([tuple(r) for r in before], [tuple(r) for r in after])
+
+    def test_empty_database(self):
+        stats = self.stats()
+        self.assertEqual(stats['totals']['all'], 0)
+        self.assertEqual(stats['by_platform'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Page fetching: concurrent pages still come back in order and within the
+parallelism cap, worker connections are closed with the pool, redirects
+and other non-2xx responses are handled, and simultaneous 401s share one
+token refresh.
+"""
+import os
+import random
+import sys
+import threading
+import time
+import unittest
+import urllib.error
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper
+
+
+class CountingAPI:
+    """Offers API with a (possibly stale) total count and a little random latency."""
+
+    def __init__(self, total, reported_total=None):
+        self.total = total
+        self.reported_total = total if reported_total is None else reported_total
+        self.lock = threading.Lock()
+        self.active = self.max_active = 0
+        self.fetched = []
+
+    def __call__(self, token, provider_id, page, storage=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.fetched.append(page)
+        time.sleep(random.uniform(0, 0.01))
+        with self.lock:
+            self.active -= 1
+        start = (page - 1) * scraper.PAGE_SIZE
+        ids = range(start, min(start + scraper.PAGE_SIZE, self.total))
+        return {'count': self.reported_total, 'results': [{'id': i} for i in ids]}
+
+
+class TestOfferPages(unittest.TestCase):
+
+    def setUp(self):
+        self.original_fetch = scraper.fetch_offers_page
+
+    def tearDown(self):
+        scraper.fetch_offers_page = self.original_fetch
+
+    def pages(self, api, parallel):
+        scraper.fetch_offers_page = api
+        return list(scraper.iter_offer_pages('token', 'provider', parallel=parallel))
+
+    def test_parallel_pages_arrive_in_order(self):
+        api = CountingAPI(total=1020)
+        pages = self.pages(api, parallel=4)
+        self.assertEqual([page for page, _ in pages], list(range(1, 22)))
+        self.assertEqual([o['id'] for _, offers in pages for o in offers], list(range(1020)))
+        self.assertLessEqual(api.max_active, 4)
+        self.assertGreater(api.max_active, 1)
+
+    def test_stale_count_keeps_paging(self):
+        api = CountingAPI(total=330, reported_total=200)   # 130 offers arrived after page 1
+        self.assertEqual([page for page, _ in self.pages(api, parallel=3)], [1, 2, 3, 4, 5, 6, 7])
+
+    def test_sequential_without_parallelism(self):
+        api = CountingAPI(total=120)
+        self.assertEqual([page for page, _ in self.pages(api, parallel=1)], [1, 2, 3])
+        self.assertEqual(api.max_active, 1)
+
+    def test_stopping_early_stops_fetching(self):
+        api = CountingAPI(total=5000)
+        scraper.fetch_offers_page = api
+        pages = scraper.iter_offer_pages('token', 'provider', parallel=4)
+        for page, _ in pages:
+            if page == 3:
+                break
+        pages.close()
+        self.assertLessEqual(max(api.fetched), 3 + 4)
+
+
+class TestWorkerConnections(unittest.TestCase):
+
+    def setUp(self):
+        self.original_fetch = scraper.fetch_offers_page
+
+    def tearDown(self):
+        scraper.fetch_offers_page = self.original_fetch
+
+    def test_pool_shutdown_closes_worker_connections(self):
+        api = CountingAPI(total=500)
+        opened, closed = [], []
+
+        def fetch(token, provider_id, page, storage=None):
+            if threading.current_thread() is not threading.main_thread():
+                conn = scraper._connection()   # what api_get would use on this worker
+                if conn not in opened:
+                    opened.append(conn)
+                    close = conn.close
+                    conn.close = lambda: (closed.append(conn), close())
+            return api(token, provider_id, page)
+
+        scraper.fetch_offers_page = fetch
+        pages = scraper.iter_offer_pages('token', 'provider', parallel=4)
+        for page, _ in pages:
+            if page == 5:
+                break
+        pages.close()
+
+        self.assertTrue(opened)
+        self.assertCountEqual(closed, opened)
+        self.assertFalse(set(map(id, opened)) & set(map(id, scraper._connections.values())))
+
+
+class TestResponses(unittest.TestCase):
+
+    def setUp(self):
+        self.original_get = scraper._get
+        self.requests = []
+
+    def tearDown(self):
+        scraper._get = self.original_get
+
+    def serve(self, responses):
+        def fake_get(path, token):
+            self.requests.append(path)
+            return responses[path]
+        scraper._get = fake_get
+
+    def test_same_host_redirect_is_followed_once(self):
+        self.serve({
+            '/api/offers/?page=1': (301, 'Moved', {'Location': '/api/v2/offers/?page=1'}, b''),
+            '/api/v2/offers/?page=1': (200, 'OK', {}, b'[1, 2]'),
+        })
+        self.assertEqual(scraper.api_get('offers/', 'token', {'page': 1}), [1, 2])
+        self.assertEqual(self.requests, ['/api/offers/?page=1', '/api/v2/offers/?page=1'])
+
+    def test_other_non_2xx_responses_raise(self):
+        self.serve({
+            '/api/a': (302, 'Found', {'Location': 'https://elsewhere.example/login'}, b'<html>'),
+            '/api/b': (304, 'Not Modified', {}, b''),
+            '/api/c': (302, 'Found', {'Location': '/api/d'}, b''),
+            '/api/d': (302, 'Found', {'Location': '/api/a'}, b''),
+            '/api/e': (503, 'Unavailable', {}, b'busy'),
+        })
+        for path, status in [('a', 302), ('b', 304), ('c', 302), ('e', 503)]:
+            with self.assertRaises(urllib.error.HTTPError) as caught:
+                scraper.api_get(path, 'token')
+            self.assertEqual(caught.exception.code, status, path)
+
+
+class TestSingleFlightRefresh(unittest.TestCase):
+
+    def setUp(self):
+        self.original = scraper._get, scraper._refresh_storage
+
+    def tearDown(self):
+        scraper._get, scraper._refresh_storage = self.original
+
+    def test_concurrent_401s_refresh_once(self):
+        refreshes = []
+
+        def fake_get(path, token):
+            if token == 'old':
+                return 401, 'Unauthorized', {}, b''
+            return 200, 'OK', {}, b'{"ok": true}'
+
+        def fake_refresh(storage):
+            refreshes.append(threading.current_thread().name)
+            time.sleep(0.05)
+            storage['auth_token'] = 'new'
+            return 'new'
+
+        scraper._get, scraper._refresh_storage = fake_get, fake_refresh
+        storage = {'auth_token': 'old', 'rt': 'refresh'}
+        results = []
+        barrier = threading.Barrier(8)
+
+        def fetch():
+            barrier.wait()
+            results.append(scraper.api_get('offers/', 'old', storage=storage))
+
+        threads = [threading.Thread(target=fetch) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(refreshes), 1)
+        self.assertEqual(results, [{'ok': True}] * 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
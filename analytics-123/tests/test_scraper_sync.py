@@ -0,0 +1,173 @@
+"""
+Incremental Voice123 sync against a fake, newest-first offers API: a
+routine run stops at the high-water mark, a periodic run pages back far
+enough to recheck open offers, --full still walks everything, and each
+page is stored as it arrives so an interrupted walk can resume.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+import scraper
+
+NOW = datetime.now(timezone.utc)
+
+
+def make_offer(offer_id, age_hours, **overrides):
+    created = NOW - timedelta(hours=age_hours)
+    offer = {
+        'id': offer_id,
+        'created_at': created.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+        'status': 'submitted',
+        'custom_sample': {'id': offer_id},
+        'positive_votes': 0,
+        'is_winner': False,
+        'project': {
+            'id': offer_id, 'name': f'Project {offer_id}', 'service_properties': {'voice_types': [1001]},
+            # projects older than 20 days have picked their winner
+            'status': 'active', 'winner_selected': age_hours > 20 * 24,
+        },
+    }
+    offer.update(overrides)
+    return offer
+
+
+class FakeOffersAPI:
+    def __init__(self, offers):
+        self.offers = offers       # newest first
+        self.pages = []
+        self.stored_before = []    # auditions already in the db when each page was requested
+        self.fail_on = None
+
+    def __call__(self, token, provider_id, page, storage=None):
+        self.pages.append(page)
+        self.stored_before.append(db.get_db().execute("SELECT COUNT(*) FROM auditions").fetchone()[0])
+        if page == self.fail_on:
+            raise OSError('connection reset')
+        start = (page - 1) * scraper.PAGE_SIZE
+        return {'results': self.offers[start:start + scraper.PAGE_SIZE]}
+
+
+class TestIncrementalSync(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_path = db.DB_PATH
+        db.DB_PATH = os.path.join(self.tmp.name, 'auditions.db')
+        self.conn = db.init_db()
+
+        # 290 offers, one every 4 hours (~48 days): six pages
+        self.api = FakeOffersAPI([make_offer(1000 - i, age_hours=4 * i + 1) for i in range(290)])
+        self.original_fetch = scraper.fetch_offers_page
+        scraper.fetch_offers_page = self.api
+
+    def tearDown(self):
+        scraper.fetch_offers_page = self.original_fetch
+        db.DB_PATH = self.original_path
+        db.close_db()
+        self.tmp.cleanup()
+
+    def sync(self, full=False):
+        self.api.pages = []
+        return scraper.sync_offers('token', 'provider', full=full)
+
+    def state(self):
+        return db.get_sync_state(self.conn, 'voice123')
+
+    def test_first_run_fetches_everything_and_sets_the_mark(self):
+        self.assertEqual(self.sync(), (290, 0))
+        self.assertEqual(self.api.pages, [1, 2, 3, 4, 5, 6])
+        self.assertEqual(self.state()['newest_offer_id'], 1000)
+        self.assertIsNotNone(self.state()['open_checked_at'])
+
+    def test_routine_run_stops_at_known_offers(self):
+        self.sync()
+        self.api.offers[:0] = [make_offer(1002, 0), make_offer(1001, 0.5)]
+        self.assertEqual(self.sync(), (2, scraper.PAGE_SIZE - 2))
+        self.assertEqual(self.api.pages, [1])
+        self.assertEqual(self.state()['newest_offer_id'], 1002)
+
+        self.assertEqual(self.sync(), (0, scraper.PAGE_SIZE))
+        self.assertEqual(self.api.pages, [1])
+
+    def test_periodic_run_rechecks_open_offers(self):
+        self.sync()
+        stale = (NOW - timedelta(hours=scraper.OPEN_REFRESH_HOURS + 1)).isoformat(timespec='seconds')
+        with self.conn:
+            db.save_sync_state(self.conn, 'voice123', open_checked_at=stale)
+
+        # An offer from ~15 days ago (project still open) gets a like
+        self.api.offers[90]['positive_votes'] = 1
+        self.sync()
+        # Open projects go back 20 days = 120 offers: pages 1-3, not the settled history
+        self.assertEqual(self.api.pages, [1, 2, 3])
+        liked = self.conn.execute("SELECT liked FROM auditions WHERE external_id = 'v123_910'").fetchone()[0]
+        self.assertEqual(liked, 1)
+        self.assertGreater(self.state()['open_checked_at'], stale)
+
+    def test_unsubmitted_offers_are_rechecked_until_submitted(self):
+        self.api.offers[100] = make_offer(900, age_hours=401, status='created', custom_sample=None)
+        self.sync()
+        self.assertEqual(self.state()['pending_since'], self.api.offers[100]['created_at'][:10])
+        with self.conn:
+            self.conn.execute("UPDATE auditions SET project_status = 'awarded'")   # nothing else open
+            db.save_sync_state(self.conn, 'voice123', open_checked_at='2000-01-01T00:00:00+00:00')
+
+        self.api.offers[100] = make_offer(900, age_hours=401)
+        self.sync()
+        self.assertEqual(self.api.pages, [1, 2, 3])
+        self.assertIsNotNone(self.conn.execute("SELECT 1 FROM auditions WHERE external_id = 'v123_900'").fetchone())
+        self.assertIsNone(self.state()['pending_since'])
+
+    def test_failed_page_keeps_the_old_mark(self):
+        self.sync()
+        self.api.offers[:0] = [make_offer(1001 + i, 0.01 * (60 - i)) for i in range(60)]
+        self.api.fail_on = 2
+        self.sync()
+        self.assertEqual(self.state()['newest_offer_id'], 1000)
+
+        self.api.fail_on = None
+        self.assertEqual(self.sync()[0], 10)
+        self.assertEqual(self.api.pages, [1, 2])
+        self.assertEqual(self.state()['newest_offer_id'], 1060)
+
+    def test_pages_are_stored_as_they_arrive(self):
+        self.sync()
+        self.assertEqual(self.api.stored_before, [0, 50, 100, 150, 200, 250])
+
+    def test_interrupted_walk_resumes(self):
+        self.api.fail_on = 4
+        self.assertEqual(self.sync(), (150, 0))
+        state = self.state()
+        self.assertIsNone(state['newest_created_at'])   # no mark until the walk is done
+        self.assertEqual((state['resume_page'], state['resume_offer_id']), (3, 1000))
+
+        self.api.fail_on = None
+        self.assertEqual(self.sync(), (140, 0))
+        self.assertEqual(self.api.pages, [4, 5, 6])
+        state = self.state()
+        self.assertEqual(state['newest_offer_id'], 1000)
+        self.assertIsNone(state['resume_page'])
+        self.assertIsNone(state['open_checked_at'])   # pages 1-3 weren't re-fetched by the resumed walk
+
+        # So the next run is the open-offer pass, back to the oldest open project
+        self.sync()
+        self.assertEqual(self.api.pages, [1, 2, 3])
+        self.assertIsNotNone(self.state()['open_checked_at'])
+
+        self.assertEqual(self.sync(), (0, scraper.PAGE_SIZE))
+        self.assertEqual(self.api.pages, [1])
+
+    def test_full_ignores_the_mark(self):
+        self.sync()
+        self.assertEqual(self.sync(full=True), (0, 290))
+        self.assertEqual(self.api.pages, [1, 2, 3, 4, 5, 6])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+The bulk upsert must leave the table, and report the counts, exactly as the
+old row-at-a-time version did — including project dupes (a won booking's
+second offer) and the role-name fallback for rows without a project_id.
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+import scraper
+
+COMPARED = ('id', 'platform', 'external_id', 'project_id', 'date_submitted', 'role', 'role_type',
+            'viewed', 'liked', 'booked', 'pay', 'pay_currency', 'project_status')
+
+
+def row_at_a_time_upsert(conn, proposals):
+    """The pre-bulk upsert, kept as the reference behaviour."""
+    merge = scraper.UPDATE_SQL
+    inserted = updated = 0
+    with conn:
+        for p in proposals:
+            row = conn.execute("SELECT id FROM auditions WHERE platform='voice123' AND external_id=?",
+                               [p['external_id']]).fetchone()
+            if not row and p['project_id']:
+                row = conn.execute("SELECT id FROM auditions WHERE platform='voice123' AND project_id=?",
+                                   [p['project_id']]).fetchone()
+            if not row and p['role']:
+                row = conn.execute("SELECT id FROM auditions WHERE platform='voice123' AND role=? AND project_id IS NULL",
+                                   [p['role']]).fetchone()
+            if row:
+                conn.execute(merge, dict(p, id=row[0]))
+                updated += 1
+            else:
+                conn.execute(f"INSERT INTO auditions ({', '.join(scraper._INSERT_COLUMNS)}) "
+                             f"VALUES ({', '.join('?' * len(scraper._INSERT_COLUMNS))})",
+                             [p[k] for k in scraper._INSERT_COLUMNS])
+                inserted += 1
+    return inserted, updated
+
+
+def random_proposal(rng):
+    booked = rng.random() < 0.2
+    offer = rng.randrange(60)
+    return {
+        'platform': 'voice123',
+        'external_id': f"v123_{offer}",
+        'project_id': None if offer % 5 == 0 else f"v123_proj_{offer // 2}",   # offers come in pairs per project
+        'date_submitted': f"2025-0{rng.randrange(1, 10)}-1{rng.randrange(10)}",
+        'client': None,
+        'role': rng.choice([None, 'Narrator', 'Hero', 'Villain', 'Announcer']),
+        'role_type': rng.choice([None, 'narration', 'character']),
+        'viewed': rng.randrange(2), 'liked': rng.randrange(2), 'booked': int(booked),
+        'pay': rng.choice([100, 250.5]) if booked else None,
+        'pay_currency': rng.choice(['USD', 'EUR']),
+        'project_status': rng.choice([None, 'active', 'awarded']),
+    }
+
+
+class TestBulkUpsert(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.bulk_path = os.path.join(self.tmp.name, 'bulk.db')
+        self.reference = db.init_db(os.path.join(self.tmp.name, 'reference.db'))
+        self.original = db.DB_PATH
+        db.DB_PATH = self.bulk_path
+        self.bulk = db.init_db()
+
+    def tearDown(self):
+        db.DB_PATH = self.original
+        db.close_db()
+        self.tmp.cleanup()
+
+    def seed(self, rows):
+        for conn in (self.reference, self.bulk):
+            with conn:
+                for row in rows:
+                    conn.execute(f"INSERT INTO auditions ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                                 list(row.values()))
+
+    def table(self, conn):
+        return [tuple(r) for r in conn.execute(f"SELECT {', '.join(COMPARED)} FROM auditions ORDER BY id")]
+
+    def assert_same(self, proposals):
+        try:
+            expected = row_at_a_time_upsert(self.reference, proposals)
+        except sqlite3.IntegrityError:
+            # Linking a row to a project another row already has; both roll the batch back
+            with self.assertRaises(sqlite3.IntegrityError):
+                scraper.upsert(proposals)
+        else:
+            self.assertEqual(scraper.upsert(proposals), expected)
+        self.assertEqual(self.table(self.bulk), self.table(self.reference))
+
+    def test_project_dupe_and_role_fallback(self):
+        self.seed([
+            {'platform': 'voice123', 'external_id': 'v123_1', 'role': 'Hero'},                  # pre-project_id row
+            {'platform': 'voice123', 'external_id': 'v123_2', 'project_id': 'v123_proj_9', 'role': 'Villain'},
+            {'platform': 'acx', 'role': 'Hero'},                                                 # other platform
+            {'platform': 'voice123', 'external_id': 'v123_7'},                                   # no project, no role
+        ])
+        base = random_proposal(random.Random(0))
+        proposals = [
+            dict(base, external_id='v123_3', project_id='v123_proj_9', role='Villain', booked=1, pay=300),
+            dict(base, external_id='v123_4', project_id='v123_proj_5', role='Hero'),   # role fallback -> row 1
+            dict(base, external_id='v123_5', project_id='v123_proj_6', role='Hero'),   # row 1 is linked now -> insert
+            dict(base, external_id='v123_6', project_id='v123_proj_6', role='Other'),  # dupe of the row just inserted
+            dict(base, external_id='v123_5', project_id=None, role='Hero', liked=1),   # same offer again
+            dict(base, external_id='v123_7', project_id='v123_proj_7', role=None),     # links the role-less row
+            dict(base, external_id='v123_8', project_id='v123_proj_7', role=None, booked=1, pay=200),  # its booking
+        ]
+        self.assert_same(proposals)
+        self.assertEqual(scraper.upsert([]), (0, 0))
+
+    def test_random_batches_match_row_at_a_time(self):
+        rng = random.Random(47)
+        self.seed([dict(random_proposal(rng), project_id=None) for _ in range(8)] +
+                  [{'platform': 'voice123', 'role': 'Narrator'}])   # manual row, no external_id
+        for _ in range(12):
+            self.assert_same([random_proposal(rng) for _ in range(rng.randrange(1, 80))])
+
+
+if __name__ == '__main__':
+    unittest.main()
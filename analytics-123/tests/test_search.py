@@ -0,0 +1,161 @@
+"""
+Full-text search for the Log tab: results match what the old LIKE query
+found (for whole words and word prefixes, which is what FTS matches on),
+sort=rank follows bm25, the triggers keep auditions_fts in sync, user
+input can't inject FTS5 syntax, and without FTS5 search falls back to LIKE.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+import server
+
+FIXTURE = [
+    # (client, role, notes)
+    ('Acme Audio', 'Narrator', 'warm documentary read'),
+    ('Blue Whale Games', 'Dragon King', 'gravelly villain, dragon roar'),
+    ('Acme Audio', 'Hero', None),
+    (None, 'Dragon rider', 'young hero'),
+    ('Storyhouse', 'Narrator', 'audiobook narrator, fantasy'),
+    ('Café Sonoro', 'Announcer', 'spanish promo'),
+    ('Northwind', 'Pirate captain', 'pirate pirate pirate'),
+    ('Northwind', 'Deckhand', 'background pirate crew, many lines across a long long session'),
+]
+
+# Word / word-prefix searches, where FTS and the old substring LIKE agree on this fixture
+LIKE_EQUIVALENT = ['acme', 'Narrator', 'narr', 'dragon', 'drag', 'hero', 'pirate', 'documentary', 'zzz']
+
+
+def old_like_ids(conn, search):
+    like = f'%{search}%'
+    return {r[0] for r in conn.execute(
+        "SELECT id FROM auditions WHERE client LIKE ? OR role LIKE ? OR notes LIKE ?", (like, like, like))}
+
+
+class SearchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original = db.DB_PATH
+        db.DB_PATH = os.path.join(self.tmp.name, 'auditions.db')
+        self.conn = db.init_db()
+        with self.conn:
+            self.conn.executemany("INSERT INTO auditions (platform, client, role, notes) VALUES ('acx', ?, ?, ?)",
+                                  FIXTURE)
+        self.client = server.app.test_client()
+
+    def tearDown(self):
+        db.DB_PATH = self.original
+        db.close_db()
+        self.tmp.cleanup()
+
+    def search(self, text, **params):
+        query = '&'.join(f'{k}={v}' for k, v in params.items())
+        response = self.client.get('/api/auditions', query_string={'search': text, **params})
+        self.assertEqual(response.status_code, 200, (text, query))
+        return [r['id'] for r in response.get_json()]
+
+
+@unittest.skipUnless(sqlite3.connect(':memory:').execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0],
+                     "SQLite built without FTS5")
+class TestFullTextSearch(SearchTestCase):
+
+    def test_index_exists(self):
+        self.assertTrue(db.has_fts(self.conn))
+
+    def test_matches_old_like_results(self):
+        for text in LIKE_EQUIVALENT:
+            self.assertEqual(set(self.search(text)), old_like_ids(self.conn, text), text)
+
+    def test_every_word_must_match(self):
+        # LIKE needed the exact phrase; FTS takes the words in any order or column
+        self.assertEqual(set(self.search('dragon hero')), {4})
+        self.assertEqual(set(self.search('hero dragon')), {4})
+        self.assertEqual(set(self.search('acme hero')), {3})
+
+    def test_diacritics_are_folded(self):
+        self.assertEqual(self.search('cafe'), [6])
+        self.assertEqual(self.search('Café'), [6])
+
+    def test_rank_follows_bm25(self):
+        ranked = self.search('pirate', sort='rank')
+        expected = [r[0] for r in self.conn.execute(
+            "SELECT rowid FROM auditions_fts WHERE auditions_fts MATCH ? ORDER BY bm25(auditions_fts), rowid",
+            (server._fts_match('pirate'),))]
+        self.assertEqual(ranked, expected)
+        self.assertEqual(ranked[0], 7)   # pirate four times in short text beats once in a long note
+
+    def test_rank_pages_match_full_ranking(self):
+        full = self.search('narrator', sort='rank')
+        page = self.client.get('/api/auditions', query_string={'search': 'narrator', 'sort': 'rank', 'limit': 1})
+        seen, body = [], page.get_json()
+        while True:
+            seen += [r['id'] for r in body['items']]
+            if not body['next_cursor']:
+                break
+            body = self.client.get('/api/auditions', query_string={
+                'search': 'narrator', 'sort': 'rank', 'limit': 1, 'cursor': body['next_cursor']}).get_json()
+        self.assertEqual(seen, full)
+
+    def test_triggers_keep_the_index_in_sync(self):
+        with self.conn:
+            self.conn.execute("INSERT INTO auditions (platform, client, role) VALUES ('acx', 'Zephyr Media', 'Wizard')")
+        new_id = self.conn.execute("SELECT MAX(id) FROM auditions").fetchone()[0]
+        self.assertEqual(self.search('zephyr'), [new_id])
+
+        with self.conn:
+            self.conn.execute("UPDATE auditions SET role = 'Sorcerer' WHERE id = ?", (new_id,))
+        self.assertEqual(self.search('wizard'), [])
+        self.assertEqual(self.search('sorc'), [new_id])
+
+        with self.conn:
+            self.conn.execute("DELETE FROM auditions WHERE id = ?", (new_id,))
+        self.assertEqual(self.search('sorcerer'), [])
+
+        # External-content FTS tables report drift between index and content here
+        with self.conn:
+            self.conn.execute("INSERT INTO auditions_fts(auditions_fts) VALUES ('integrity-check')")
+
+    def test_fts_syntax_in_user_input_is_quoted(self):
+        self.assertEqual(server._fts_match('Dragon "king'), '"dragon"* "king"*')
+        self.assertEqual(server._fts_match('a OR b NOT c'), '"a"* "or"* "b"* "not"* "c"*')
+        self.assertEqual(server._fts_match('role:hero NEAR(x) -y ^z *'), '"role"* "hero"* "near"* "x"* "y"* "z"*')
+        for text in ['"', 'dragon"', 'OR', 'AND NOT', 'NEAR(a b)', 'client:acme', 'pirate*', '*', '-', "'; DROP"]:
+            self.search(text)   # no FTS5 syntax error -> 200
+        self.assertEqual(set(self.search('pirate*')), old_like_ids(self.conn, 'pirate'))
+        self.assertEqual(set(self.search('narrator:storyhouse')), {5})   # not a column filter, just two words
+        self.assertEqual(set(self.search('"dragon king"')), {2})
+
+    def test_punctuation_only_falls_back_to_like(self):
+        self.assertEqual(set(self.search(',')), old_like_ids(self.conn, ','))
+
+
+class TestLikeFallback(SearchTestCase):
+    """The same searches on a database whose SQLite has no FTS5."""
+
+    def setUp(self):
+        original_schema = db.FTS_SCHEMA
+        db.FTS_SCHEMA = "CREATE VIRTUAL TABLE auditions_fts USING fts5_not_compiled_in(client, role, notes);"
+        try:
+            super().setUp()
+        finally:
+            db.FTS_SCHEMA = original_schema
+
+    def test_no_index_is_created(self):
+        self.assertFalse(db.has_fts(self.conn))
+
+    def test_search_is_the_old_like_query(self):
+        for text in LIKE_EQUIVALENT + ['arr', 'pirate crew', 'Café', ',']:
+            self.assertEqual(set(self.search(text)), old_like_ids(self.conn, text), text)
+
+    def test_rank_sort_still_answers(self):
+        self.assertEqual(self.search('narrator', sort='rank'), sorted(old_like_ids(self.conn, 'narrator')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ beacon_scheduler.py - Extract Beacon.tv programming schedule and add to Google C
 import requests
 from bs4 import BeautifulSoup
 import re
+import sys
 from datetime import datetime, timedelta
 from typing import List, Dict
 import os.path
@@ -16,6 +17,10 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+# Slug resolution (and its learned URL cache) is shared with cr-tracker's beacon_scraper
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cr-tracker'))
+from url_resolver import SlugResolver, url_variants
+
 # If modifying these scopes, delete the file token.json.
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
@@ -25,32 +30,38 @@ REQUEST_HEADERS = {
                   '(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36'
 }
 
-def fetch_schedule(url: str) -> tuple:
+def fetch_schedule(url: str, week_start: datetime = None) -> tuple:
     """Fetch the HTML from critrole.com
 
+    Tries the ordinal/suffix-less slug forms and the previous-year variant
+    (for early January edge cases), starting with whichever one resolved for
+    this week last time.
+
     Returns: (html, actual_url_used)
     """
-    urls_to_try = [url]
-
-    # Also try previous year variant (for early January edge cases)
-    current_year = str(datetime.now().year)
-    prev_year = str(datetime.now().year - 1)
-
-    if current_year in url:
-        urls_to_try.append(url.replace(current_year, prev_year))
-
+    week_key = week_start.strftime('%Y-%m-%d') if week_start else url
+    resolver = SlugResolver()
     last_response = None
-    for attempt_url in urls_to_try:
+
+    def fetch(attempt_url):
+        nonlocal last_response
         last_response = requests.get(attempt_url, headers=REQUEST_HEADERS)
         if last_response.status_code == 200:
-            return last_response.text, attempt_url
+            return last_response.text, last_response.url
         elif last_response.status_code == 404:
             print(f"  404 error for: {attempt_url}")
+        return None, None
+
+    urls_to_try = url_variants(url, include_previous_year=True)
+    html, actual_url, attempted = resolver.resolve(week_key, urls_to_try, fetch)
+    resolver.save()
+    if html is not None:
+        return html, actual_url
 
     # If all URLs failed, raise the last error
     if last_response is not None:
         last_response.raise_for_status()
-    raise ValueError(f"Failed to fetch schedule from any URL: {urls_to_try}")
+    raise ValueError(f"Failed to fetch schedule from any URL: {attempted}")
 
 def get_this_weeks_monday_url() -> tuple:
     """Generate the Beacon.tv schedule URL for this week's Monday (most recent Monday)"""
@@ -322,7 +333,7 @@ def create_calendar_event(service, calendar_id: str, event: Dict, actual_year: i
 
 def main():
     """Main function"""
-    import sys
+    week_start = None
     if len(sys.argv) > 1:
         url = sys.argv[1]
         print(f"URL: {url}\n")
@@ -333,7 +344,7 @@ def main():
         print(f"URL: {url}\n")
     
     print("Fetching schedule from Beacon.tv...")
-    html, actual_url = fetch_schedule(url)
+    html, actual_url = fetch_schedule(url, week_start)
     
     # Extract the actual year from the URL we successfully fetched
     actual_year = int(actual_url.rstrip('/').split('-')[-1])
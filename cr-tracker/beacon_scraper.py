@@ -3,6 +3,7 @@
 Scrape CritRole.com weekly programming schedules to extract Beacon-exclusive content
 """
 
+import os
 import sys
 import re
 from datetime import datetime, timedelta
@@ -11,6 +12,16 @@ import time
 import csv
 from itertools import permutations
 
+from changelog import record_run
+from episode_store import load_episodes, save_episodes
+from schedule_discovery import discover_schedule_urls, mark_extracted, save_state
+from text_normalize import (
+    normalize_text, extract_arc_name, normalize_live_show_title, extract_fireside_guests,
+    print_cache_stats,
+)
+from update_canon import classify_canon
+from url_resolver import SlugResolver, url_variants
+
 # Try Playwright first, fall back to requests
 USE_PLAYWRIGHT = True
 try:
@@ -23,27 +34,29 @@ except ImportError:
 def fetch_url_with_retry(url, max_retries=3, timeout=30):
     """
     Fetch a URL with retry logic. Uses Playwright if available, otherwise requests.
-    Returns (html_content, success_bool)
+    Returns (html_content, success_bool, final_url) - final_url is where any
+    redirects landed, so callers can remember the URL that actually resolved.
     """
     for attempt in range(max_retries):
         try:
             if USE_PLAYWRIGHT:
-                html = fetch_with_playwright(url, timeout)
+                html, final_url = fetch_with_playwright(url, timeout)
             else:
-                html = fetch_with_requests(url, timeout)
-            return html, True
+                html, final_url = fetch_with_requests(url, timeout)
+            return html, True, final_url
         except Exception as e:
-            if attempt < max_retries - 1:
+            # A 404 won't fix itself on retry - move on to the next candidate URL
+            if attempt < max_retries - 1 and '404' not in str(e):
                 wait_time = 2 ** attempt  # Exponential backoff: 1, 2, 4 seconds
                 print(f"    Retry {attempt + 1}/{max_retries} after {wait_time}s: {e}")
                 time.sleep(wait_time)
             else:
-                return None, False
-    return None, False
+                return None, False, None
+    return None, False, None
 
 
 def fetch_with_playwright(url, timeout=30):
-    """Use Playwright with headless Chromium to fetch the page"""
+    """Use Playwright with headless Chromium to fetch the page. Returns (html, final_url)"""
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         context = browser.new_context(
@@ -57,13 +70,13 @@ def fetch_with_playwright(url, timeout=30):
                 raise Exception("404 Not Found")
             # Wait a moment for dynamic content
             time.sleep(0.5)
-            return page.content()
+            return page.content(), page.url
         finally:
             browser.close()
 
 
 def fetch_with_requests(url, timeout=30):
-    """Fallback to requests (may fail with Cloudflare)"""
+    """Fallback to requests (may fail with Cloudflare). Returns (html, final_url)"""
     headers = {
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -76,7 +89,7 @@ def fetch_with_requests(url, timeout=30):
     if response.status_code == 404:
         raise Exception("404 Not Found")
     response.raise_for_status()
-    return response.text
+    return response.text, response.url
 
 def generate_schedule_urls(start_date, end_date):
     """
@@ -560,53 +573,95 @@ def extract_beacon_content(html, week_date):
 
     return content
 
-def scrape_beacon_exclusives(start_date_str, end_date_str=None):
+def scrape_beacon_exclusives(start_date_str, end_date_str=None, use_discovery=True):
     """
-    Scrape all Beacon-exclusive content from programming schedules
+    Scrape all Beacon-exclusive content from programming schedules.
+
+    By default the schedule posts to fetch come from the sites' sitemaps/feeds
+    (see schedule_discovery.py), so only posts that exist and are new or
+    changed since the last run get fetched. If discovery is disabled or
+    fails, falls back to guessing a URL for every Monday in the range.
+
+    Returns (content, checked, discovery_state). checked is the list of
+    (week_date, url, source) schedule posts this run actually tried.
+    discovery_state (None when URLs were guessed) has the extracted posts
+    marked but is not saved yet - pass it to save_state() only once the
+    results are safely written, so a failed write means they get fetched
+    again next run.
     """
     start_date = datetime.strptime(start_date_str, '%Y-%m-%d')
     end_date = datetime.strptime(end_date_str, '%Y-%m-%d') if end_date_str else datetime.now()
 
-    print(f"Generating schedule URLs from {start_date.date()} to {end_date.date()}...")
+    print(f"Finding schedule pages from {start_date.date()} to {end_date.date()}...")
     print(f"Using {'Playwright' if USE_PLAYWRIGHT else 'requests'} for fetching\n")
-    urls = generate_schedule_urls(start_date, end_date)
-    print(f"Found {len(urls)} weekly schedules to check (both critrole.com and beacon.tv)\n")
-
-    all_content = []
 
-    for week_date, url, source in urls:
-        # Try both URL formats - with and without ordinal suffix
-        url_without_suffix = url.replace('st-', '-').replace('nd-', '-').replace('rd-', '-').replace('th-', '-')
-
-        success = False
+    urls = posts = discovery_state = None
+    if use_discovery:
+        urls, posts, discovery_state = discover_schedule_urls(start_date, end_date)
+        if urls is None:
+            print("Sitemap/feed discovery unavailable - falling back to guessing URLs")
+            discovery_state = None
+        else:
+            in_range = sum(1 for week_date, _, _ in posts.values()
+                           if start_date.date() <= week_date.date() <= end_date.date())
+            print(f"Discovered {in_range} schedule post(s) in range, "
+                  f"{len(urls)} new or changed since the last run\n")
 
-        for attempt_url in [url, url_without_suffix]:
-            if success:
-                break
+    if urls is None:
+        urls = generate_schedule_urls(start_date, end_date)
+        print(f"Found {len(urls)} weekly schedules to check (both critrole.com and beacon.tv)\n")
 
-            print(f"Fetching {week_date.strftime('%Y-%m-%d')} [{source}]: {attempt_url}")
+    all_content = []
+    resolver = SlugResolver()
 
-            html, fetch_success = fetch_url_with_retry(attempt_url, max_retries=2, timeout=15)
+    def fetch(attempt_url):
+        print(f"  Trying {attempt_url}")
+        html, fetch_success, final_url = fetch_url_with_retry(attempt_url, max_retries=2, timeout=15)
+        if fetch_success and html:
+            return html, final_url
+        return None, None
 
-            if fetch_success and html:
-                content = extract_beacon_content(html, week_date)
-                if content:
-                    print(f"  ✓ Found {len(content)} Beacon-exclusive items")
-                    all_content.extend(content)
-                else:
-                    print(f"  - No Beacon content found")
-                success = True
+    for week_date, url, source in urls:
+        # Try both URL formats - with and without ordinal suffix - starting
+        # with whichever one resolved for this week on a previous run
+        week_key = week_date.strftime('%Y-%m-%d')
+        print(f"Fetching {week_key} [{source}]")
+
+        html, resolved_url, attempted = resolver.resolve(week_key, url_variants(url), fetch)
+
+        if html:
+            if resolved_url != url:
+                print(f"  (resolved to {resolved_url})")
+            content = extract_beacon_content(html, week_date)
+            if content:
+                print(f"  ✓ Found {len(content)} Beacon-exclusive items")
+                all_content.extend(content)
             else:
-                print(f"  ✗ Failed to fetch (trying alternate URL format...)")
+                print(f"  - No Beacon content found")
+            if discovery_state is not None:
+                mark_extracted(discovery_state, posts, url)
+        else:
+            print(f"  ✗ Failed to fetch any of {len(attempted)} URL variant(s)")
 
         # Be nice to the server
         time.sleep(1)
 
-    return all_content
+    resolver.save()
+    print(f"\nURL cache: {resolver.hits} known-good hit(s), {resolver.misses} lookup(s) needed guessing")
+
+    return all_content, urls, discovery_state
+
+def _exclusive_key(item):
+    return (item['week_date'], item['series'], item['episode_number'], item['title'])
 
-def save_to_csv(content, filename='beacon_exclusives.csv'):
+
+def save_to_csv(content, filename='beacon_exclusives.csv', since=None):
     """
-    Save extracted content to CSV
+    Merge extracted content into the CSV. With discovery a run only extracts
+    new or changed posts, so rows already in the file are kept and updated by
+    (week_date, series, episode_number, title); rows for weeks before since
+    (a YYYY-MM-DD string) are dropped, so the file still covers the scraped
+    window rather than growing forever.
     """
     if not content:
         print("\nNo content to save!")
@@ -614,12 +669,24 @@ def save_to_csv(content, filename='beacon_exclusives.csv'):
 
     fieldnames = ['week_date', 'show_type', 'series', 'campaign', 'episode_number', 'title', 'release_date', 'notes', 'is_generic_fallback']
 
+    merged = {}
+    if os.path.exists(filename):
+        with open(filename, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                merged[_exclusive_key(row)] = row
+    existing = len(merged)
+    for item in content:
+        merged[_exclusive_key(item)] = item
+    rows = [row for row in merged.values() if not since or row['week_date'] >= since]
+    rows.sort(key=lambda row: row['week_date'])
+
     with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
         writer.writeheader()
-        writer.writerows(content)
+        writer.writerows(rows)
 
-    print(f"\n✓ Saved {len(content)} items to {filename}")
+    print(f"\n✓ Saved {len(content)} items to {filename} "
+          f"({len(rows)} total, {len(merged) - existing} new)")
 
     # Print summary
     series_counts = {}
@@ -679,33 +746,6 @@ def validate_episode_number(ep_num, series_name, existing_episodes):
     return True, None
 
 
-def normalize_text(text):
-    """
-    Normalize scraped text for duplicate-detection comparisons.
-    Source pages inconsistently use non-breaking spaces, curly quotes/dashes,
-    and inconsistent capitalization between scrapes of the same content, which
-    defeats plain exact-string dedup. This folds all of that away so identical
-    content compares equal regardless of which scrape produced it.
-    """
-    if not text:
-        return ''
-    t = text.replace('\xa0', ' ')
-    t = t.replace('‘', "'").replace('’', "'")
-    t = t.replace('–', '-').replace('—', '-')
-    t = re.sub(r'\s+', ' ', t)
-    return t.strip().lower()
-
-
-def extract_arc_name(title):
-    """
-    Extract the arc/episode name from titles with pipe separators.
-    Works for "Previously On... | Arc Name" and "Tale Gate | Arc Name" formats.
-    """
-    if '|' in title:
-        return normalize_text(title.split('|', 1)[1])
-    return normalize_text(title)
-
-
 def clean_live_show_title(title):
     """
     Drop empty pipe-segments from a scraped Live Show title before storing it.
@@ -722,25 +762,6 @@ def clean_live_show_title(title):
     return ' | '.join(segments)
 
 
-def normalize_live_show_title(title):
-    """
-    Normalize a Live Show title for duplicate detection.
-
-    critrole.com re-promotes the same live show release across multiple weekly
-    schedule pages, and the blurb is sometimes reworded slightly between
-    postings (e.g. a "| Critical Role |" segment gets added or dropped). That
-    defeats plain exact-string dedup, producing a second row for what's really
-    the same release. Dropping empty/filler pipe-segments (just "critical
-    role") folds those cosmetic rewrites away, while still keeping distinct
-    same-event pieces (e.g. a Backstage Pass teaser vs. its later "Road To..."
-    follow-up, or the main show vs. its Cooldown) as separate segments so they
-    aren't incorrectly collapsed together.
-    """
-    segments = [normalize_text(s) for s in title.split('|')]
-    segments = [s for s in segments if s and s != 'critical role']
-    return '|'.join(segments)
-
-
 # Live Show rows whose stored `title` was manually rewritten from the raw
 # scraped pipe-delimited form into a cleaner, reworded sentence (segments
 # collapsed/reordered, "Critical Role Cooldown" shortened to "Cooldown:",
@@ -865,27 +886,6 @@ def is_excluded_from_generic_fallback(title):
     return any(kw in t for kw in EXCLUDED_TITLE_KEYWORDS)
 
 
-def extract_fireside_guests(title):
-    """
-    Extract a normalized, order-independent guest key from a Fireside Chat title.
-    Guards against duplicate rows caused by cosmetic differences between scrapes:
-    guest order ("A & B" vs "B & A"), separator ("&" vs "and"), trailing punctuation
-    ("!"), dangling fragments ("... from"), trailing "| Month Year" suffixes, and
-    curly vs straight apostrophes. Returns a sorted tuple of guest names, or None.
-    """
-    match = re.search(r'with\s+(.+)', title, re.IGNORECASE)
-    if not match:
-        return None
-    guests = normalize_text(match.group(1))
-    guests = re.sub(r'\|\s*\w+\s+\d{4}\s*$', '', guests)  # trailing "| Month Year"
-    guests = re.sub(r'[!.]+\s*$', '', guests)
-    guests = re.sub(r'\bfrom\s*$', '', guests, flags=re.IGNORECASE)
-    guests = guests.strip()
-    parts = re.split(r'\s*(?:&|,|\band\b)\s*', guests, flags=re.IGNORECASE)
-    parts = tuple(sorted(p.strip().lower() for p in parts if p.strip()))
-    return parts or None
-
-
 def _fireside_names_match(name_a, name_b):
     """A guest may be scraped as just a first name before the full name is
     announced (e.g. "Whitney" vs "Whitney Moore" for the same chat)."""
@@ -919,10 +919,7 @@ def merge_into_main_csv(scraped_content, main_csv='cr_episodes_series_airdates.c
 
     # Read existing CSV
     try:
-        with open(main_csv, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            existing_rows = list(reader)
-            fieldnames = reader.fieldnames
+        existing_rows, fieldnames = load_episodes(main_csv)
     except FileNotFoundError:
         print(f"Error: {main_csv} not found")
         return [], []
@@ -1204,6 +1201,8 @@ def merge_into_main_csv(scraped_content, main_csv='cr_episodes_series_airdates.c
             'has_cooldown': 'False',
             'cooldown_date': ''
         }
+        if 'is_canon' in fieldnames:
+            new_row.update(classify_canon(new_row))
 
         new_rows.append(new_row)
         existing_ids.add(episode_id)
@@ -1252,11 +1251,8 @@ def merge_into_main_csv(scraped_content, main_csv='cr_episodes_series_airdates.c
     all_rows = existing_rows + new_rows
     all_rows.sort(key=lambda x: x['airdate'] if x['airdate'] else '9999-99-99')
 
-    # Write back to CSV
-    with open(main_csv, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(all_rows)
+    # Write back to CSV (or UPSERT just the new rows, with CR_TRACKER_DB set)
+    save_episodes(main_csv, fieldnames, all_rows, changed_rows=new_rows)
 
     print(f"\n✓ Added {len(new_rows)} new episodes to {main_csv}")
     for row in new_rows:
@@ -1265,51 +1261,12 @@ def merge_into_main_csv(scraped_content, main_csv='cr_episodes_series_airdates.c
     return new_rows, skipped
 
 
-_CHANGELOG_HEADER = (
-    "# Changelog\n\n"
-    "Weekly scraper runs - which critrole.com schedule pages were checked and what "
-    "got added, so you can open the same page and compare it against what the "
-    "scraper actually did that week.\n\n"
-)
-
-
 def write_changelog_entry(week_urls, new_rows, skipped, changelog_path='CHANGELOG.md'):
     """
-    Prepend a dated entry to CHANGELOG.md summarizing a scraper run. Newest
-    entry goes right after the fixed header, so recent weeks are always at
-    the top without re-reading/re-ordering the whole file.
+    Record this run in the changelog log and re-render CHANGELOG.md (recent
+    runs only - older ones roll into yearly archives, see changelog.py).
     """
-    lines = [f"## Run: {datetime.now().strftime('%Y-%m-%d')}", ""]
-
-    if week_urls:
-        lines.append("Checked:")
-        lines.extend(f"- {url}" for url in week_urls)
-        lines.append("")
-
-    if new_rows:
-        lines.append(f"Added ({len(new_rows)}):")
-        for row in sorted(new_rows, key=lambda r: r['airdate'] or ''):
-            lines.append(f"- [{row['airdate']}] {row['title']}")
-    else:
-        lines.append("Added: none")
-    lines.append("")
-    lines.append(f"Skipped as already tracked: {len(skipped)}")
-    lines.append("")
-
-    entry = "\n".join(lines) + "\n"
-
-    try:
-        with open(changelog_path, encoding='utf-8') as f:
-            existing = f.read()
-    except FileNotFoundError:
-        existing = ''
-    if not existing.startswith(_CHANGELOG_HEADER):
-        existing = _CHANGELOG_HEADER + existing
-
-    body = existing[len(_CHANGELOG_HEADER):]
-    with open(changelog_path, 'w', encoding='utf-8') as f:
-        f.write(_CHANGELOG_HEADER + entry + body)
-
+    record_run(week_urls, new_rows, skipped, changelog_path)
     print(f"\n✓ Wrote changelog entry to {changelog_path}")
 
 
@@ -1323,10 +1280,14 @@ if __name__ == '__main__':
     # Default to today
     end_date = None
 
-    if len(sys.argv) > 1:
-        start_date = sys.argv[1]
-    if len(sys.argv) > 2:
-        end_date = sys.argv[2]
+    # --guess-urls skips sitemap/feed discovery and probes every Monday instead
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    use_discovery = '--guess-urls' not in sys.argv
+
+    if len(args) > 0:
+        start_date = args[0]
+    if len(args) > 1:
+        end_date = args[1]
 
     print("=" * 80)
     print("BEACON EXCLUSIVE CONTENT SCRAPER")
@@ -1336,28 +1297,31 @@ if __name__ == '__main__':
     print(f"End date: {end_date or 'today'}")
     print("=" * 80 + "\n")
 
-    content = scrape_beacon_exclusives(start_date, end_date)
+    content, checked, discovery_state = scrape_beacon_exclusives(start_date, end_date,
+                                                                 use_discovery=use_discovery)
 
-    # Save raw scrape results
-    save_to_csv(content)
+    # Save raw scrape results, merged with earlier runs over the same window
+    save_to_csv(content, since=start_date)
 
     # Merge new episodes into main CSV
     print("\n" + "=" * 80)
     print("MERGING INTO MAIN CSV")
     print("=" * 80)
     new_rows, skipped = merge_into_main_csv(content)
+    print_cache_stats()
+
+    # Only now that the results are written - if the merge had failed, these
+    # posts must be fetched again next run rather than skipped as extracted
+    if discovery_state is not None:
+        save_state(discovery_state)
 
     if new_rows:
         print(f"\n✓ Successfully added {len(new_rows)} new episode(s) to the tracker!")
     else:
         print("\n✓ No new episodes found - CSV is up to date!")
 
-    # critrole.com URLs actually covered by this run, for the changelog - lets
-    # a human open the same page and eyeball-compare it against what got added.
-    urls_start = datetime.strptime(start_date, '%Y-%m-%d')
-    urls_end = datetime.strptime(end_date, '%Y-%m-%d') if end_date else datetime.now()
-    week_urls = sorted({
-        url for _, url, source in generate_schedule_urls(urls_start, urls_end)
-        if source == 'critrole'
-    })
+    # Schedule URLs actually covered by this run (what discovery returned, or
+    # the guessed ones), for the changelog - lets a human open the same page
+    # and eyeball-compare it against what got added.
+    week_urls = sorted({url for _, url, _ in checked})
     write_changelog_entry(week_urls, new_rows, skipped)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Weekly scraper run log.
+
+Each run is appended as one JSON line to changelog_runs.jsonl - the record
+of truth, and O(entry) to write no matter how long the history gets.
+CHANGELOG.md is rendered from just the most recent RECENT_RUNS runs (read
+from the tail of the log), and the run that falls out of that window is
+appended to a per-year archive file (changelog_archive/CHANGELOG-YYYY.md,
+oldest first). So a weekly run writes one line, one bounded-size file, and
+at most one archive entry.
+
+Usage:
+  python3 changelog.py render [--recent=N]   # regenerate CHANGELOG.md from the log
+  python3 changelog.py migrate               # one-off: import an existing CHANGELOG.md into the log
+"""
+
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CHANGELOG_PATH = os.path.join(HERE, 'CHANGELOG.md')
+RUNS_FILENAME = 'changelog_runs.jsonl'
+ARCHIVE_DIRNAME = 'changelog_archive'
+RECENT_RUNS = 12
+
+CHANGELOG_HEADER = (
+    "# Changelog\n\n"
+    "Weekly scraper runs - which critrole.com schedule pages were checked and what "
+    "got added, so you can open the same page and compare it against what the "
+    "scraper actually did that week.\n\n"
+)
+
+_TAIL_BLOCK = 8192
+
+
+def _paths(changelog_path):
+    """(runs log, archive dir) kept next to CHANGELOG.md."""
+    base = os.path.dirname(os.path.abspath(changelog_path))
+    return os.path.join(base, RUNS_FILENAME), os.path.join(base, ARCHIVE_DIRNAME)
+
+
+def make_run(week_urls, new_rows, skipped, date=None):
+    return {
+        'date': date or datetime.now().strftime('%Y-%m-%d'),
+        'checked': list(week_urls or []),
+        'added': [{'airdate': row['airdate'], 'title': row['title']}
+                  for row in sorted(new_rows, key=lambda r: r['airdate'] or '')],
+        'skipped': len(skipped),
+    }
+
+
+def render_entry(run):
+    """One run as the markdown section CHANGELOG.md has always used."""
+    lines = [f"## Run: {run['date']}", ""]
+
+    if run['checked']:
+        lines.append("Checked:")
+        lines.extend(f"- {url}" for url in run['checked'])
+        lines.append("")
+
+    if run['added']:
+        lines.append(f"Added ({run.get('added_count', len(run['added']))}):")
+        for row in run['added']:
+            lines.append(f"- [{row['airdate']}] {row['title']}")
+    else:
+        lines.append("Added: none")
+    lines.append("")
+    lines.append(f"Skipped as already tracked: {run['skipped']}")
+    lines.append("")
+
+    return "\n".join(lines) + "\n"
+
+
+def append_run(run, runs_path):
+    with open(runs_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run, ensure_ascii=False) + "\n")
+
+
+def tail_runs(runs_path, count):
+    """The last `count` runs, oldest first - reads backwards from the end of the log, not the whole file."""
+    try:
+        f = open(runs_path, 'rb')
+    except FileNotFoundError:
+        return []
+    with f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        while position > 0 and data.count(b'\n') <= count:
+            step = min(_TAIL_BLOCK, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = [line for line in data.split(b'\n') if line.strip()]
+    if position > 0:
+        lines = lines[1:]  # first line may be cut off mid-record
+    return [json.loads(line) for line in lines[-count:]]
+
+
+def _archive_run(run, archive_dir):
+    os.makedirs(archive_dir, exist_ok=True)
+    year = run['date'][:4]
+    path = os.path.join(archive_dir, f"CHANGELOG-{year}.md")
+    is_new = not os.path.exists(path)
+    with open(path, 'a', encoding='utf-8') as f:
+        if is_new:
+            f.write(f"# Changelog archive - {year}\n\n"
+                    "Older weekly scraper runs, oldest first. Recent runs are in ../CHANGELOG.md.\n\n")
+        f.write(render_entry(run))
+
+
+def render_changelog(changelog_path=DEFAULT_CHANGELOG_PATH, recent=RECENT_RUNS):
+    """Rewrite CHANGELOG.md from the newest `recent` runs, newest first."""
+    runs_path, _ = _paths(changelog_path)
+    runs = tail_runs(runs_path, recent)
+    tmp_path = changelog_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(CHANGELOG_HEADER + ''.join(render_entry(run) for run in reversed(runs)))
+    os.replace(tmp_path, changelog_path)
+
+
+def record_run(week_urls, new_rows, skipped, changelog_path=DEFAULT_CHANGELOG_PATH, recent=RECENT_RUNS):
+    """Log a scraper run, archive the run it pushes out of the recent window, re-render CHANGELOG.md."""
+    runs_path, archive_dir = _paths(changelog_path)
+    append_run(make_run(week_urls, new_rows, skipped), runs_path)
+
+    window = tail_runs(runs_path, recent + 1)
+    if len(window) > recent:
+        _archive_run(window[0], archive_dir)
+
+    render_changelog(changelog_path, recent)
+
+
+def parse_changelog(text):
+    """Runs from a rendered CHANGELOG.md (newest first, as written) - used by migrate."""
+    runs = []
+    for section in re.split(r'^## Run: ', text, flags=re.MULTILINE)[1:]:
+        lines = section.splitlines()
+        run = {'date': lines[0].strip(), 'checked': [], 'added': [], 'skipped': 0}
+        current = None
+        for line in lines[1:]:
+            if line == 'Checked:':
+                current = run['checked']
+            elif line.startswith('Added'):
+                current = run['added']
+                count = re.match(r'Added \((\d+)\):', line)
+                if count:
+                    run['added_count'] = int(count.group(1))
+            elif line.startswith('Skipped as already tracked:'):
+                run['skipped'] = int(line.rsplit(':', 1)[1])
+                current = None
+            elif line.startswith('- ') and current is run['checked']:
+                current.append(line[2:])
+            elif line.startswith('- [') and current is run['added']:
+                airdate, title = re.match(r'- \[(.*?)\] (.*)', line).groups()
+                current.append({'airdate': airdate, 'title': title})
+        # Older entries were sometimes hand-trimmed; keep their stated count
+        if run.get('added_count') == len(run['added']):
+            del run['added_count']
+        runs.append(run)
+    return runs
+
+
+def migrate(changelog_path=DEFAULT_CHANGELOG_PATH):
+    """Seed changelog_runs.jsonl from an existing hand-rendered CHANGELOG.md."""
+    runs_path, _ = _paths(changelog_path)
+    if os.path.exists(runs_path):
+        print(f"{runs_path} already exists - not migrating")
+        return 0
+    with open(changelog_path, encoding='utf-8') as f:
+        runs = parse_changelog(f.read())
+    for run in reversed(runs):  # log is oldest first
+        append_run(run, runs_path)
+    print(f"✓ Migrated {len(runs)} run(s) into {runs_path}")
+    return len(runs)
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    opts = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+    command = args[0] if args else 'render'
+    if command == 'migrate':
+        migrate()
+    elif command == 'render':
+        render_changelog(recent=int(opts.get('recent', RECENT_RUNS)))
+    else:
+        print(__doc__)
+        sys.exit(1)
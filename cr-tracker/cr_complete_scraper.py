@@ -6,10 +6,22 @@ Fetches all episodes from the CR wiki and outputs to CSV
 
 import re
 import csv
+import glob
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from bs4 import BeautifulSoup
 
+# Headings that don't start a new content section - parse_all_episodes skips
+# them without resetting the current campaign, so a table after one of these
+# still belongs to the section above it.
+SKIPPED_HEADINGS = ['Contents', 'References', 'Art']
+
+# Read size for --stream mode
+STREAM_CHUNK_SIZE = 1 << 20
+
 def clean_text(text):
     """Remove wiki formatting artifacts like [edit], [1], etc."""
     if not text:
@@ -154,7 +166,7 @@ def parse_all_episodes(html_content):
             heading_text = clean_text(heading_text)
             
             # Skip non-content headings
-            if not heading_text or heading_text in ['Contents', 'References', 'Art']:
+            if not heading_text or heading_text in SKIPPED_HEADINGS:
                 continue
             
             # Parse context from heading
@@ -215,13 +227,172 @@ def parse_all_episodes(html_content):
     return episodes
 
 
-def save_to_csv(episodes, filename='cr_episodes.csv'):
+# Every <h2> starts an independent section: parse_all_episodes resets the
+# campaign/arc/show-type context at each one, so the document can be cut at
+# h2 boundaries and each piece parsed on its own without changing the result.
+_H2_BOUNDARY = re.compile(r'(?=<h2[\s>])', re.IGNORECASE)
+_H2_ELEMENT = re.compile(r'<h2[\s>].*?</h2\s*>', re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r'<[^>]+>')
+
+
+def _starts_new_section(chunk):
+    """Does this chunk open with an h2 that parse_all_episodes would treat as
+    a new section? (Skipped headings like "References" don't - the content
+    after them stays attached to the previous section.)"""
+    match = _H2_ELEMENT.match(chunk)
+    if not match:
+        return False
+    heading_text = clean_text(_TAG.sub('', match.group(0)).strip())
+    return bool(heading_text) and heading_text not in SKIPPED_HEADINGS
+
+
+def _merge_skipped_sections(chunks):
+    """Glue chunks that start with a skipped heading onto the chunk before them."""
+    pending = None
+    for chunk in chunks:
+        if pending is not None and not _starts_new_section(chunk):
+            pending += chunk
+            continue
+        if pending is not None:
+            yield pending
+        pending = chunk
+    if pending is not None:
+        yield pending
+
+
+def split_sections(html_content):
+    """Split a saved wiki page into independently parseable h2 sections, in
+    document order."""
+    chunks = (c for c in _H2_BOUNDARY.split(html_content) if c)
+    return list(_merge_skipped_sections(chunks))
+
+
+def iter_sections(f, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Streaming version of split_sections() for dumps too large to hold as one
+    tree: reads the file incrementally and yields one h2 section at a time,
+    so memory is bounded by the largest section rather than the whole page.
+    """
+    def raw_chunks():
+        buffer = ''
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            buffer += data
+            # Hold back everything from the last boundary on - that section
+            # may continue in the next read. (A boundary split across two
+            # reads just isn't found until the next one.)
+            boundaries = [m.start() for m in _H2_BOUNDARY.finditer(buffer) if m.start() > 0]
+            if boundaries:
+                cut = boundaries[-1]
+                yield from (c for c in _H2_BOUNDARY.split(buffer[:cut]) if c)
+                buffer = buffer[cut:]
+        if buffer:
+            yield buffer
+
+    return _merge_skipped_sections(raw_chunks())
+
+
+def parse_sections(sections, workers=None):
+    """
+    Parse sections (from split_sections or iter_sections) and merge their
+    episode lists in document order. With workers > 1, sections are parsed
+    in a ProcessPoolExecutor; otherwise serially, one section at a time.
+    """
+    episodes = []
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() yields results in submission order, i.e. document order
+            for section_episodes in pool.map(parse_all_episodes, sections):
+                episodes.extend(section_episodes)
+    else:
+        for section in sections:
+            episodes.extend(parse_all_episodes(section))
+    return episodes
+
+
+def episode_id(episode):
+    """Same {show_type}|{campaign}|{episode_number}|{title} key the main CSV uses"""
+    return f"{episode['show_type']}|{episode['campaign']}|{episode['episode_number']}|{episode['title']}"
+
+
+def find_html_files(targets):
+    """Expand directories (every .html/.htm inside) and glob patterns into a
+    sorted, de-duplicated list of saved wiki pages."""
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            for ext in ('*.html', '*.htm'):
+                paths.extend(glob.glob(os.path.join(target, ext)))
+        elif glob.has_magic(target):
+            paths.extend(glob.glob(target))
+        elif os.path.exists(target):
+            paths.append(target)
+        else:
+            print(f"Warning: {target} not found", file=sys.stderr)
+    return sorted(set(paths))
+
+
+def parse_file(path):
+    """Parse one saved page. Returns (path, episodes, seconds) for the batch report."""
+    started = time.perf_counter()
+    with open(path, 'r', encoding='utf-8') as f:
+        episodes = parse_sections(split_sections(f.read()))
+    return path, episodes, time.perf_counter() - started
+
+
+def parse_files(paths, workers=None):
+    """Parse many saved pages concurrently (one file per task), in input order."""
+    if workers and workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(parse_file, paths))
+    return [parse_file(path) for path in paths]
+
+
+def merge_episodes(results):
+    """
+    Merge per-file episode lists, keeping the first occurrence of each
+    episode_id (files are processed in sorted order, so the result doesn't
+    depend on which worker finished first). Returns (episodes, report) where
+    report is a list of (path, parsed, added, seconds).
+    """
+    seen = set()
+    merged = []
+    report = []
+    for path, episodes, seconds in results:
+        added = 0
+        for episode in episodes:
+            key = episode_id(episode)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append({'episode_id': key, **episode})
+            added += 1
+        report.append((path, len(episodes), added, seconds))
+    return merged, report
+
+
+def print_timing_report(report, wall_seconds):
+    print("\n" + "=" * 80)
+    print("PER-FILE REPORT")
+    print("=" * 80)
+    print(f"  {'file':40} {'parsed':>7} {'new':>6} {'seconds':>8}")
+    for path, parsed, added, seconds in report:
+        print(f"  {os.path.basename(path)[:40]:40} {parsed:7} {added:6} {seconds:8.2f}")
+    cpu_seconds = sum(seconds for _, _, _, seconds in report)
+    print(f"\n  {len(report)} files, {cpu_seconds:.2f}s parse time, {wall_seconds:.2f}s wall clock")
+
+
+def save_to_csv(episodes, filename='cr_episodes.csv', include_id=False):
     """Save episodes to CSV file"""
     
     fieldnames = [
         'show_type', 'campaign', 'arc', 'episode_number', 'title', 
         'airdate', 'vod_url', 'wiki_url', 'runtime', 'watched', 'notes'
     ]
+    if include_id:
+        fieldnames = ['episode_id'] + fieldnames
     
     with open(filename, 'w', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
@@ -284,26 +455,56 @@ def main():
 
 
 if __name__ == '__main__':
-    # If HTML file exists, parse it
-    import os
-    
-    if len(sys.argv) > 1:
-        html_file = sys.argv[1]
+    # --workers=N parses in N processes (h2 sections of a single page, or
+    # whole files in batch mode) - off by default, since starting a process
+    # pool costs more than parsing a typical page in-process; --stream reads
+    # a single page incrementally, one section at a time, for dumps too
+    # large to load whole; --output=FILE sets the CSV to write (default
+    # cr_episodes.csv)
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    options = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+    workers = int(options.get('workers', 1))
+    output = options.get('output', 'cr_episodes.csv')
+    stream = '--stream' in sys.argv
+
+    # A directory, a glob, or several files: batch mode over many saved pages
+    batch = len(args) > 1 or any(os.path.isdir(a) or glob.has_magic(a) for a in args)
+
+    if batch:
+        html_files = find_html_files(args)
+        if not html_files:
+            print(f"Error: no HTML files found in {' '.join(args)}")
+            sys.exit(1)
+
+        print(f"\nParsing {len(html_files)} files with {workers} worker(s)...")
+        started = time.perf_counter()
+        episodes, report = merge_episodes(parse_files(html_files, workers=workers))
+        wall_seconds = time.perf_counter() - started
+
+        print_timing_report(report, wall_seconds)
+        print_summary(episodes)
+        save_to_csv(episodes, output, include_id=True)
+    elif args:
+        html_file = args[0]
         if os.path.exists(html_file):
             print(f"\nParsing {html_file}...")
-            
-            with open(html_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            episodes = parse_all_episodes(html_content)
+
+            if stream:
+                with open(html_file, 'r', encoding='utf-8') as f:
+                    episodes = parse_sections(iter_sections(f))
+            else:
+                with open(html_file, 'r', encoding='utf-8') as f:
+                    html_content = f.read()
+                episodes = parse_sections(split_sections(html_content), workers=workers)
+
             print_summary(episodes)
-            save_to_csv(episodes)
-            
+            save_to_csv(episodes, output)
+
             print("\n" + "=" * 80)
             print("NEXT STEPS:")
             print("=" * 80)
-            print("""
-1. Import cr_episodes.csv to Google Sheets
+            print(f"""
+1. Import {output} to Google Sheets
 2. In Google Sheets, select the 'watched' column
 3. Format → Number → Checkbox (to make it a real checkbox)
 4. Start tracking your watched episodes!
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Shared load/save layer for cr_episodes_series_airdates.csv.
+
+Every writer (both merge_into_main_csv()s, fill_missing_data, update_canon,
+generate_beacon_urls --fill-main) goes through load_episodes() /
+save_episodes(). By default that's just the CSV, with two safeguards for
+scripts whose runs overlap (the weekly Action, a manual wiki_scraper.py, a
+long fill_missing_data.py):
+
+  - saves hold an advisory lock on <csv>.lock, so two writers never
+    interleave their check-and-write
+  - load_episodes() remembers the file's content hash and a copy of the rows.
+    If the file changed by save time, the pending row changes (what differs
+    from that copy) are rebased onto the current file instead of
+    overwriting it - the other writer's edits survive
+
+Set CR_TRACKER_DB to a SQLite path to keep the episodes in a database instead:
+
+  - episode_id has a unique index, (campaign, episode_number) and airdate
+    have secondary indexes
+  - save_episodes() UPSERTs only the rows a script actually changed, inside
+    one transaction, so two scripts that loaded at different times don't
+    undo each other's edits
+  - the CSV is regenerated from the database after every save, as an export
+    (sorted by airdate, empty airdates last - the order the merges write)
+
+The CSV stays the source of truth in git: if it changed since the database
+last exported it (a manual edit, a fresh checkout), load_episodes()
+re-imports it first.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:  # Windows - saves still rebase, just without the lock
+    HAS_FCNTL = False
+
+from search_index import update_search_index
+from watch_stats import update_watch_stats
+
+DB_ENV_VAR = 'CR_TRACKER_DB'
+
+# abspath -> {'hash': content hash at load, 'rows': {episode_id: row copy}},
+# for the most recent load_episodes() of each file in this process
+_snapshots = {}
+
+
+def db_path():
+    """SQLite path from CR_TRACKER_DB, or None to use the CSV directly."""
+    return os.environ.get(DB_ENV_VAR) or None
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def read_csv(main_csv, with_hash=False):
+    """(rows, fieldnames), plus the content hash of exactly the bytes parsed if with_hash."""
+    with open(main_csv, 'rb') as f:
+        data = f.read()
+    reader = csv.DictReader(io.StringIO(data.decode('utf-8'), newline=''))
+    rows = list(reader)
+    if with_hash:
+        return rows, reader.fieldnames, hashlib.sha256(data).hexdigest()
+    return rows, reader.fieldnames
+
+
+@contextmanager
+def csv_lock(main_csv):
+    """Exclusive advisory lock on <main_csv>.lock for the duration of a save."""
+    if not HAS_FCNTL:
+        yield
+        return
+    with open(main_csv + '.lock', 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_csv(main_csv, fieldnames, rows):
+    """Write the CSV via a temp file + rename, so readers never see a half-written file."""
+    tmp_path = main_csv + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, main_csv)
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+class EpisodeDB:
+    """The episodes table plus a meta table (CSV column order, last export hash)."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS episodes (
+                seq        INTEGER PRIMARY KEY,   -- insertion order, breaks airdate ties on export
+                episode_id TEXT NOT NULL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_episodes_episode_id ON episodes(episode_id);
+        """)
+        self.columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(episodes)")}
+
+    def get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+
+    def set_meta(self, key, value):
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    def fieldnames(self):
+        return json.loads(self.get_meta('fieldnames') or '[]')
+
+    def ensure_columns(self, fieldnames):
+        """Add a TEXT column for any CSV field the table doesn't have yet, and record the column order."""
+        for field in fieldnames:
+            if field not in self.columns:
+                self.conn.execute(f"ALTER TABLE episodes ADD COLUMN {_quote(field)} TEXT NOT NULL DEFAULT ''")
+                self.columns.add(field)
+        # Secondary indexes, once the columns they cover exist
+        if {'campaign', 'episode_number'} <= self.columns:
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_episodes_campaign_ep ON episodes(campaign, episode_number)")
+        if 'airdate' in self.columns:
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_episodes_airdate ON episodes(airdate)")
+        self.set_meta('fieldnames', json.dumps(list(fieldnames)))
+
+    def import_csv(self, main_csv):
+        """Replace the table contents with the CSV (in file order)."""
+        rows, fieldnames, content_hash = read_csv(main_csv, with_hash=True)
+        seen = set()
+        for row in rows:
+            if row['episode_id'] in seen:
+                raise ValueError(f"{main_csv} has duplicate episode_id {row['episode_id']!r} - "
+                                 f"run validate_data.py and fix it before importing")
+            seen.add(row['episode_id'])
+        with self.conn:
+            self.conn.execute("DELETE FROM episodes")
+            self.ensure_columns(fieldnames)
+            self._upsert(rows, fieldnames)
+            self.set_meta('csv_hash', content_hash)
+
+    def _upsert(self, rows, fieldnames):
+        columns = ', '.join(_quote(f) for f in fieldnames)
+        placeholders = ', '.join('?' * len(fieldnames))
+        updates = ', '.join(f"{_quote(f)} = excluded.{_quote(f)}" for f in fieldnames if f != 'episode_id')
+        self.conn.executemany(
+            f"INSERT INTO episodes ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT(episode_id) DO UPDATE SET {updates}",
+            [tuple(row.get(f) or '' for f in fieldnames) for row in rows]
+        )
+
+    def save(self, fieldnames, rows, renamed_ids=None):
+        """
+        One transaction: apply episode_id renames (keeping each row's seq),
+        then UPSERT rows. If another writer already created the new id, the
+        old row is dropped and the UPSERT updates that one instead - same as
+        rebase() does in CSV mode.
+        """
+        with self.conn:
+            self.ensure_columns(fieldnames)
+            for old_id, new_id in (renamed_ids or {}).items():
+                if self.conn.execute("SELECT 1 FROM episodes WHERE episode_id = ?", (new_id,)).fetchone():
+                    self.conn.execute("DELETE FROM episodes WHERE episode_id = ?", (old_id,))
+                else:
+                    self.conn.execute("UPDATE episodes SET episode_id = ? WHERE episode_id = ?", (new_id, old_id))
+            self._upsert(rows, fieldnames)
+
+    def all_rows(self):
+        fieldnames = self.fieldnames()
+        columns = ', '.join(_quote(f) for f in fieldnames)
+        cursor = self.conn.execute(
+            f"SELECT {columns} FROM episodes "
+            f"ORDER BY CASE WHEN airdate = '' THEN '9999-99-99' ELSE airdate END, seq"
+        )
+        return [dict(row) for row in cursor], fieldnames
+
+    def find(self, campaign, episode_number):
+        """Rows for one (campaign, episode_number) - an indexed lookup."""
+        cursor = self.conn.execute(
+            "SELECT * FROM episodes WHERE campaign = ? AND episode_number = ?", (campaign, episode_number))
+        return [dict(row) for row in cursor]
+
+    def export_csv(self, main_csv):
+        rows, fieldnames = self.all_rows()
+        write_csv(main_csv, fieldnames, rows)
+        with self.conn:
+            self.set_meta('csv_hash', _file_hash(main_csv))
+
+    def close(self):
+        self.conn.close()
+
+
+def open_db(main_csv, path=None):
+    """Open the store, re-importing the CSV if it changed since the last export."""
+    db = EpisodeDB(path or db_path())
+    if os.path.exists(main_csv) and db.get_meta('csv_hash') != _file_hash(main_csv):
+        db.import_csv(main_csv)
+    return db
+
+
+def _remember(main_csv, rows, content_hash):
+    _snapshots[os.path.abspath(main_csv)] = {
+        'hash': content_hash,
+        'rows': {row['episode_id']: dict(row) for row in rows},
+    }
+
+
+def load_episodes(main_csv):
+    """(rows, fieldnames) - from the SQLite store if CR_TRACKER_DB is set, else the CSV."""
+    if not db_path():
+        rows, fieldnames, content_hash = read_csv(main_csv, with_hash=True)
+        _remember(main_csv, rows, content_hash)
+        return rows, fieldnames
+    db = open_db(main_csv)
+    try:
+        rows, fieldnames = db.all_rows()
+        _remember(main_csv, rows, db.get_meta('csv_hash'))
+        return rows, fieldnames
+    finally:
+        db.close()
+
+
+def pending_changes(rows, base_rows, renamed_ids=None):
+    """Rows that are new or differ from their copy at load time."""
+    old_ids = {new: old for old, new in (renamed_ids or {}).items()}
+    return [row for row in rows
+            if base_rows.get(old_ids.get(row['episode_id'], row['episode_id'])) != row]
+
+
+def _airdate_key(row):
+    return row.get('airdate') or '9999-99-99'
+
+
+def rebase(current_rows, base_rows, changed_rows, renamed_ids=None):
+    """
+    Apply a writer's changes onto the file as it is now.
+
+    For each changed row, only the fields that differ from the writer's
+    copy at load time are applied, so another writer's edits to other
+    fields of the same row survive (a field both changed goes to this
+    writer). Rows this writer added are appended unless someone else added
+    the same episode_id meanwhile, in which case it's treated as an update;
+    likewise a rename onto an id another writer already created updates
+    that row and drops the old one.
+    Returns (rows sorted by airdate like the merges write them, applied
+    count, list of episode_ids that no longer exist and were dropped).
+    """
+    old_ids = {new: old for old, new in (renamed_ids or {}).items()}
+    current_by_id = {row['episode_id']: row for row in current_rows}
+    merged = list(current_rows)
+    applied = 0
+    dropped = []
+
+    for row in changed_rows:
+        new_id = row['episode_id']
+        old_id = old_ids.get(new_id, new_id)
+        base = base_rows.get(old_id)
+        target = current_by_id.get(old_id) or current_by_id.get(new_id)
+        if old_id != new_id and old_id in current_by_id and new_id in current_by_id:
+            merged.remove(current_by_id.pop(old_id))
+            target = current_by_id[new_id]
+
+        if target is None:
+            if base is not None:
+                dropped.append(old_id)  # renamed/removed by the other writer
+                continue
+            target = dict(row)
+            merged.append(target)
+        else:
+            target.update({k: v for k, v in row.items() if base is None or base.get(k) != v})
+        current_by_id[new_id] = target
+        applied += 1
+
+    merged.sort(key=_airdate_key)
+    return merged, applied, dropped
+
+
+def save_episodes(main_csv, fieldnames, rows, changed_rows=None, renamed_ids=None):
+    """
+    Persist a writer's changes.
+
+    rows is the full, ordered row list. changed_rows is the subset the
+    caller added or modified (worked out by diffing against the rows
+    load_episodes() returned if not given). renamed_ids maps old -> new
+    episode_id for rows whose id changed (e.g. a wiki placeholder getting
+    its real title), so the rename updates the row instead of duplicating it.
+
+    CSV mode writes rows as-is if the file is unchanged since it was loaded,
+    and otherwise rebases changed_rows onto the current file. SQLite mode
+    UPSERTs changed_rows and re-exports the CSV.
+    """
+    snapshot = _snapshots.get(os.path.abspath(main_csv))
+    if changed_rows is None and snapshot is not None:
+        changed_rows = pending_changes(rows, snapshot['rows'], renamed_ids)
+
+    path = db_path()
+    with csv_lock(main_csv):
+        if path:
+            db = open_db(main_csv, path)
+            try:
+                db.save(fieldnames, rows if changed_rows is None else changed_rows, renamed_ids)
+                db.export_csv(main_csv)
+            finally:
+                db.close()
+        elif snapshot is None or not os.path.exists(main_csv) or _file_hash(main_csv) == snapshot['hash']:
+            write_csv(main_csv, fieldnames, rows)
+        else:
+            current_rows, current_fields = read_csv(main_csv)
+            merged, applied, dropped = rebase(current_rows, snapshot['rows'], changed_rows or [], renamed_ids)
+            print(f"⚠️  {main_csv} changed since it was loaded - rebased {applied} row change(s) onto it")
+            for episode_id in dropped:
+                print(f"  ✗ {episode_id}: no longer in the file, change dropped")
+            write_csv(main_csv, current_fields + [f for f in fieldnames if f not in current_fields], merged)
+    update_search_index(main_csv)
+    update_watch_stats(main_csv)
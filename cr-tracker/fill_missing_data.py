@@ -3,13 +3,14 @@
 Fill missing VOD URLs and runtimes by scraping individual episode wiki pages
 """
 
-import csv
 import re
 import sys
 import time
 from datetime import datetime
 from bs4 import BeautifulSoup
 
+from episode_store import load_episodes, save_episodes
+
 # Try Playwright first, fall back to requests
 USE_PLAYWRIGHT = True
 try:
@@ -116,9 +117,7 @@ def find_episodes_missing_data(csv_file):
     missing_vod = []
     missing_runtime = []
 
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
+    rows, _ = load_episodes(csv_file)
 
     for i, row in enumerate(rows):
         show_type = row.get('show_type', '')
@@ -156,12 +155,9 @@ def find_episodes_missing_data(csv_file):
     return missing_vod, missing_runtime, rows
 
 
-def update_csv(rows, fieldnames, csv_file):
-    """Write updated rows back to CSV"""
-    with open(csv_file, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+def update_csv(rows, fieldnames, csv_file, changed_rows=None):
+    """Write updated rows back to CSV (only changed_rows are UPSERTed with CR_TRACKER_DB set)"""
+    save_episodes(csv_file, fieldnames, rows, changed_rows=changed_rows)
 
 
 def main():
@@ -179,11 +175,8 @@ def main():
     print()
 
     # Load CSV and get fieldnames
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-
     missing_vod, missing_runtime, rows = find_episodes_missing_data(csv_file)
+    fieldnames = list(rows[0].keys()) if rows else []
 
     # Combine and deduplicate episodes to fetch
     episodes_to_fetch = {}
@@ -208,6 +201,7 @@ def main():
     updated_vod = 0
     updated_runtime = 0
     failed = 0
+    changed_rows = []
 
     for i, data in sorted(episodes_to_fetch.items()):
         row = data['row']
@@ -226,6 +220,7 @@ def main():
                     print(f"  ✓ Found VOD: {youtube_url}")
                     if not dry_run:
                         rows[i]['vod_url'] = youtube_url
+                        changed_rows.append(rows[i])
                     updated_vod += 1
                 else:
                     print(f"  - No VOD URL found")
@@ -236,6 +231,7 @@ def main():
                     print(f"  ✓ Found runtime: {runtime}")
                     if not dry_run:
                         rows[i]['runtime'] = runtime
+                        changed_rows.append(rows[i])
                     updated_runtime += 1
                 else:
                     print(f"  - No runtime found")
@@ -256,7 +252,7 @@ def main():
     print(f"Failed fetches: {failed}")
 
     if not dry_run and (updated_vod > 0 or updated_runtime > 0):
-        update_csv(rows, fieldnames, csv_file)
+        update_csv(rows, fieldnames, csv_file, changed_rows=changed_rows)
         print(f"\n✓ Updated {csv_file}")
     elif dry_run:
         print("\nDry run complete - no changes saved")
@@ -1,10 +1,39 @@
 #!/usr/bin/env python3
 """
 Generate Beacon URLs for Critical Role Cooldown episodes based on observed patterns
+
+Usage:
+  python3 generate_beacon_urls.py
+      Read beacon_links_needed.csv, write beacon_links_generated.csv
+  python3 generate_beacon_urls.py --fill-main [csv_path] [--verify] [--verify-base=URL] [--workers=N] [--dry-run]
+      Fill vod_url in place (default: cr_episodes_series_airdates.csv) for every
+      cooldown still pointing at the generic https://www.beacon.tv placeholder.
+      Generated URLs are guesses, so only verified ones are written: --verify
+      HEAD-checks each generated URL concurrently and fills the ones that
+      resolve; --verify-base checks against a local stand-in (e.g.
+      http://localhost:8000) instead of beacon.tv. Without either, nothing is
+      written and the guesses are only listed.
 """
 
 import csv
+import os
 import re
+import string
+import sys
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from episode_store import load_episodes, save_episodes
+
+BASE_URL = "https://beacon.tv/content/"
+PLACEHOLDER_VOD_URL = 'https://www.beacon.tv'
+DEFAULT_MAIN_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cr_episodes_series_airdates.csv')
+VERIFY_WORKERS = 8
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+}
 
 def slugify(text):
     """Convert text to URL-friendly slug"""
@@ -16,88 +45,218 @@ def slugify(text):
     text = re.sub(r'-+', '-', text)
     return text.strip('-')
 
+# Slug rules observed on beacon.tv, tried in order - first match wins.
+# Each rule is (name, {field: regex}, template). Every regex must search()
+# its field (series / episode_number / title / airdate) for the rule to
+# match; named groups become template fields, alongside the raw fields and
+# the derived slugs in _DERIVED_FIELDS. Templates are relative to BASE_URL.
+#
+#   Campaign 3:           3-83-cr-cooldown-c3-e83
+#   Campaign 4:           cr-cooldown-c4-e001
+#   Age of Umbra:         age-of-umbra-cooldown-e1
+#   Wildemount Wildlings: wildemount-wildings-cooldown-e1  ("Wildings", not "Wildlings")
+#   Thresher:             thresher-cooldown-e1
+#   ExU Divergence:       exu-cooldown-divergence-e1
+#   Specials:             [descriptive-slug]
+BEACON_URL_RULES = [
+    ('Campaign 3', {'episode_number': r'^C3x(?P<ep>.*)$'}, '3-{ep}-cr-cooldown-c3-e{ep}'),
+    ('Campaign 4', {'episode_number': r'^C4x(?P<ep>.*)$'}, 'cr-cooldown-c4-e{ep:0>3}'),
+    ('Age of Umbra', {'series': r'^Age of Umbra$', 'episode_number': r'^(?P<ep>\d+)$'},
+     'age-of-umbra-cooldown-e{ep}'),
+    ('Wildemount Wildlings', {'series': r'Wildemount Wildlings', 'episode_number': r'^(?P<ep>\d+)$'},
+     'wildemount-wildings-cooldown-e{ep}'),
+    ('Thresher', {'series': r'^Thresher$', 'episode_number': r'^(?P<ep>\d+)$'}, 'thresher-cooldown-e{ep}'),
+    ('ExU Divergence', {'episode_number': r'E4x(?P<ep>.*)$', 'title': r'Divergence'},
+     'exu-cooldown-divergence-e{ep}'),
+
+    # Special cases - Daggerheart
+    ('Special', {'title': r'Menagerie Returns'},
+     'daggerheart-cooldown-the-menagerie-returns-live-one-shot-open-beta'),
+    ('Special', {'title': r'M[ée]nagerie a Trois'}, 'cr-cooldown-dh-03-menagerie-a-trois'),
+    # Candela Obscura Live
+    ('Special', {'title': r'^(?=.*Candela)(?=.*Silver Screen)'},
+     'candela-obscura-cooldown-candela-obscura-live-the-circle-of-the-silver-screen'),
+    # Jester and Fjord's Wedding
+    ('Special', {'title': r"Jester and Fjord|Fjord's Wedding"},
+     'cr-cooldown-jester-and-fjords-wedding-live-from-radio-city-music-hall'),
+
+    # Inside The Mighty Nein - specific patterns based on episode ranges
+    ('Inside The Mighty Nein', {'series': r'^Inside The Mighty Nein$', 'title': r'Premiere Cocktail Party'},
+     'inside-the-mighty-nein-premiere-cocktail-party'),
+    ('Inside The Mighty Nein', {'series': r'^Inside The Mighty Nein$', 'episode_number': r'1-5'},
+     'inside-the-mighty-nein-episodes-1-5'),
+    ('Inside The Mighty Nein', {'series': r'^Inside The Mighty Nein$', 'title': r'Episodes 1-5'},
+     'inside-the-mighty-nein-episodes-1-5'),
+    ('Inside The Mighty Nein', {'series': r'^Inside The Mighty Nein$', 'episode_number': r'6-8'},
+     'inside-the-mighty-nein-episodes-6-8'),
+    ('Inside The Mighty Nein', {'series': r'^Inside The Mighty Nein$', 'title': r'Episodes 6-8'},
+     'inside-the-mighty-nein-episodes-6-8'),
+    # Generic pattern for future episodes
+    ('Inside The Mighty Nein', {'series': r'^Inside The Mighty Nein$'}, '{title_slug}'),
+
+    # Generic specials (no plain episode number) - slug from the title
+    ('Other/Special', {'episode_number': r'^(?!\d+$)'}, 'cr-cooldown-{special_slug}'),
+    # Other series - generic pattern
+    ('Other/Special', {}, '{series_slug}-cooldown-e{episode_number}'),
+]
+
+# Template fields computed from the row, only when a matching rule uses them
+_DERIVED_FIELDS = {
+    'series_slug': lambda f: slugify(f['series']),
+    'title_slug': lambda f: slugify(f['title']),
+    'special_slug': lambda f: slugify(f['title'].replace('Cooldown:', '').replace('(Special)', '').strip()),
+}
+
+
+def compile_rules(rules=BEACON_URL_RULES):
+    """Compile the rule table once: regexes plus the derived fields each template needs."""
+    compiled = []
+    for name, conditions, template in rules:
+        patterns = [(field, re.compile(pattern)) for field, pattern in conditions.items()]
+        used = {field for _, field, _, _ in string.Formatter().parse(template) if field}
+        derived = [field for field in _DERIVED_FIELDS if field in used]
+        compiled.append((name, patterns, BASE_URL + template, derived))
+    return compiled
+
+
+_COMPILED_RULES = compile_rules()
+
+
+def match_beacon_rule(series, episode_number, title, airdate, rules=None):
+    """(rule name, generated URL) for the first rule that matches this episode."""
+    fields = {'series': series, 'episode_number': episode_number, 'title': title, 'airdate': airdate}
+    for name, patterns, template, derived in rules or _COMPILED_RULES:
+        groups = {}
+        for field, pattern in patterns:
+            match = pattern.search(fields[field])
+            if not match:
+                break
+            groups.update(match.groupdict())
+        else:
+            values = dict(fields, **groups)
+            for field in derived:
+                values[field] = _DERIVED_FIELDS[field](fields)
+            return name, template.format(**values)
+    return None, None
+
+
 def generate_beacon_url(series, episode_number, title, airdate):
+    """Generate Beacon URL based on the patterns in BEACON_URL_RULES"""
+    return match_beacon_rule(series, episode_number, title, airdate)[1]
+
+
+def cooldown_series(row, known_series=()):
     """
-    Generate Beacon URL based on patterns observed:
-
-    Campaign 3: https://beacon.tv/content/3-83-cr-cooldown-c3-e83
-    Campaign 4: https://beacon.tv/content/cr-cooldown-c4-e001
-    Age of Umbra: https://beacon.tv/content/age-of-umbra-cooldown-e1
-    Wildemount Wildlings: https://beacon.tv/content/wildemount-wildings-cooldown-e1
-    Thresher: https://beacon.tv/content/thresher-cooldown-e1
-    ExU Divergence: https://beacon.tv/content/exu-cooldown-divergence-e1
-    Specials: https://beacon.tv/content/[descriptive-slug]
+    Series a main-CSV cooldown row belongs to. Cooldowns are stored with
+    campaign='Critical Role Cooldown' and the parent series in arc; rows the
+    Beacon scraper added via the generic fallback have no arc, but their title
+    is "Critical Role Cooldown | <Series> | Episode N".
+
+    Sub-series are written "<Parent>: <Series>" in titles but stored by their
+    own name in arc (e.g. "Age of Umbra: Sallowlands" vs arc "Sallowlands"),
+    so a "<Parent>: <Series>" name collapses to <Series> when that is one of
+    known_series. Every row of one series then gets the same URL slug.
     """
+    series = row.get('arc', '')
+    if not series:
+        segments = [s.strip() for s in row.get('title', '').split('|')]
+        if len(segments) >= 3 and segments[0] == 'Critical Role Cooldown':
+            series = segments[1]
+    if ': ' in series:
+        sub_series = series.rsplit(': ', 1)[1]
+        if sub_series in known_series:
+            return sub_series
+    return series
 
-    base_url = "https://beacon.tv/content/"
 
-    # Campaign 3 cooldowns - pattern: 3-{ep}-cr-cooldown-c3-e{ep}
-    if 'C3x' in episode_number and episode_number.startswith('C3x'):
-        ep_num = episode_number.replace('C3x', '')
-        return f"{base_url}3-{ep_num}-cr-cooldown-c3-e{ep_num}"
+def head_ok(url, timeout=15):
+    """True if url resolves (2xx/3xx). Falls back to GET for servers that reject HEAD."""
+    for method in ('HEAD', 'GET'):
+        req = urllib.request.Request(url, headers=HEADERS, method=method)
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                return resp.status < 400
+        except urllib.error.HTTPError as e:
+            if e.code != 405:
+                return False
+        except (urllib.error.URLError, OSError):
+            return False
+    return False
 
-    # Campaign 4 cooldowns - pattern: cr-cooldown-c4-e{ep:03d}
-    if 'C4x' in episode_number and episode_number.startswith('C4x'):
-        ep_num = episode_number.replace('C4x', '')
-        ep_num_padded = ep_num.zfill(3)  # Pad to 3 digits
-        return f"{base_url}cr-cooldown-c4-e{ep_num_padded}"
 
-    # Age of Umbra - pattern: age-of-umbra-cooldown-e{ep}
-    if series == 'Age of Umbra' and episode_number.isdigit():
-        return f"{base_url}age-of-umbra-cooldown-e{episode_number}"
+def verify_urls(urls, verify_base=None, workers=VERIFY_WORKERS, check=head_ok):
+    """
+    Check URLs concurrently; returns {url: bool}. With verify_base, each
+    https://beacon.tv URL is checked against that host instead (same path),
+    so a local stand-in can be used without hitting beacon.tv.
+    """
+    urls = list(dict.fromkeys(urls))
 
-    # Wildemount Wildlings - pattern: wildemount-wildings-cooldown-e{ep}
-    # Note: "Wildings" not "Wildlings" in URL
-    if 'Wildemount Wildlings' in series and episode_number.isdigit():
-        return f"{base_url}wildemount-wildings-cooldown-e{episode_number}"
+    def target(url):
+        if verify_base:
+            return verify_base.rstrip('/') + url[len('https://beacon.tv'):]
+        return url
 
-    # Thresher - pattern: thresher-cooldown-e{ep}
-    if series == 'Thresher' and episode_number.isdigit():
-        return f"{base_url}thresher-cooldown-e{episode_number}"
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda u: check(target(u)), urls)
+        return dict(zip(urls, results))
 
-    # ExU Divergence - pattern: exu-cooldown-divergence-e{ep}
-    if 'E4x' in episode_number and 'Divergence' in title:
-        ep_num = episode_number.replace('E4x', '')
-        return f"{base_url}exu-cooldown-divergence-e{ep_num}"
 
-    # Special cases - Daggerheart
-    if 'Menagerie Returns' in title:
-        return f"{base_url}daggerheart-cooldown-the-menagerie-returns-live-one-shot-open-beta"
+def fill_main_csv(main_csv=DEFAULT_MAIN_CSV, verify=False, verify_base=None, workers=VERIFY_WORKERS,
+                  dry_run=False, check=head_ok):
+    """
+    Fill vod_url in the main CSV for every cooldown still on the generic
+    Beacon placeholder. Generated URLs are guesses, so only ones that pass
+    verification are written; without verify every URL is reported as
+    unverified and the CSV is left alone. Saves (via episode_store) only if
+    at least one URL was filled. Returns (filled, unverified) lists of
+    (row, url) pairs.
+    """
+    rows, fieldnames = load_episodes(main_csv)
+    cooldowns = [row for row in rows if row.get('campaign') == 'Critical Role Cooldown']
+    known_series = {row['arc'] for row in cooldowns if row.get('arc')}
 
-    if 'Ménagerie a Trois' in title or 'Menagerie a Trois' in title:
-        return f"{base_url}cr-cooldown-dh-03-menagerie-a-trois"
+    pending = []
+    for row in cooldowns:
+        if row.get('vod_url', '').rstrip('/') != PLACEHOLDER_VOD_URL:
+            continue
+        url = generate_beacon_url(cooldown_series(row, known_series), row.get('episode_number', ''),
+                                  row.get('title', ''), row.get('airdate', ''))
+        pending.append((row, url))
 
-    # Candela Obscura Live
-    if 'Candela' in title and 'Silver Screen' in title:
-        return f"{base_url}candela-obscura-cooldown-candela-obscura-live-the-circle-of-the-silver-screen"
+    if not verify:
+        for row, url in pending:
+            print(f"  ? {row.get('episode_number') or '-':10} → {url}")
+        print(f"\n{len(pending)} cooldown URL(s) generated but not verified - nothing written. "
+              f"Rerun with --verify (or --verify-base=URL) to fill the ones that resolve.")
+        return [], pending
 
-    # Jester and Fjord's Wedding
-    if 'Jester and Fjord' in title or "Fjord's Wedding" in title:
-        return f"{base_url}cr-cooldown-jester-and-fjords-wedding-live-from-radio-city-music-hall"
+    unverified = []
+    if pending:
+        print(f"Verifying {len(pending)} URLs ({workers} at a time)...")
+        ok = verify_urls([url for _, url in pending], verify_base, workers, check)
+        unverified = [(row, url) for row, url in pending if not ok[url]]
+        pending = [(row, url) for row, url in pending if ok[url]]
 
-    # Inside The Mighty Nein - specific patterns based on episode ranges
-    if series == 'Inside The Mighty Nein':
-        if 'Premiere Cocktail Party' in title:
-            return f"{base_url}inside-the-mighty-nein-premiere-cocktail-party"
-        elif '1-5' in episode_number or 'Episodes 1-5' in title:
-            return f"{base_url}inside-the-mighty-nein-episodes-1-5"
-        elif '6-8' in episode_number or 'Episodes 6-8' in title:
-            return f"{base_url}inside-the-mighty-nein-episodes-6-8"
-        else:
-            # Generic pattern for future episodes
-            slug = slugify(title)
-            return f"{base_url}{slug}"
+    for row, url in pending:
+        print(f"  {row.get('episode_number') or '-':10} → {url}")
+    for row, url in unverified:
+        print(f"  ✗ {row.get('title')}: {url} didn't resolve - left as placeholder")
 
-    # Generic specials - try to create a reasonable slug from title
-    if 'Special' in episode_number or not episode_number.isdigit():
-        # Extract the meaningful part of the title
-        title_clean = title.replace('Cooldown:', '').replace('(Special)', '').strip()
-        slug = slugify(title_clean)
-        return f"{base_url}cr-cooldown-{slug}"
+    if dry_run:
+        print(f"\nDry run: would fill {len(pending)} cooldown URL(s)")
+        return pending, unverified
+    if not pending:
+        print("\nNo cooldown URLs to fill")
+        return pending, unverified
+
+    for row, url in pending:
+        row['vod_url'] = url
+    save_episodes(main_csv, fieldnames, rows, changed_rows=[row for row, _ in pending])
+
+    print(f"\n✓ Filled {len(pending)} cooldown URL(s) in {main_csv}")
+    return pending, unverified
 
-    # Other series - generic pattern
-    series_slug = slugify(series)
-    return f"{base_url}{series_slug}-cooldown-e{episode_number}"
 
 def main():
     """Read beacon_links_needed.csv and generate URLs"""
@@ -110,15 +269,13 @@ def main():
         rows = list(reader)
 
     # Generate URLs for each row
+    patterns = {}
     for row in rows:
-        series = row['series']
-        episode_number = row['episode_number']
-        title = row['title']
-        airdate = row['airdate']
-
-        generated_url = generate_beacon_url(series, episode_number, title, airdate)
+        rule_name, generated_url = match_beacon_rule(row['series'], row['episode_number'],
+                                                     row['title'], row['airdate'])
         row['generated_url'] = generated_url
         row['manual_check'] = ''  # Column for marking if URL needs verification
+        patterns[rule_name] = patterns.get(rule_name, 0) + 1
 
     # Write output
     fieldnames = ['series', 'episode_number', 'title', 'airdate', 'current_url', 'generated_url', 'manual_check']
@@ -136,25 +293,19 @@ def main():
 
     # Count by pattern type
     print("\nPattern breakdown:")
-    patterns = {}
-    for row in rows:
-        if 'C3x' in row['episode_number']:
-            patterns['Campaign 3'] = patterns.get('Campaign 3', 0) + 1
-        elif 'C4x' in row['episode_number']:
-            patterns['Campaign 4'] = patterns.get('Campaign 4', 0) + 1
-        elif row['series'] == 'Age of Umbra':
-            patterns['Age of Umbra'] = patterns.get('Age of Umbra', 0) + 1
-        elif 'Wildemount' in row['series']:
-            patterns['Wildemount Wildlings'] = patterns.get('Wildemount Wildlings', 0) + 1
-        elif row['series'] == 'Thresher':
-            patterns['Thresher'] = patterns.get('Thresher', 0) + 1
-        elif 'E4x' in row['episode_number']:
-            patterns['ExU Divergence'] = patterns.get('ExU Divergence', 0) + 1
-        else:
-            patterns['Other/Special'] = patterns.get('Other/Special', 0) + 1
-
     for pattern, count in sorted(patterns.items()):
         print(f"  {pattern:25}: {count:3} episodes")
 
 if __name__ == '__main__':
-    main()
+    if '--fill-main' in sys.argv:
+        args = [a for a in sys.argv[1:] if not a.startswith('--')]
+        opts = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+        fill_main_csv(
+            args[0] if args else DEFAULT_MAIN_CSV,
+            verify='--verify' in sys.argv or 'verify-base' in opts,
+            verify_base=opts.get('verify-base'),
+            workers=int(opts.get('workers', VERIFY_WORKERS)),
+            dry_run='--dry-run' in sys.argv,
+        )
+    else:
+        main()
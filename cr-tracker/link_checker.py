@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Check that the vod_url / wiki_url links in the tracker CSV still resolve.
+
+Every URL is requested concurrently through one asyncio event loop (HEAD,
+falling back to GET for servers that reject HEAD), with a cap on total
+in-flight requests and a smaller per-host cap so YouTube / the wiki / Beacon
+don't see a burst from us. Results are cached in a small SQLite file with a
+TTL, so a re-run only touches URLs that haven't been checked recently - live
+links are trusted for a week, anything else is retried after a day, and
+timeouts aren't cached at all.
+
+A link is dead only if it returns 404/410 or its host doesn't answer at all.
+Timeouts are reported separately as unknown - a slow host says nothing about
+whether the page is still there.
+
+Uses aiohttp if it's installed; otherwise falls back to urllib requests run
+in worker threads (same concurrency limits, just heavier per request).
+
+Usage:
+  python3 link_checker.py [csv_path] [--per-host=N] [--concurrency=N] [--refresh]
+"""
+
+import asyncio
+import csv
+import os
+import socket
+import sqlite3
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+try:
+    import aiohttp
+    USE_AIOHTTP = True
+except ImportError:
+    USE_AIOHTTP = False
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'link_check_cache.sqlite')
+
+LINK_FIELDS = ['vod_url', 'wiki_url']
+PLACEHOLDER_URLS = {'https://www.beacon.tv'}
+
+CONCURRENCY = 32
+PER_HOST_CONCURRENCY = 4
+TIMEOUT = 15
+OK_TTL = 7 * 24 * 3600     # re-verify live links weekly
+FAILED_TTL = 24 * 3600     # retry dead/blocked links daily
+
+# Only these count as dead - 401/403/429 etc. mean "we got bot-blocked",
+# which says nothing about whether the episode page still exists.
+DEAD_STATUSES = {404, 410}
+# Stored as the error of a check that got no answer in time (see is_timed_out)
+TIMEOUT_ERROR = 'timed out'
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+}
+
+
+class LinkCache:
+    """SQLite-backed {url: last check result} with per-outcome TTLs."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS link_checks (
+                url        TEXT PRIMARY KEY,
+                status     INTEGER,
+                ok         INTEGER NOT NULL,
+                error      TEXT,
+                checked_at REAL NOT NULL
+            )
+        """)
+
+    def fresh(self, urls, now=None, ok_ttl=OK_TTL, failed_ttl=FAILED_TTL):
+        """Cached results for urls that are still within their TTL, as {url: result}."""
+        now = now or time.time()
+        urls = list(urls)
+        results = {}
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(urls), 500):
+            chunk = urls[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for url, status, ok, error, checked_at in self.conn.execute(
+                f"SELECT url, status, ok, error, checked_at FROM link_checks WHERE url IN ({placeholders})", chunk
+            ):
+                ttl = ok_ttl if ok else failed_ttl
+                if now - checked_at < ttl:
+                    results[url] = {'status': status, 'ok': bool(ok), 'error': error, 'cached': True}
+        return results
+
+    def store(self, results, now=None):
+        """Cache results - except timeouts, which verified nothing and are rechecked next run."""
+        now = now or time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO link_checks (url, status, ok, error, checked_at) VALUES (?, ?, ?, ?, ?)",
+            [(url, r['status'], int(r['ok']), r['error'], now) for url, r in results.items()
+             if not is_timed_out(r)]
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def _result(status=None, error=None):
+    return {'status': status, 'ok': status is not None and status < 400, 'error': error, 'cached': False}
+
+
+def is_timed_out(result):
+    """No answer within the timeout - unknown, neither live nor dead."""
+    return not result['ok'] and result['status'] is None and result['error'] == TIMEOUT_ERROR
+
+
+def is_dead(result):
+    """Definitely gone (404/410, or the host doesn't answer at all) - not just bot-blocked or slow."""
+    if result['ok'] or is_timed_out(result):
+        return False
+    return result['status'] in DEAD_STATUSES or result['status'] is None
+
+
+def _urllib_check(url, timeout=TIMEOUT):
+    """Blocking HEAD (then GET on 405) - run in a worker thread by the fallback path."""
+    for method in ('HEAD', 'GET'):
+        req = urllib.request.Request(url, headers=HEADERS, method=method)
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                return _result(resp.status)
+        except urllib.error.HTTPError as e:
+            if e.code != 405 or method == 'GET':
+                return _result(e.code)
+        except socket.timeout:
+            return _result(error=TIMEOUT_ERROR)
+        except (urllib.error.URLError, OSError) as e:
+            reason = getattr(e, 'reason', e)
+            if isinstance(reason, socket.timeout):
+                return _result(error=TIMEOUT_ERROR)
+            return _result(error=str(reason))
+    return _result(error='no response')
+
+
+async def _aiohttp_check(session, url):
+    try:
+        async with session.head(url, allow_redirects=True) as resp:
+            if resp.status != 405:
+                return _result(resp.status)
+        async with session.get(url, allow_redirects=True) as resp:
+            return _result(resp.status)
+    except asyncio.TimeoutError:
+        return _result(error=TIMEOUT_ERROR)
+    except aiohttp.ClientError as e:
+        return _result(error=str(e) or type(e).__name__)
+
+
+async def _check_all(urls, concurrency, per_host, timeout):
+    host_limits = {}
+    overall = asyncio.Semaphore(concurrency)
+
+    def host_limit(url):
+        host = urlparse(url).netloc
+        if host not in host_limits:
+            host_limits[host] = asyncio.Semaphore(per_host)
+        return host_limits[host]
+
+    async def run(url, check):
+        async with host_limit(url), overall:
+            return url, await check(url)
+
+    if USE_AIOHTTP:
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host)
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=client_timeout, headers=HEADERS) as session:
+            pairs = await asyncio.gather(*(run(u, lambda u: _aiohttp_check(session, u)) for u in urls))
+    else:
+        # Size the thread pool to the concurrency cap - the default executor
+        # is only a few threads on a small CI runner.
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            pairs = await asyncio.gather(*(
+                run(u, lambda u: loop.run_in_executor(pool, _urllib_check, u, timeout)) for u in urls
+            ))
+    return dict(pairs)
+
+
+def check_links(urls, cache_path=DEFAULT_CACHE_PATH, concurrency=CONCURRENCY, per_host=PER_HOST_CONCURRENCY,
+                timeout=TIMEOUT, refresh=False):
+    """
+    Check each unique URL, serving recently-checked ones from the cache.
+    Returns {url: {'status', 'ok', 'error', 'cached'}}.
+    """
+    urls = list(dict.fromkeys(u for u in urls if u and u not in PLACEHOLDER_URLS))
+    cache = LinkCache(cache_path)
+    try:
+        results = {} if refresh else cache.fresh(urls)
+        to_check = [u for u in urls if u not in results]
+        if to_check:
+            checked = asyncio.run(_check_all(to_check, concurrency, per_host, timeout))
+            cache.store(checked)
+            results.update(checked)
+    finally:
+        cache.close()
+    return results
+
+
+def collect_links(rows):
+    """(row number, field, url) for every checkable link in the CSV rows (1-based, like validate_data)."""
+    links = []
+    for i, row in enumerate(rows, 1):
+        for field in LINK_FIELDS:
+            url = (row.get(field) or '').strip()
+            if url.startswith(('http://', 'https://')) and url not in PLACEHOLDER_URLS:
+                links.append((i, field, url))
+    return links
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    opts = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+    csv_file = args[0] if args else 'cr_episodes_series_airdates.csv'
+
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    links = collect_links(rows)
+
+    start = time.time()
+    results = check_links(
+        [url for _, _, url in links],
+        concurrency=int(opts.get('concurrency', CONCURRENCY)),
+        per_host=int(opts.get('per-host', PER_HOST_CONCURRENCY)),
+        refresh='--refresh' in sys.argv,
+    )
+    elapsed = time.time() - start
+
+    cached = sum(1 for r in results.values() if r['cached'])
+    dead = [(i, field, url) for i, field, url in links if is_dead(results[url])]
+    timed_out = [url for url, r in results.items() if is_timed_out(r)]
+    blocked = [url for url, r in results.items() if not r['ok'] and not is_dead(r) and not is_timed_out(r)]
+
+    print(f"Checked {len(results)} unique links in {elapsed:.1f}s "
+          f"({cached} from cache, {len(results) - cached} fetched, {'aiohttp' if USE_AIOHTTP else 'urllib threads'})")
+    if blocked:
+        print(f"⚠️  {len(blocked)} link(s) refused the check (403/429/...) - not counted as dead")
+    if timed_out:
+        print(f"⏱  {len(timed_out)} link(s) timed out - status unknown, not counted as dead")
+        for url in timed_out:
+            print(f"  {url}")
+    if not dead:
+        print("✓ No dead links")
+        return 0
+
+    print(f"\n✗ {len(dead)} dead link(s):")
+    for i, field, url in dead:
+        r = results[url]
+        print(f"  row {i} {field}: {url} ({r['status'] or r['error']})")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Discover which weekly programming-schedule posts actually exist.
+
+generate_schedule_urls() guesses a URL for every Monday and probes it, which
+spends a request (or several, across slug variants) on every week that never
+got a post. Both sites publish an index of what they have: critrole.com is
+WordPress, so it has a sitemap (with <lastmod>) and an RSS feed, and beacon.tv
+has its own sitemap. Reading those once per run lists the schedule posts that
+really exist, with their modified dates, so only new or changed posts get
+handed to the extractor.
+
+Discovery is best-effort: if every index fails to load (Cloudflare, a layout
+change, ...) discover_schedule_urls() returns None and the caller falls back
+to guessing URLs.
+"""
+
+import json
+import os
+import re
+import urllib.request
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule_discovery_state.json')
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+    'Accept': 'application/xml,text/xml,application/rss+xml;q=0.9,*/*;q=0.8',
+}
+
+# (source, index URL). Sitemap indexes are followed one level down, but only
+# into child sitemaps that can hold posts.
+INDEX_SOURCES = [
+    ('critrole', 'https://critrole.com/wp-sitemap.xml'),
+    ('critrole', 'https://critrole.com/feed/'),
+    ('beacon', 'https://beacon.tv/sitemap.xml'),
+]
+
+_SCHEDULE_SLUG = re.compile(
+    r'programming-schedule-week-of-([a-z]+)-(\d{1,2})(?:st|nd|rd|th)?-(\d{4})',
+    re.IGNORECASE
+)
+_POST_SITEMAP = re.compile(r'post|content', re.IGNORECASE)
+
+
+def parse_schedule_slug(url):
+    """Week date (a datetime) encoded in a schedule post URL, or None."""
+    match = _SCHEDULE_SLUG.search(url)
+    if not match:
+        return None
+    month, day, year = match.groups()
+    try:
+        return datetime.strptime(f"{month} {day} {year}", '%B %d %Y')
+    except ValueError:
+        return None
+
+
+def fetch_xml(url, timeout=30):
+    req = urllib.request.Request(url, headers=HEADERS)
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return resp.read()
+
+
+def _local(tag):
+    """Strip the XML namespace: '{http://...}loc' -> 'loc'."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child_text(element, name):
+    for child in element:
+        if _local(child.tag) == name:
+            return (child.text or '').strip()
+    return ''
+
+
+def parse_index(xml_bytes):
+    """
+    Parse a sitemap, sitemap index, or RSS feed.
+
+    Returns (entries, child_sitemaps): entries is a list of (url, modified)
+    pairs with modified as an ISO-8601 string ('' if the index doesn't say),
+    child_sitemaps a list of nested sitemap URLs from a sitemap index.
+    """
+    root = ET.fromstring(xml_bytes)
+    entries = []
+    child_sitemaps = []
+
+    for element in root.iter():
+        tag = _local(element.tag)
+        if tag == 'url':
+            entries.append((_child_text(element, 'loc'), _child_text(element, 'lastmod')))
+        elif tag == 'sitemap':
+            child_sitemaps.append(_child_text(element, 'loc'))
+        elif tag == 'item':
+            modified = ''
+            pub_date = _child_text(element, 'pubDate')
+            if pub_date:
+                try:
+                    modified = parsedate_to_datetime(pub_date).isoformat()
+                except (TypeError, ValueError):
+                    pass
+            entries.append((_child_text(element, 'link'), modified))
+
+    return entries, child_sitemaps
+
+
+def _collect_entries(source, index_url, fetch):
+    xml_bytes = fetch(index_url)
+    entries, child_sitemaps = parse_index(xml_bytes)
+    for child_url in child_sitemaps:
+        if not _POST_SITEMAP.search(child_url):
+            continue  # category/tag/author sitemaps never list schedule posts
+        try:
+            child_entries, _ = parse_index(fetch(child_url))
+            entries.extend(child_entries)
+        except Exception as e:
+            print(f"  [discovery] {source}: couldn't read {child_url}: {e}")
+    return entries
+
+
+def discover_schedule_posts(sources=INDEX_SOURCES, fetch=fetch_xml):
+    """
+    Read each index once and return the schedule posts it lists, as a dict
+    {url: (week_date, source, modified)}. Returns None if no index could be
+    read at all (as opposed to {} - indexes read fine, just no posts).
+    """
+    posts = {}
+    any_ok = False
+
+    for source, index_url in sources:
+        try:
+            entries = _collect_entries(source, index_url, fetch)
+        except Exception as e:
+            print(f"  [discovery] {source}: couldn't read {index_url}: {e}")
+            continue
+        any_ok = True
+
+        for url, modified in entries:
+            week_date = parse_schedule_slug(url)
+            if not week_date:
+                continue
+            previous = posts.get(url)
+            # The same post can appear in both the sitemap and the feed; keep
+            # the most recent modification date either one reports.
+            if previous is None or modified > previous[2]:
+                posts[url] = (week_date, source, modified)
+
+    return posts if any_ok else None
+
+
+def load_state(state_path=DEFAULT_STATE_PATH):
+    try:
+        with open(state_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(state, state_path=DEFAULT_STATE_PATH):
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, state_path)
+
+
+def select_changed(posts, state, start_date, end_date):
+    """
+    Schedule posts in [start_date, end_date] that are new or modified since
+    they were last extracted, as (week_date, url, source) tuples sorted by
+    week - the same shape generate_schedule_urls() returns. A post with no
+    modified date is always treated as changed, since there's no way to tell.
+    """
+    selected = []
+    for url, (week_date, source, modified) in posts.items():
+        if not (start_date.date() <= week_date.date() <= end_date.date()):
+            continue
+        if modified and state.get(url) == modified:
+            continue
+        selected.append((week_date, url, source))
+    selected.sort(key=lambda item: (item[0], item[2]))
+    return selected
+
+
+def discover_schedule_urls(start_date, end_date, state_path=DEFAULT_STATE_PATH, fetch=fetch_xml):
+    """
+    Discovery stage for the Beacon scraper. Returns (urls, posts, state):
+    urls is the list of new/changed (week_date, url, source) tuples to
+    extract, or None if discovery failed and the caller should guess URLs
+    instead. Once a post has been extracted, call mark_extracted() so the
+    next run skips it until it changes again.
+    """
+    posts = discover_schedule_posts(fetch=fetch)
+    if posts is None:
+        return None, {}, {}
+    state = load_state(state_path)
+    return select_changed(posts, state, start_date, end_date), posts, state
+
+
+def mark_extracted(state, posts, url):
+    modified = posts.get(url, (None, None, ''))[2]
+    if modified:
+        state[url] = modified
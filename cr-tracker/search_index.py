@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Full-text search index over the tracker CSV.
+
+Builds two artifacts from cr_episodes_series_airdates.csv:
+  - search_index.sqlite: an SQLite FTS5 table over title / campaign / arc /
+    notes / episode_number, ranked with bm25, for the query CLI below
+  - search_index.json: a compact inverted index (sorted term list + postings)
+    that index.html loads, so searching in the browser is a binary search
+    over the term list instead of a substring scan of every row. It covers
+    only WEB_SEARCH_FIELDS - the fields the page's substring search has
+    always matched - so free-text notes ("Beacon exclusive") don't make a
+    query match every row that mentions it
+
+Both are rebuilt only when the CSV's content hash changes, so it's cheap to
+call update_search_index() after every scraper write.
+
+Usage:
+  python3 search_index.py build [csv_path] [--force]
+  python3 search_index.py query "bells hells cooldown" [--limit=N]
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+import unicodedata
+from bisect import bisect_left
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV_PATH = os.path.join(HERE, 'cr_episodes_series_airdates.csv')
+DB_FILENAME = 'search_index.sqlite'
+JSON_FILENAME = 'search_index.json'
+DEFAULT_DB_PATH = os.path.join(HERE, DB_FILENAME)
+DEFAULT_JSON_PATH = os.path.join(HERE, JSON_FILENAME)
+
+SEARCH_FIELDS = ['title', 'campaign', 'arc', 'notes', 'episode_number']
+WEB_SEARCH_FIELDS = ['title', 'campaign', 'arc', 'episode_number']
+INDEX_VERSION = 2
+
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lowercased, accent-folded word tokens - same folding FTS5's unicode61 tokenizer does."""
+    folded = unicodedata.normalize('NFKD', text or '')
+    folded = ''.join(c for c in folded if not unicodedata.combining(c))
+    return _TOKEN.findall(folded.lower())
+
+
+def csv_hash(csv_path):
+    with open(csv_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_rows(csv_path):
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        return [row for row in csv.DictReader(f) if row.get('episode_id')]
+
+
+def build_inverted_index(rows, source_hash=''):
+    """
+    {'docs': [episode_id, ...], 'terms': [sorted terms], 'postings': [[doc, ...], ...]}
+    postings[i] lists the docs containing terms[i], so a prefix query is a
+    bisect into terms followed by a walk while the prefix still matches.
+    """
+    term_docs = {}
+    docs = []
+    for doc, row in enumerate(rows):
+        docs.append(row['episode_id'])
+        for field in WEB_SEARCH_FIELDS:
+            for term in tokenize(row.get(field, '')):
+                term_docs.setdefault(term, set()).add(doc)
+
+    terms = sorted(term_docs)
+    return {
+        'version': INDEX_VERSION,
+        'source_hash': source_hash,
+        'fields': WEB_SEARCH_FIELDS,
+        'docs': docs,
+        'terms': terms,
+        'postings': [sorted(term_docs[t]) for t in terms],
+    }
+
+
+def build_fts_index(rows, db_path, source_hash=''):
+    """(Re)create the FTS5 table. Returns False if this SQLite build lacks FTS5."""
+    tmp_path = db_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        columns = ', '.join(SEARCH_FIELDS)
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE episodes_fts USING fts5(
+                episode_id UNINDEXED, {columns},
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+        conn.executemany(
+            f"INSERT INTO episodes_fts (episode_id, {columns}) VALUES (?, {', '.join('?' * len(SEARCH_FIELDS))})",
+            [(row['episode_id'], *(row.get(f, '') for f in SEARCH_FIELDS)) for row in rows]
+        )
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("INSERT INTO meta VALUES ('source_hash', ?)", (source_hash,))
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        conn.close()
+        os.remove(tmp_path)
+        if 'fts5' in str(e):
+            return False
+        raise
+    conn.close()
+    os.replace(tmp_path, db_path)
+    return True
+
+
+def _indexed_hash(json_path):
+    """Source hash the JSON index was built from, or None if it's missing or an older format."""
+    try:
+        with open(json_path, encoding='utf-8') as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if index.get('version') != INDEX_VERSION:
+        return None
+    return index.get('source_hash')
+
+
+def update_search_index(csv_path=DEFAULT_CSV_PATH, db_path=None, json_path=None, force=False):
+    """
+    Rebuild both indexes if the CSV changed since they were last built. The
+    index files live next to the CSV unless paths are given. Returns True if
+    anything was rebuilt.
+    """
+    csv_dir = os.path.dirname(os.path.abspath(csv_path))
+    db_path = db_path or os.path.join(csv_dir, DB_FILENAME)
+    json_path = json_path or os.path.join(csv_dir, JSON_FILENAME)
+    source_hash = csv_hash(csv_path)
+    if not force and _indexed_hash(json_path) == source_hash:
+        return False
+
+    start = time.time()
+    rows = load_rows(csv_path)
+
+    index = build_inverted_index(rows, source_hash)
+    tmp_path = json_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, json_path)
+
+    has_fts = build_fts_index(rows, db_path, source_hash)
+    print(f"🔎 Search index rebuilt: {len(rows)} episodes, {len(index['terms'])} terms "
+          f"({time.time() - start:.2f}s{'' if has_fts else ', no FTS5 in this SQLite - JSON index only'})")
+    return True
+
+
+def fts_query(text):
+    """User text -> FTS5 MATCH expression: every token must match, as a prefix."""
+    return ' '.join(f'"{token}"*' for token in tokenize(text))
+
+
+def search(text, db_path=DEFAULT_DB_PATH, json_path=DEFAULT_JSON_PATH, limit=20):
+    """
+    Best-ranked (episode_id, title) matches for text, using the FTS5 index -
+    or, without FTS5, the JSON index (unranked, without titles, and not
+    searching notes).
+    """
+    match = fts_query(text)
+    if not match:
+        return []
+    if not os.path.exists(db_path):
+        with open(json_path, encoding='utf-8') as f:
+            return [(episode_id, '') for episode_id in search_inverted(text, json.load(f))[:limit]]
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            "SELECT episode_id, title FROM episodes_fts WHERE episodes_fts MATCH ? ORDER BY bm25(episodes_fts) LIMIT ?",
+            (match, limit)
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def search_inverted(text, index):
+    """Episode ids matching every token of text (as prefixes) in a loaded JSON index."""
+    terms = index['terms']
+    result = None
+    for token in tokenize(text):
+        docs = set()
+        i = bisect_left(terms, token)
+        while i < len(terms) and terms[i].startswith(token):
+            docs.update(index['postings'][i])
+            i += 1
+        result = docs if result is None else result & docs
+        if not result:
+            return []
+    return [index['docs'][d] for d in sorted(result or [])]
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    opts = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+    command = args[0] if args else 'build'
+
+    if command == 'build':
+        csv_path = args[1] if len(args) > 1 else DEFAULT_CSV_PATH
+        if not update_search_index(csv_path, force='--force' in sys.argv):
+            print("Search index already up to date")
+    elif command == 'query' and len(args) > 1:
+        update_search_index()
+        start = time.perf_counter()
+        results = search(' '.join(args[1:]), limit=int(opts.get('limit', 20)))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for episode_id, title in results:
+            print(f"  {title}  [{episode_id}]")
+        print(f"\n{len(results)} result(s) in {elapsed_ms:.2f} ms")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,10 +3,17 @@
 Unit tests for CR-Tracker scrapers
 """
 
+import csv
+import http.server
+import json
+import threading
+import time
 import unittest
 import sys
 import os
+import tempfile
 from datetime import datetime
+from unittest import mock
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,8 +22,24 @@ from wiki_scraper import clean_text, parse_date, parse_runtime
 from beacon_scraper import (
     generate_schedule_urls, extract_beacon_content, normalize_live_show_title,
     parse_generic_title, parse_release_date_from_li, is_excluded_from_generic_fallback,
-    is_manually_reworded_generic_duplicate,
+    is_manually_reworded_generic_duplicate, merge_into_main_csv, save_to_csv, scrape_beacon_exclusives,
 )
+from changelog import parse_changelog, record_run, render_changelog, tail_runs
+import beacon_scraper
+from url_resolver import SlugResolver, strip_ordinal_suffix, url_variants
+from cr_complete_scraper import (
+    parse_all_episodes, parse_sections, split_sections, iter_sections,
+    find_html_files, merge_episodes, parse_files,
+)
+from schedule_discovery import discover_schedule_posts, parse_schedule_slug, select_changed
+from text_normalize import cache_stats, clear_caches, extract_fireside_guests, normalize_text
+from update_canon import canon_fields, load_rules, update_csv
+from generate_beacon_urls import cooldown_series, fill_main_csv, generate_beacon_url
+from link_checker import check_links, is_dead, is_timed_out
+from search_index import search, search_inverted, update_search_index
+from episode_store import DB_ENV_VAR, EpisodeDB, csv_lock, load_episodes, save_episodes
+import watch_stats
+from validate_data import validate_chronological_order, validate_links, validate_placeholder_titles
 
 
 class TestWikiScraperHelpers(unittest.TestCase):
@@ -62,6 +85,68 @@ class TestWikiScraperHelpers(unittest.TestCase):
         self.assertEqual(parse_runtime(None), "")
 
 
+class TestCompleteScraperSections(unittest.TestCase):
+    """Tests for cr_complete_scraper's sectioned (parallel/streaming) parsing,
+    which must produce exactly what a single whole-page parse does."""
+
+    HTML = """
+    <html><body><div class="mw-parser-output">
+    <p>Intro text</p>
+    <h2><span>Contents</span></h2>
+    <h2><span class="mw-headline">Campaign One: Vox Machina</span><span>[edit]</span></h2>
+    <h3>Arc 1</h3>
+    <table class="wikitable">
+      <tr><th>No.</th><th>Title</th><th>Airdate</th></tr>
+      <tr><td>1</td><td><a href="/wiki/Arrival">Arrival at Kraghammer</a></td><td>2015-03-12</td></tr>
+    </table>
+    <h2><span>References</span></h2>
+    <table class="wikitable">
+      <tr><th>No.</th><th>Title</th><th>Airdate</th></tr>
+      <tr><td>2</td><td>Into the Greyspine Mines</td><td>2015-03-19</td></tr>
+    </table>
+    <H2 id="c2">Candela Obscura</H2>
+    <table class="wikitable">
+      <tr><th>No.</th><th>Title</th><th>Airdate</th></tr>
+      <tr><td>1</td><td>The Circle of the Silver Screen</td><td>2023-05-25</td></tr>
+    </table>
+    </div></body></html>
+    """
+
+    def test_split_sections_matches_whole_page_parse(self):
+        expected = parse_all_episodes(self.HTML)
+        self.assertEqual(len(expected), 3)
+        self.assertEqual(parse_sections(split_sections(self.HTML)), expected)
+
+    def test_skipped_heading_stays_with_previous_section(self):
+        sections = split_sections(self.HTML)
+        self.assertTrue(any('References' in s and 'Vox Machina' in s for s in sections))
+
+    def test_streaming_sections_match_whole_page_parse(self):
+        import io
+        # A tiny read size forces h2 boundaries to straddle reads
+        sections = iter_sections(io.StringIO(self.HTML), chunk_size=7)
+        self.assertEqual(parse_sections(sections), parse_all_episodes(self.HTML))
+
+    def test_parallel_parse_preserves_document_order(self):
+        self.assertEqual(parse_sections(split_sections(self.HTML), workers=2),
+                         parse_all_episodes(self.HTML))
+
+    def test_batch_merge_dedups_by_episode_id(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name, html in [('a.html', self.HTML),
+                               ('b.html', self.HTML.replace('Candela Obscura', 'Exandria Unlimited'))]:
+                with open(os.path.join(tmpdir, name), 'w', encoding='utf-8') as f:
+                    f.write(html)
+            paths = find_html_files([tmpdir])
+            self.assertEqual([os.path.basename(p) for p in paths], ['a.html', 'b.html'])
+
+            episodes, report = merge_episodes(parse_files(paths))
+        self.assertEqual(len(episodes), 4)  # b.html only adds its Exandria Unlimited row
+        self.assertEqual([(parsed, added) for _, parsed, added, _ in report], [(3, 3), (3, 1)])
+        self.assertEqual(episodes[0]['episode_id'],
+                         'Main Campaign|Campaign One: Vox Machina|1|Arrival at Kraghammer')
+
+
 class TestBeaconScraperHelpers(unittest.TestCase):
     """Tests for beacon_scraper helper functions"""
 
@@ -193,6 +278,27 @@ class TestLiveShowDedup(unittest.TestCase):
         self.assertNotEqual(normalize_live_show_title(main), normalize_live_show_title(cooldown))
 
 
+class TestTextNormalize(unittest.TestCase):
+    """Tests for the memoized normalization helpers (text_normalize.py)"""
+
+    def test_normalize_text_folds_cosmetic_differences(self):
+        self.assertEqual(normalize_text('Dalen\u2019s\xa0Closet \u2013  Part\tOne'), "dalen's closet - part one")
+        self.assertEqual(normalize_text(''), '')
+        self.assertEqual(normalize_text(None), '')
+
+    def test_fireside_guests_order_independent(self):
+        self.assertEqual(extract_fireside_guests('Fireside Chat with Sam Riegel & Travis Willingham!'),
+                         extract_fireside_guests('Fireside Chat with Travis Willingham and Sam Riegel'))
+
+    def test_cache_stats_count_repeat_lookups(self):
+        clear_caches()
+        for _ in range(3):
+            normalize_text('Tale Gate | The Soldier\u2019s Table')
+        stats = cache_stats()['normalize_text']
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+
+
 class TestGenericFallback(unittest.TestCase):
     """Tests for the generic fallback pass (Pattern 13 in extract_beacon_content)
     that adds schedule content not caught by any of the other, series-specific
@@ -305,12 +411,672 @@ class TestGenericFallback(unittest.TestCase):
         self.assertEqual(len(content), 0)
 
 
+class TestUrlResolver(unittest.TestCase):
+    """Tests for the learned schedule-URL slug cache (url_resolver.py)"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmpdir.name, 'cache.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_strip_ordinal_suffix_leaves_month_name_alone(self):
+        # The old chained .replace('st-', '-') mangled "august-" into "augu-"
+        url = 'https://critrole.com/programming-schedule-week-of-august-10th-2026/'
+        self.assertEqual(strip_ordinal_suffix(url),
+                         'https://critrole.com/programming-schedule-week-of-august-10-2026/')
+
+    def test_url_variants_previous_year(self):
+        url = 'https://critrole.com/programming-schedule-week-of-january-5th-2026/'
+        variants = url_variants(url, include_previous_year=True)
+        self.assertEqual(variants[0], url)
+        self.assertIn('https://critrole.com/programming-schedule-week-of-january-5th-2025/', variants)
+        self.assertIn('https://critrole.com/programming-schedule-week-of-january-5-2025/', variants)
+
+    def test_resolver_remembers_working_variant_across_runs(self):
+        urls = url_variants('https://critrole.com/programming-schedule-week-of-may-13th-2024/')
+        good = urls[1]
+        fetched = []
+
+        def fetch(url):
+            fetched.append(url)
+            return ('<html></html>', url) if url == good else (None, None)
+
+        first = SlugResolver(self.cache_path)
+        first.resolve('2024-05-13', urls, fetch)
+        first.save()
+        self.assertEqual(fetched, urls)
+
+        fetched.clear()
+        second = SlugResolver(self.cache_path)
+        html, resolved, _ = second.resolve('2024-05-13', urls, fetch)
+        self.assertEqual(fetched, [good])  # no 404 round trip on the ordinal form
+        self.assertEqual(resolved, good)
+        self.assertEqual(second.hits, 1)
+
+    def test_resolver_records_redirect_target(self):
+        urls = ['https://critrole.com/old-slug/']
+
+        def fetch(url):
+            return '<html></html>', 'https://critrole.com/new-slug/'
+
+        resolver = SlugResolver(self.cache_path)
+        resolver.resolve('2024-05-13', urls, fetch)
+        self.assertEqual(resolver.known_url('critrole.com', '2024-05-13'),
+                         'https://critrole.com/new-slug/')
+
+
+class TestScheduleDiscovery(unittest.TestCase):
+    """Tests for sitemap/feed discovery of schedule posts (schedule_discovery.py)"""
+
+    SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+    <sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+      <sitemap><loc>https://critrole.com/wp-sitemap-posts-post-1.xml</loc></sitemap>
+      <sitemap><loc>https://critrole.com/wp-sitemap-taxonomies-category-1.xml</loc></sitemap>
+    </sitemapindex>"""
+
+    POST_SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+    <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+      <url><loc>https://critrole.com/programming-schedule-week-of-july-27th-2026/</loc>
+           <lastmod>2026-07-28T10:00:00+00:00</lastmod></url>
+      <url><loc>https://critrole.com/some-news-post/</loc><lastmod>2026-07-29T10:00:00+00:00</lastmod></url>
+    </urlset>"""
+
+    FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+    <rss version="2.0"><channel>
+      <item><link>https://critrole.com/programming-schedule-week-of-august-3rd-2026/</link>
+            <pubDate>Mon, 03 Aug 2026 16:00:00 +0000</pubDate></item>
+    </channel></rss>"""
+
+    def fetch(self, url):
+        if url.endswith('wp-sitemap.xml'):
+            return self.SITEMAP_INDEX
+        if 'posts-post' in url:
+            return self.POST_SITEMAP
+        if url.endswith('/feed/'):
+            return self.FEED
+        raise AssertionError(f"unexpected fetch: {url}")
+
+    def discover(self):
+        return discover_schedule_posts(sources=[
+            ('critrole', 'https://critrole.com/wp-sitemap.xml'),
+            ('critrole', 'https://critrole.com/feed/'),
+        ], fetch=self.fetch)
+
+    def test_parse_schedule_slug(self):
+        self.assertEqual(parse_schedule_slug(
+            'https://critrole.com/programming-schedule-week-of-may-13th-2024/'), datetime(2024, 5, 13))
+        self.assertEqual(parse_schedule_slug(
+            'https://beacon.tv/content/programming-schedule-week-of-may-13-2024'), datetime(2024, 5, 13))
+        self.assertIsNone(parse_schedule_slug('https://critrole.com/some-news-post/'))
+
+    def test_discovers_posts_from_sitemap_and_feed(self):
+        posts = self.discover()
+        self.assertEqual(sorted(posts), [
+            'https://critrole.com/programming-schedule-week-of-august-3rd-2026/',
+            'https://critrole.com/programming-schedule-week-of-july-27th-2026/',
+        ])
+
+    def test_unreadable_indexes_return_none(self):
+        def failing_fetch(url):
+            raise OSError('403 Forbidden')
+        self.assertIsNone(discover_schedule_posts(fetch=failing_fetch))
+
+    def test_select_changed_skips_unmodified_posts(self):
+        posts = self.discover()
+        july = 'https://critrole.com/programming-schedule-week-of-july-27th-2026/'
+        state = {july: '2026-07-28T10:00:00+00:00'}
+        selected = select_changed(posts, state, datetime(2026, 7, 1), datetime(2026, 8, 31))
+        self.assertEqual([url for _, url, _ in selected],
+                         ['https://critrole.com/programming-schedule-week-of-august-3rd-2026/'])
+
+        state[july] = '2026-07-01T00:00:00+00:00'  # post edited since last extraction
+        selected = select_changed(posts, state, datetime(2026, 7, 1), datetime(2026, 8, 31))
+        self.assertIn(july, [url for _, url, _ in selected])
+
+    def test_scrape_returns_discovered_urls_and_leaves_state_unsaved(self):
+        posts = self.discover()
+        august = 'https://critrole.com/programming-schedule-week-of-august-3rd-2026/'
+        state = {}
+        selected = select_changed(posts, state, datetime(2026, 8, 1), datetime(2026, 8, 31))
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(beacon_scraper, 'discover_schedule_urls', return_value=(selected, posts, state)), \
+                mock.patch.object(beacon_scraper, 'fetch_url_with_retry', return_value=('<html></html>', True, august)), \
+                mock.patch.object(beacon_scraper, 'SlugResolver',
+                                  lambda: SlugResolver(os.path.join(tmp, 'cache.json'))), \
+                mock.patch.object(beacon_scraper, 'save_state') as save_state, \
+                mock.patch.object(beacon_scraper.time, 'sleep'):
+            content, checked, discovery_state = scrape_beacon_exclusives('2026-08-01', '2026-08-31')
+
+        # The changelog gets what discovery returned, not every guessed Monday
+        self.assertEqual([url for _, url, _ in checked], [august])
+        # Marked extracted, but saving waits until the CSV merge succeeds
+        self.assertEqual(discovery_state, {august: posts[august][2]})
+        save_state.assert_not_called()
+
+    def test_save_to_csv_merges_with_earlier_runs(self):
+        def item(week, title, episode=''):
+            return {'week_date': week, 'show_type': 'Talk Show', 'series': 'Cooldown', 'campaign': '',
+                    'episode_number': episode, 'title': title, 'release_date': '', 'notes': '',
+                    'is_generic_fallback': ''}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'beacon_exclusives.csv')
+            save_to_csv([item('2026-07-06', 'Old'), item('2026-07-27', 'July', '1')], path)
+            # Next run only re-extracts the edited July post and the new August one
+            updated = item('2026-07-27', 'July', '1')
+            updated['notes'] = 'edited'
+            save_to_csv([updated, item('2026-08-03', 'August', '2')], path, since='2026-07-13')
+
+            with open(path, encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual([(r['week_date'], r['title'], r['notes']) for r in rows],
+                             [('2026-07-27', 'July', 'edited'), ('2026-08-03', 'August', '')])
+
+
+class TestCanonRules(unittest.TestCase):
+    """Tests for rule-driven canon tagging (update_canon.py / canon_rules.json)"""
+
+    def setUp(self):
+        self.rules = load_rules()
+
+    def test_rule_precedence(self):
+        self.assertEqual(canon_fields({'episode_id': 'x', 'show_type': 'Main Campaign', 'title': 'Ep'}, self.rules),
+                         ('TRUE', '', ''))
+        is_canon, prereq, note = canon_fields(
+            {'episode_id': 'x', 'show_type': 'One-Shot', 'title': 'Echoes of Exandria: Something'}, self.rules)
+        self.assertEqual((is_canon, prereq), ('TRUE', 'None'))
+        self.assertTrue(note)
+        self.assertEqual(canon_fields({'episode_id': 'x', 'show_type': 'One-Shot', 'title': 'Random'}, self.rules),
+                         ('FALSE', '', ''))
+
+    def test_update_in_place_only_writes_on_change(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'episodes.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('episode_id,show_type,title\nc1,Main Campaign,Ep 1\no1,One-Shot,Random\n')
+            self.assertEqual(update_csv(path, rules=self.rules), 2)
+            mtime = os.stat(path).st_mtime_ns
+            self.assertEqual(update_csv(path, rules=self.rules), 0)
+            self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+
+    def test_merge_tags_new_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'episodes.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('episode_id,show_type,campaign,arc,episode_number,title,airdate,vod_url,wiki_url,'
+                        'runtime,watched,notes,has_cooldown,cooldown_date,'
+                        'is_canon,prerequisite_episode,prerequisite_notes\n')
+            new_rows, _ = merge_into_main_csv([
+                {'series': 'One-Shot', 'title': 'Echoes of Exandria: Test', 'episode_number': '',
+                 'release_date': '2026-01-01', 'notes': ''},
+                {'series': 'Fireside Chat', 'title': 'Fireside Chat with A & B', 'episode_number': '',
+                 'release_date': '2026-01-02', 'notes': ''},
+            ], path)
+            self.assertEqual([r['is_canon'] for r in new_rows], ['TRUE', 'FALSE'])
+
+
+class TestBeaconUrlRules(unittest.TestCase):
+    """Tests for the Beacon URL rule table and bulk fill (generate_beacon_urls.py)"""
+
+    def test_observed_patterns(self):
+        base = 'https://beacon.tv/content/'
+        self.assertEqual(generate_beacon_url('Campaign Three', 'C3x83', 'Cooldown: (C3) Ruidus', ''),
+                         base + '3-83-cr-cooldown-c3-e83')
+        self.assertEqual(generate_beacon_url('Campaign Four', 'C4x7', 'Cooldown: (C4) On the Scent', ''),
+                         base + 'cr-cooldown-c4-e007')
+        self.assertEqual(generate_beacon_url('Wildemount Wildlings', '2', 'Into the Wilde', ''),
+                         base + 'wildemount-wildings-cooldown-e2')
+        self.assertEqual(generate_beacon_url('Specials', '', 'Cooldown: Darktow – Edinburgh Live Show 2026', ''),
+                         base + 'cr-cooldown-darktow-edinburgh-live-show-2026')
+        self.assertEqual(generate_beacon_url('Inside The Mighty Nein', '6-8', 'Inside', ''),
+                         base + 'inside-the-mighty-nein-episodes-6-8')
+
+    def test_fill_main_only_fills_verified_placeholders(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'episodes.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('episode_id,campaign,arc,episode_number,title,airdate,vod_url\n'
+                        'a,Critical Role Cooldown,Campaign Four,C4x12,Cooldown: (C4) A,2026-01-01,https://www.beacon.tv\n'
+                        'b,Critical Role Cooldown,Campaign Four,C4x13,Cooldown: (C4) B,2026-01-08,https://www.beacon.tv\n'
+                        'c,Campaign Four,,13,B,2026-01-08,https://www.beacon.tv\n')
+            checked = []
+
+            def check(url):
+                checked.append(url)
+                return url.endswith('e012')
+
+            filled, unverified = fill_main_csv(path, verify=True, verify_base='http://localhost:8000',
+                                               workers=2, check=check)
+            self.assertEqual(len(filled), 1)
+            self.assertEqual(len(unverified), 1)
+            self.assertTrue(all(u.startswith('http://localhost:8000/content/') for u in checked))
+            with open(path, encoding='utf-8') as f:
+                urls = [row['vod_url'] for row in csv.DictReader(f)]
+            self.assertEqual(urls, ['https://beacon.tv/content/cr-cooldown-c4-e012',
+                                    'https://www.beacon.tv', 'https://www.beacon.tv'])
+
+    def test_fill_main_without_verify_writes_nothing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'episodes.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('episode_id,campaign,arc,episode_number,title,airdate,vod_url\n'
+                        'a,Critical Role Cooldown,Campaign Four,C4x12,Cooldown: (C4) A,2026-01-01,https://www.beacon.tv\n')
+            with open(path, encoding='utf-8') as f:
+                before = f.read()
+
+            filled, unverified = fill_main_csv(path, check=lambda url: self.fail('no check without verify'))
+            self.assertEqual(filled, [])
+            self.assertEqual([url for _, url in unverified], ['https://beacon.tv/content/cr-cooldown-c4-e012'])
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(f.read(), before)
+
+    def test_sub_series_title_and_arc_share_one_slug(self):
+        known = {'Sallowlands', 'Age of Umbra'}
+        by_arc = {'arc': 'Sallowlands', 'title': 'Cooldown: (Age of Umbra: Sallowlands) Scattered Pilgrims'}
+        by_title = {'arc': '', 'title': 'Critical Role Cooldown | Age of Umbra: Sallowlands | Episode 4'}
+        self.assertEqual(cooldown_series(by_arc, known), 'Sallowlands')
+        self.assertEqual(cooldown_series(by_title, known), 'Sallowlands')
+        # Unknown sub-series keep the full name rather than guessing
+        self.assertEqual(cooldown_series(by_title), 'Age of Umbra: Sallowlands')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'episodes.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('episode_id,campaign,arc,episode_number,title,airdate,vod_url\n'
+                        'a,Critical Role Cooldown,Sallowlands,1,Cooldown: (Age of Umbra: Sallowlands) A,2026-01-01,'
+                        'https://www.beacon.tv\n'
+                        'b,Critical Role Cooldown,,4,Critical Role Cooldown | Age of Umbra: Sallowlands | Episode 4,'
+                        '2026-01-22,https://www.beacon.tv\n')
+            filled, _ = fill_main_csv(path, verify=True, workers=2, check=lambda url: True)
+            self.assertEqual([url for _, url in filled], ['https://beacon.tv/content/sallowlands-cooldown-e1',
+                                                          'https://beacon.tv/content/sallowlands-cooldown-e4'])
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Tests for the FTS5 / JSON search index (search_index.py)"""
+
+    def test_build_and_query(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'episodes.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('episode_id,campaign,arc,episode_number,title,notes\n'
+                        'a,Specials,,C3E097a,Ménagerie a Trois,\n'
+                        'b,Campaign Three: Bells Hells,,83,Ruidus,\n'
+                        'c,Critical Role Cooldown,,C3x83,Cooldown: (C3) Ruidus,Beacon exclusive\n')
+            self.assertTrue(update_search_index(path))
+            self.assertFalse(update_search_index(path))  # unchanged CSV - no rebuild
+
+            db_path = os.path.join(tmp, 'search_index.sqlite')
+            json_path = os.path.join(tmp, 'search_index.json')
+            self.assertEqual([r[0] for r in search('menag', db_path)], ['a'])
+            self.assertEqual(sorted(r[0] for r in search('ruidus', db_path)), ['b', 'c'])
+            self.assertEqual([r[0] for r in search('ruid beacon', db_path)], ['c'])
+
+            with open(json_path, encoding='utf-8') as f:
+                index = json.load(f)
+            self.assertEqual(search_inverted('ménag', index), ['a'])
+            self.assertEqual(search_inverted('ruid cool', index), ['c'])
+            # Notes are only in the FTS index - the web index matches what the page displays
+            self.assertEqual(search_inverted('beacon', index), [])
+            self.assertEqual(index['fields'], ['title', 'campaign', 'arc', 'episode_number'])
+
+    def test_older_index_format_is_rebuilt(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'episodes.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('episode_id,campaign,arc,episode_number,title,notes\n'
+                        'c,Critical Role Cooldown,,C3x83,Cooldown: (C3) Ruidus,Beacon exclusive\n')
+            self.assertTrue(update_search_index(path))
+            json_path = os.path.join(tmp, 'search_index.json')
+            with open(json_path, encoding='utf-8') as f:
+                index = json.load(f)
+            index['version'] = 1
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            self.assertTrue(update_search_index(path))
+
+
+class TestEpisodeStore(unittest.TestCase):
+    """Tests for the optional SQLite episode store (episode_store.py)"""
+
+    HEADER = 'episode_id,show_type,campaign,episode_number,title,airdate,vod_url\n'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, 'episodes.csv')
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write(self.HEADER +
+                    'a,Main Campaign,Campaign Four,1,One,2026-01-01,\n'
+                    'b,Main Campaign,Campaign Four,2,Two,2026-01-08,\n')
+        self._saved_env = os.environ.get(DB_ENV_VAR)
+        os.environ[DB_ENV_VAR] = os.path.join(self.tmp.name, 'episodes.sqlite')
+
+    def tearDown(self):
+        if self._saved_env is None:
+            os.environ.pop(DB_ENV_VAR, None)
+        else:
+            os.environ[DB_ENV_VAR] = self._saved_env
+        self.tmp.cleanup()
+
+    def read_csv(self):
+        with open(self.csv_path, encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+    def test_interleaved_writers_keep_each_others_changes(self):
+        rows_1, fieldnames = load_episodes(self.csv_path)
+        rows_2, _ = load_episodes(self.csv_path)
+
+        rows_1[0]['vod_url'] = 'https://youtu.be/one'
+        save_episodes(self.csv_path, fieldnames, rows_1, changed_rows=[rows_1[0]])
+
+        # Second writer loaded before the first saved; it only UPSERTs its own rows
+        new_row = {'episode_id': 'c', 'show_type': 'Main Campaign', 'campaign': 'Campaign Four',
+                   'episode_number': '3', 'title': 'Three', 'airdate': '2026-01-05', 'vod_url': ''}
+        save_episodes(self.csv_path, fieldnames, rows_2 + [new_row], changed_rows=[new_row])
+
+        rows = self.read_csv()
+        self.assertEqual([r['episode_id'] for r in rows], ['a', 'c', 'b'])  # exported in airdate order
+        self.assertEqual(rows[0]['vod_url'], 'https://youtu.be/one')
+
+    def test_rename_updates_row_and_indexed_lookup(self):
+        rows, fieldnames = load_episodes(self.csv_path)
+        rows[1]['episode_id'] = 'b2'
+        save_episodes(self.csv_path, fieldnames, rows, changed_rows=[rows[1]], renamed_ids={'b': 'b2'})
+        self.assertEqual([r['episode_id'] for r in self.read_csv()], ['a', 'b2'])
+
+        db = EpisodeDB(os.environ[DB_ENV_VAR])
+        try:
+            self.assertEqual([r['episode_id'] for r in db.find('Campaign Four', '2')], ['b2'])
+        finally:
+            db.close()
+
+    def test_rename_onto_id_another_writer_created(self):
+        rows_1, fieldnames = load_episodes(self.csv_path)
+        rows_2, _ = load_episodes(self.csv_path)
+
+        other = {'episode_id': 'b2', 'show_type': 'Main Campaign', 'campaign': 'Campaign Four',
+                 'episode_number': '2', 'title': 'Two', 'airdate': '2026-01-08', 'vod_url': ''}
+        save_episodes(self.csv_path, fieldnames, rows_1 + [other], changed_rows=[other])
+
+        rows_2[1]['episode_id'] = 'b2'
+        rows_2[1]['vod_url'] = 'https://youtu.be/two'
+        save_episodes(self.csv_path, fieldnames, rows_2, changed_rows=[rows_2[1]], renamed_ids={'b': 'b2'})
+
+        rows = self.read_csv()
+        self.assertEqual([r['episode_id'] for r in rows], ['a', 'b2'])
+        self.assertEqual(rows[1]['vod_url'], 'https://youtu.be/two')
+
+    def test_manual_csv_edit_is_reimported(self):
+        load_episodes(self.csv_path)
+        with open(self.csv_path, 'a', encoding='utf-8') as f:
+            f.write('d,Special,Specials,,Four,2026-02-01,\n')
+        rows, _ = load_episodes(self.csv_path)
+        self.assertEqual([r['episode_id'] for r in rows], ['a', 'b', 'd'])
+
+
+class TestConcurrentCsvWrites(unittest.TestCase):
+    """Tests for lock + rebase when CSV writers overlap (episode_store.py, CSV mode)"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, 'episodes.csv')
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write(TestEpisodeStore.HEADER +
+                    'a,Main Campaign,Campaign Four,1,One,2026-01-01,\n'
+                    'b,Main Campaign,Campaign Four,2,Two,2026-01-08,\n')
+        self._saved_env = os.environ.pop(DB_ENV_VAR, None)
+
+    def tearDown(self):
+        if self._saved_env is not None:
+            os.environ[DB_ENV_VAR] = self._saved_env
+        self.tmp.cleanup()
+
+    def read_csv(self):
+        with open(self.csv_path, encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+    def test_changes_rebased_onto_concurrent_write(self):
+        rows, fieldnames = load_episodes(self.csv_path)
+        rows[0]['vod_url'] = 'https://youtu.be/one'
+        rows.append({'episode_id': 'c', 'show_type': 'Main Campaign', 'campaign': 'Campaign Four',
+                     'episode_number': '3', 'title': 'Three', 'airdate': '2026-01-15', 'vod_url': ''})
+
+        # Another process rewrites the file in the meantime
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write(TestEpisodeStore.HEADER +
+                    'a,Main Campaign,Campaign Four,1,One,2026-01-01,\n'
+                    'b,Main Campaign,Campaign Four,2,Two (fixed),2026-01-08,https://youtu.be/two\n')
+
+        save_episodes(self.csv_path, fieldnames, rows)  # no changed_rows: diffed against the load
+        result = {r['episode_id']: r for r in self.read_csv()}
+        self.assertEqual(sorted(result), ['a', 'b', 'c'])
+        self.assertEqual(result['a']['vod_url'], 'https://youtu.be/one')
+        self.assertEqual(result['b']['title'], 'Two (fixed)')
+        self.assertEqual(result['b']['vod_url'], 'https://youtu.be/two')
+
+    def test_rename_onto_id_another_writer_created(self):
+        rows, fieldnames = load_episodes(self.csv_path)
+        rows[1]['episode_id'] = 'b2'
+        rows[1]['vod_url'] = 'https://youtu.be/two'
+
+        with open(self.csv_path, 'a', encoding='utf-8') as f:
+            f.write('b2,Main Campaign,Campaign Four,2,Two,2026-01-08,\n')
+
+        save_episodes(self.csv_path, fieldnames, rows, changed_rows=[rows[1]], renamed_ids={'b': 'b2'})
+        result = self.read_csv()
+        self.assertEqual([r['episode_id'] for r in result], ['a', 'b2'])
+        self.assertEqual(result[1]['vod_url'], 'https://youtu.be/two')
+
+    def test_unchanged_file_written_as_is(self):
+        rows, fieldnames = load_episodes(self.csv_path)
+        rows[1]['title'] = 'Two!'
+        save_episodes(self.csv_path, fieldnames, rows)
+        self.assertEqual([r['title'] for r in self.read_csv()], ['One', 'Two!'])
+
+    def test_lock_is_exclusive(self):
+        events = []
+
+        def other_writer():
+            with csv_lock(self.csv_path):
+                events.append('locked')
+
+        with csv_lock(self.csv_path):
+            thread = threading.Thread(target=other_writer)
+            thread.start()
+            thread.join(0.2)
+            self.assertEqual(events, [])  # still waiting on our lock
+        thread.join(2)
+        self.assertEqual(events, ['locked'])
+
+
+class TestChangelog(unittest.TestCase):
+    """Tests for the append-only run log behind CHANGELOG.md (changelog.py)"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.changelog_path = os.path.join(self.tmp.name, 'CHANGELOG.md')
+        self.runs_path = os.path.join(self.tmp.name, 'changelog_runs.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, path):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_recent_runs_rendered_and_old_runs_archived(self):
+        for i in range(5):
+            record_run([f'https://critrole.com/week-{i}/'],
+                       [{'airdate': '2026-01-0%d' % (i + 1), 'title': f'Episode {i}'}],
+                       ['x'] * i, self.changelog_path, recent=3)
+
+        self.assertEqual([r['title'] for run in tail_runs(self.runs_path, 10) for r in run['added']],
+                         [f'Episode {i}' for i in range(5)])
+        changelog = self.read(self.changelog_path)
+        self.assertEqual(changelog.count('## Run: '), 3)
+        self.assertLess(changelog.index('Episode 4'), changelog.index('Episode 2'))  # newest first
+        self.assertNotIn('Episode 1', changelog)
+
+        year = datetime.now().strftime('%Y')
+        archive = self.read(os.path.join(self.tmp.name, 'changelog_archive', f'CHANGELOG-{year}.md'))
+        self.assertLess(archive.index('Episode 0'), archive.index('Episode 1'))  # oldest first
+        self.assertNotIn('Episode 2', archive)
+
+    def test_markdown_round_trip(self):
+        record_run(['https://critrole.com/week-a/'], [], [], self.changelog_path)
+        record_run([], [{'airdate': '2026-02-01', 'title': 'Echoes | Live'}], ['x', 'y'], self.changelog_path)
+        before = self.read(self.changelog_path)
+
+        os.remove(self.runs_path)
+        runs = parse_changelog(before)
+        with open(self.runs_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(run) + '\n' for run in reversed(runs))
+        render_changelog(self.changelog_path)
+        self.assertEqual(self.read(self.changelog_path), before)
+
+
+class TestWatchStats(unittest.TestCase):
+    """Tests for watch-time aggregates and catch-up projections (watch_stats.py)"""
+
+    ROWS = [
+        {'episode_id': 'a', 'show_type': 'Main Campaign', 'campaign': 'C4', 'arc': 'Arc 1',
+         'airdate': '2026-01-01', 'runtime': '3:00:00', 'watched': 'True'},
+        {'episode_id': 'b', 'show_type': 'Main Campaign', 'campaign': 'C4', 'arc': 'Arc 1',
+         'airdate': '2026-01-08', 'runtime': '2:30:00', 'watched': 'False'},
+        {'episode_id': 'c', 'show_type': 'Talk Show', 'campaign': 'Cooldown', 'arc': '',
+         'airdate': '2026-01-08', 'runtime': '45:00', 'watched': 'False'},
+        {'episode_id': 'd', 'show_type': 'Main Campaign', 'campaign': 'C4', 'arc': 'Arc 2',
+         'airdate': '2026-01-15', 'runtime': '', 'watched': 'False'},
+        {'episode_id': 'e', 'show_type': 'Main Campaign', 'campaign': 'C4', 'arc': 'Arc 2',
+         'airdate': '', 'runtime': '4:00:00', 'watched': 'False'},
+    ]
+
+    def check_stats(self):
+        stats = watch_stats.build_stats(self.ROWS)
+        self.assertEqual(stats['totals']['total_seconds'], (3 * 60 + 150 + 45 + 240) * 60)
+        self.assertEqual(stats['totals']['remaining_seconds'], (150 + 45 + 240) * 60)
+
+        arcs = {g['arc']: g for g in stats['groups']['arc'] if g['campaign'] == 'C4'}
+        self.assertEqual(arcs['Arc 1']['remaining_seconds'], 150 * 60)
+        self.assertEqual((arcs['Arc 2']['episodes'], arcs['Arc 2']['total_seconds']), (2, 240 * 60))
+
+        # Undated episode 'e' isn't on the cumulative timeline
+        self.assertEqual(stats['cumulative'], {
+            'dates': ['2026-01-01', '2026-01-08', '2026-01-15'],
+            'seconds': [10800, 10800 + 9000 + 2700, 22500],
+            'episodes': [1, 3, 4],
+        })
+        self.assertNotIn('d', stats['runtime_seconds'])
+
+        data = watch_stats.load_arrays(self.ROWS)
+        plan = watch_stats.catch_up(data, '2026-01-10', today=datetime(2026, 1, 5).date())
+        self.assertEqual((plan['days'], plan['remaining_seconds'], plan['seconds_per_day']), (5, 11700, 2340))
+        return stats
+
+    def test_stats(self):
+        self.check_stats()
+
+    def test_pure_python_matches(self):
+        expected = self.check_stats()
+        saved = watch_stats.HAS_NUMPY
+        watch_stats.HAS_NUMPY = False
+        try:
+            self.assertEqual(self.check_stats(), expected)
+        finally:
+            watch_stats.HAS_NUMPY = saved
+
+
 class TestDataValidation(unittest.TestCase):
-    """Tests for data validation (placeholder for validate_data.py tests)"""
+    """Tests for data validation (validate_data.py)"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.requests_seen = []
+        seen = cls.requests_seen
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_HEAD(self):
+                seen.append(self.path)
+                if self.path.startswith('/slow'):
+                    time.sleep(1)
+                self.send_response(404 if self.path.startswith('/gone') else 200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+
+    def setUp(self):
+        self.requests_seen.clear()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_dead_links_reported_and_cached(self):
+        rows = [
+            {'title': 'Live', 'vod_url': f'{self.base}/watch/1', 'wiki_url': f'{self.base}/wiki/1'},
+            {'title': 'Gone', 'vod_url': f'{self.base}/gone/2', 'wiki_url': ''},
+            {'title': 'Beacon placeholder', 'vod_url': 'https://www.beacon.tv', 'wiki_url': ''},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, 'links.sqlite')
+            issues = validate_links(rows, cache_path=cache_path)
+            self.assertEqual([(i['row'], i['type'], i['field']) for i in issues], [(2, 'dead_link', 'vod_url')])
+            self.assertEqual(len(self.requests_seen), 3)
+
+            # Second run is served entirely from the TTL cache
+            results = check_links([r['vod_url'] for r in rows], cache_path=cache_path)
+            self.assertTrue(all(r['cached'] for r in results.values()))
+            self.assertEqual(len(self.requests_seen), 3)
+
+    def test_timeouts_are_unknown_not_dead(self):
+        rows = [{'title': 'Slow', 'vod_url': f'{self.base}/slow/1', 'wiki_url': ''}]
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, 'links.sqlite')
+            issues = validate_links(rows, cache_path=cache_path, timeout=0.2)
+            self.assertEqual([(i['row'], i['type'], i['field']) for i in issues], [(1, 'unknown_link', 'vod_url')])
+
+            self.assertEqual(self.requests_seen, ['/slow/1'])
+
+            # A timeout verified nothing, so it isn't cached - the next run checks again
+            result = check_links([rows[0]['vod_url']], cache_path=cache_path, timeout=0.2)[rows[0]['vod_url']]
+            self.assertFalse(result['cached'])
+            self.assertTrue(is_timed_out(result))
+            self.assertFalse(is_dead(result))
+            self.assertEqual(self.requests_seen, ['/slow/1', '/slow/1'])
+
+    def test_chronological_order_within_series(self):
+        def row(show, arc, ep, airdate):
+            return {'show_type': show, 'campaign': 'C', 'arc': arc, 'episode_number': ep,
+                    'airdate': airdate, 'title': f'{show} {arc} {ep}'}
+        rows = [
+            row('Miniseries', 'S2', '2', '2024-01-01'),   # airs before episode 1; series seen first
+            row('Main Campaign', '', '1', '2024-01-10'),
+            row('Main Campaign', '', '3', '2024-01-12'),
+            row('Main Campaign', '', '2', '2024-01-03'),  # airs before episode 1
+            row('Miniseries', 'S2', '1', '2024-02-01'),
+            row('Miniseries', 'S1', '9', '2020-01-01'),   # different season, not compared
+            row('Main Campaign', '', '4', 'Forthcoming'),
+        ]
+        issues = validate_chronological_order(rows)
+        self.assertEqual([(i['row'], i['episode_number'], i['prev_episode']) for i in issues],
+                         [(1, 2, 1), (4, 2, 1)])
 
-    def test_placeholder(self):
-        # Will be expanded when validate_data.py is created
-        pass
+    def test_placeholder_titles_on_past_episodes(self):
+        rows = [{'title': t, 'airdate': d} for t, d in [
+            ('C3E12', '2021-01-01'), ('Episode 5', '2021-01-01'), ('untitled special', '2021-01-01'),
+            ('Cooldown', '2021-01-01'), ('Critical Role Cooldown', '2021-01-01'), ('TBA', '2099-01-01'),
+            ('The Real Title', '2021-01-01'), ('TBD', 'Forthcoming'),
+        ]]
+        issues = validate_placeholder_titles(rows)
+        self.assertEqual([i['row'] for i in issues], [1, 2, 3, 4])
 
 
 if __name__ == '__main__':
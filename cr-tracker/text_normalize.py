@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Title normalization helpers used for duplicate detection.
+
+merge_into_main_csv() normalizes every CSV row's title (often several times,
+once per dedup set it feeds) and then every scraped item again, and the same
+few hundred titles come up on every run. These helpers use precompiled
+patterns and a str.translate() table for the character folding, and are
+memoized with bounded LRU caches - call cache_stats() to see whether the
+caches are actually paying off on a full-CSV merge.
+"""
+
+import re
+from functools import lru_cache
+
+# Big enough to hold every title/episode_id in the tracker plus a run's worth
+# of scraped items, so a full merge is served almost entirely from cache.
+CACHE_SIZE = 8192
+
+# Cosmetic differences between scrapes of the same content: non-breaking
+# spaces, curly quotes, and en/em dashes.
+_FOLD_TABLE = str.maketrans({
+    '\xa0': ' ',
+    '‘': "'",
+    '’': "'",
+    '–': '-',
+    '—': '-',
+})
+
+_WHITESPACE = re.compile(r'\s+')
+_FIRESIDE_GUESTS = re.compile(r'with\s+(.+)', re.IGNORECASE)
+_TRAILING_MONTH_YEAR = re.compile(r'\|\s*\w+\s+\d{4}\s*$')
+_TRAILING_PUNCTUATION = re.compile(r'[!.]+\s*$')
+_TRAILING_FROM = re.compile(r'\bfrom\s*$', re.IGNORECASE)
+_GUEST_SEPARATOR = re.compile(r'\s*(?:&|,|\band\b)\s*', re.IGNORECASE)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_text(text):
+    """
+    Normalize scraped text for duplicate-detection comparisons.
+    Source pages inconsistently use non-breaking spaces, curly quotes/dashes,
+    and inconsistent capitalization between scrapes of the same content, which
+    defeats plain exact-string dedup. This folds all of that away so identical
+    content compares equal regardless of which scrape produced it.
+    """
+    if not text:
+        return ''
+    t = text.translate(_FOLD_TABLE)
+    t = _WHITESPACE.sub(' ', t)
+    return t.strip().lower()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def extract_arc_name(title):
+    """
+    Extract the arc/episode name from titles with pipe separators.
+    Works for "Previously On... | Arc Name" and "Tale Gate | Arc Name" formats.
+    """
+    if '|' in title:
+        return normalize_text(title.split('|', 1)[1])
+    return normalize_text(title)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_live_show_title(title):
+    """
+    Normalize a Live Show title for duplicate detection.
+
+    critrole.com re-promotes the same live show release across multiple weekly
+    schedule pages, and the blurb is sometimes reworded slightly between
+    postings (e.g. a "| Critical Role |" segment gets added or dropped). That
+    defeats plain exact-string dedup, producing a second row for what's really
+    the same release. Dropping empty/filler pipe-segments (just "critical
+    role") folds those cosmetic rewrites away, while still keeping distinct
+    same-event pieces (e.g. a Backstage Pass teaser vs. its later "Road To..."
+    follow-up, or the main show vs. its Cooldown) as separate segments so they
+    aren't incorrectly collapsed together.
+    """
+    segments = [normalize_text(s) for s in title.split('|')]
+    segments = [s for s in segments if s and s != 'critical role']
+    return '|'.join(segments)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def extract_fireside_guests(title):
+    """
+    Extract a normalized, order-independent guest key from a Fireside Chat title.
+    Guards against duplicate rows caused by cosmetic differences between scrapes:
+    guest order ("A & B" vs "B & A"), separator ("&" vs "and"), trailing punctuation
+    ("!"), dangling fragments ("... from"), trailing "| Month Year" suffixes, and
+    curly vs straight apostrophes. Returns a sorted tuple of guest names, or None.
+    """
+    match = _FIRESIDE_GUESTS.search(title)
+    if not match:
+        return None
+    guests = normalize_text(match.group(1))
+    guests = _TRAILING_MONTH_YEAR.sub('', guests)  # trailing "| Month Year"
+    guests = _TRAILING_PUNCTUATION.sub('', guests)
+    guests = _TRAILING_FROM.sub('', guests)
+    guests = guests.strip()
+    parts = _GUEST_SEPARATOR.split(guests)
+    parts = tuple(sorted(p.strip().lower() for p in parts if p.strip()))
+    return parts or None
+
+
+_CACHED_FUNCTIONS = (normalize_text, extract_arc_name, normalize_live_show_title, extract_fireside_guests)
+
+
+def cache_stats():
+    """Hit/miss counts for each memoized helper, keyed by function name."""
+    stats = {}
+    for func in _CACHED_FUNCTIONS:
+        info = func.cache_info()
+        lookups = info.hits + info.misses
+        stats[func.__name__] = {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'hit_rate': round(info.hits / lookups, 3) if lookups else 0.0,
+        }
+    return stats
+
+
+def print_cache_stats():
+    print("\nNormalization cache:")
+    for name, s in cache_stats().items():
+        print(f"  {name:28} {s['hits']:6} hits / {s['misses']:5} misses ({s['hit_rate']:.0%})")
+
+
+def clear_caches():
+    for func in _CACHED_FUNCTIONS:
+        func.cache_clear()
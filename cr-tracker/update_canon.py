@@ -1,256 +1,145 @@
 #!/usr/bin/env python3
 """
 Update Critical Role CSV to add canon tracking columns
-"""
-
-import csv
-
-# Define canon episodes with their prerequisites
-CANON_EPISODES = {
-    # Campaign 1 Canon Content
-    'Special|Specials|C1E36a|The Story of Vox Machina': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'None',
-        'prerequisite_notes': 'Early C1 recap - watch anytime'
-    },
-    'Special|Specials|C2E52a|The Search For Grog': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'C1E115',
-        'prerequisite_notes': 'After Campaign 1 finale'
-    },
-    'Special|Specials|C2E68a|The Search For Bob': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'C2E52a',
-        'prerequisite_notes': 'After The Search For Grog'
-    },
-    'Special|Specials|C2E76a|Dalen\'s Closet': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'C2E68a',
-        'prerequisite_notes': 'After The Search For Bob'
-    },
-    'Special|Specials|C2E86b|The Adventures of the Darrington Brigade': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'C1E115',
-        'prerequisite_notes': 'After Campaign 1 finale (10 years later)'
-    },
-
-    # Campaign 2 Canon Content
-    'Special|Specials|C3E040a|The Mighty Nein Reunited Part 1': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'C2E141',
-        'prerequisite_notes': 'After Campaign 2 finale'
-    },
-    'Special|Specials|C3E040b|The Mighty Nein Reunited Part 2': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'C3E040a',
-        'prerequisite_notes': 'After The Mighty Nein Reunited Part 1'
-    },
-
-    # Exandria Unlimited - all episodes are canon
-    # Prime series (episodes 1-8)
-    'Miniseries|Miniseries|1|The Nameless Ones': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'None',
-        'prerequisite_notes': 'Standalone - no prerequisite'
-    },
-    'Miniseries|Miniseries|2|The Oh No Plateau': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU1',
-        'prerequisite_notes': 'After EXU Prime E1'
-    },
-    'Miniseries|Miniseries|3|A Glorious Return': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU2',
-        'prerequisite_notes': 'After EXU Prime E2'
-    },
-    'Miniseries|Miniseries|4|By the Road': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU3',
-        'prerequisite_notes': 'After EXU Prime E3'
-    },
-    'Miniseries|Miniseries|5|A Test of Worth': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU4',
-        'prerequisite_notes': 'After EXU Prime E4'
-    },
-    'Miniseries|Miniseries|6|The Gift Among the Green': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU5',
-        'prerequisite_notes': 'After EXU Prime E5'
-    },
-    'Miniseries|Miniseries|7|Beyond the Heart City': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU6',
-        'prerequisite_notes': 'After EXU Prime E6'
-    },
-    'Miniseries|Miniseries|8|What Comes Next': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU7',
-        'prerequisite_notes': 'After EXU Prime E7'
-    },
-
-    # Kymal series
-    'Miniseries|Miniseries|9|Exandria Unlimited: Kymal, Part 1': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU8',
-        'prerequisite_notes': 'After EXU Prime + during Campaign 3'
-    },
-    'Miniseries|Miniseries|10|Exandria Unlimited: Kymal, Part 2': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU9',
-        'prerequisite_notes': 'After EXU Kymal Part 1'
-    },
 
-    # Calamity series
-    'Miniseries|Miniseries|11|Excelsior': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'C3E1',
-        'prerequisite_notes': 'Historical lore - helpful after C3 starts'
-    },
-    'Miniseries|Miniseries|12|Bitterness and Dread': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU11',
-        'prerequisite_notes': 'After EXU Calamity E1'
-    },
-    'Miniseries|Miniseries|13|Blood and Shadow': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU12',
-        'prerequisite_notes': 'After EXU Calamity E2'
-    },
-    'Miniseries|Miniseries|14|Fire and Ruin': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU13',
-        'prerequisite_notes': 'After EXU Calamity E3'
-    },
+Canon rules live in canon_rules.json (edit that, not this file):
+  - episodes: exact episode_id -> is_canon / prerequisite_episode / prerequisite_notes
+  - title_patterns: substring -> note, for ongoing anthology series where every
+    entry is canon (new one-shots keep airing, so exact ids can't keep up)
+  - always_canon_show_types: show types that are always canon (Main Campaign)
 
-    # Divergence series (EXU Season 4)
-    'Miniseries|Exandria Unlimited|15|Give and Take': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU14',
-        'prerequisite_notes': 'After EXU Calamity - post-Calamity era'
-    },
-    'Miniseries|Exandria Unlimited|16|Seven of Them': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU15',
-        'prerequisite_notes': 'After EXU Divergence E1'
-    },
-    'Miniseries|Exandria Unlimited|17|Mirror and Key': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU16',
-        'prerequisite_notes': 'After EXU Divergence E2'
-    },
-    'Miniseries|Exandria Unlimited|18|By Heart Alone': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'EXU17',
-        'prerequisite_notes': 'After EXU Divergence E3'
-    },
+Usage:
+  python3 update_canon.py [csv_path] [--rules=canon_rules.json] [--dry-run]
 
-    # Campaign 3 Canon Specials
-    'Special|Specials|C3E076a|The Mighty Nein Reunion: Echoes of the Solstice': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'C2E141',
-        'prerequisite_notes': 'After Campaign 2 finale (post-Apogee Solstice)'
-    },
-    'Special|Specials|AU1E08a|Tag Team at the Teeth – The Misty Ascent': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'C3E1',
-        'prerequisite_notes': 'Mighty Nein + Bells Hells crossover'
-    },
-    'Special|Specials|AU1E08b|Tag Team at the Teeth – Beyond the Shroud': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'AU1E08a',
-        'prerequisite_notes': 'After Tag Team Part 1'
-    },
-    'Special|Specials|AU1E08d|Oaths & Ash – Indianapolis Live Show 2025': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'C3E1',
-        'prerequisite_notes': 'Bells Hells live show'
-    },
-    'Special|Specials|C4E04b|Jester and Fjord\'s Wedding - Live from Radio City Music Hall': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'C2E141',
-        'prerequisite_notes': 'After Campaign 2 finale'
-    },
-
-    # Lore specials
-    'Special|Specials|C2E141f|Exandria: An Intimate History': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'None',
-        'prerequisite_notes': 'World lore - watch anytime'
-    },
-    'Special|Specials|C3E051a|Exandria: An Intimate Appendix - Ruidus and the Gods': {
-        'is_canon': 'TRUE',
-        'prerequisite_episode': 'None',
-        'prerequisite_notes': 'Lore about Ruidus - watch anytime'
-    },
-}
-
-# Ongoing anthology series where every entry is canon - matched by substring
-# in the title rather than exact episode_id, since new one-shots keep airing.
-CANON_TITLE_PATTERNS = {
-    'Echoes of Exandria': 'Echoes of Exandria one-shot - canon',
-}
+Runs in place on csv_path (default: cr_episodes_series_airdates.csv next to
+this script) and only rewrites the file if some row's canon fields changed.
+The scrapers' merge steps tag new rows themselves via classify_canon(), so
+this full pass is only needed after editing canon_rules.json.
+"""
 
-def update_csv(input_file, output_file):
-    """Add canon columns to CSV"""
-    rows = []
+import json
+import os
+import re
+import sys
+
+from episode_store import load_episodes, save_episodes
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RULES_PATH = os.path.join(HERE, 'canon_rules.json')
+DEFAULT_CSV_PATH = os.path.join(HERE, 'cr_episodes_series_airdates.csv')
+
+CANON_COLUMNS = ('is_canon', 'prerequisite_episode', 'prerequisite_notes')
+
+
+def load_rules(rules_path=DEFAULT_RULES_PATH):
+    """
+    Load canon_rules.json and compile it for lookup. All title patterns are
+    compiled into a single alternation regex, so each row costs one regex
+    search instead of one substring scan per pattern. Longer patterns are
+    tried first, so a pattern that contains another still wins.
+    """
+    with open(rules_path, encoding='utf-8') as f:
+        data = json.load(f)
+
+    title_notes = data.get('title_patterns', {})
+    title_matcher = None
+    if title_notes:
+        alternation = '|'.join(re.escape(p) for p in sorted(title_notes, key=len, reverse=True))
+        title_matcher = re.compile(alternation)
+
+    return {
+        'episodes': data.get('episodes', {}),
+        'always_canon_show_types': set(data.get('always_canon_show_types', [])),
+        'title_matcher': title_matcher,
+        'title_notes': title_notes,
+    }
+
+
+def canon_fields(row, rules):
+    """(is_canon, prerequisite_episode, prerequisite_notes) for one CSV row"""
+    canon_info = rules['episodes'].get(row.get('episode_id', ''))
+    if canon_info:
+        return (canon_info['is_canon'], canon_info['prerequisite_episode'],
+                canon_info['prerequisite_notes'])
+
+    if row.get('show_type') in rules['always_canon_show_types']:
+        # Main Campaign episodes are always canon; no single specific
+        # prerequisite, so leave those fields blank rather than 'None'
+        return 'TRUE', '', ''
+
+    if rules['title_matcher']:
+        match = rules['title_matcher'].search(row.get('title', ''))
+        if match:
+            return 'TRUE', 'None', rules['title_notes'][match.group(0)]
+
+    # Default to non-canon
+    return 'FALSE', '', ''
+
+
+_default_rules = None
+
+
+def classify_canon(row, rules=None):
+    """
+    Canon columns for a single row, as a dict ready for row.update(). The
+    merge steps call this on each row they add, so new episodes land already
+    tagged and the full-file update_csv() pass is only needed after the rules
+    themselves change. Loads canon_rules.json once if no rules are passed.
+    """
+    global _default_rules
+    if rules is None:
+        if _default_rules is None:
+            _default_rules = load_rules()
+        rules = _default_rules
+    return dict(zip(CANON_COLUMNS, canon_fields(row, rules)))
+
+
+def update_csv(input_file, output_file=None, rules=None, dry_run=False):
+    """
+    Add/refresh canon columns. Writes output_file (default: input_file, in
+    place) only when at least one row's canon fields actually change or the
+    columns are missing. Returns the number of rows changed.
+    """
+    output_file = output_file or input_file
+    rules = rules or load_rules()
+    changed_rows = []
 
     # Read existing CSV
-    with open(input_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        headers = reader.fieldnames
+    rows, headers = load_episodes(input_file)
 
-        # Add new headers (only if not already present, so re-runs don't duplicate them)
-        new_headers = list(headers)
-        for col in ('is_canon', 'prerequisite_episode', 'prerequisite_notes'):
-            if col not in new_headers:
-                new_headers.append(col)
+    # Add new headers (only if not already present, so re-runs don't duplicate them)
+    new_headers = list(headers)
+    for col in CANON_COLUMNS:
+        if col not in new_headers:
+            new_headers.append(col)
 
-        for row in reader:
-            # Create episode_id for lookup
-            episode_id = row['episode_id']
+    for row in rows:
+        fields = canon_fields(row, rules)
+        if tuple(row.get(col) or '' for col in CANON_COLUMNS) != fields:
+            row.update(zip(CANON_COLUMNS, fields))
+            changed_rows.append(row)
+    changed = len(changed_rows)
 
-            # Check if this episode is canon
-            if episode_id in CANON_EPISODES:
-                canon_info = CANON_EPISODES[episode_id]
-                row['is_canon'] = canon_info['is_canon']
-                row['prerequisite_episode'] = canon_info['prerequisite_episode']
-                row['prerequisite_notes'] = canon_info['prerequisite_notes']
-            elif row.get('show_type') == 'Main Campaign':
-                # Main Campaign episodes are always canon; no single specific
-                # prerequisite, so leave those fields blank rather than 'None'
-                row['is_canon'] = 'TRUE'
-                row['prerequisite_episode'] = ''
-                row['prerequisite_notes'] = ''
-            else:
-                title = row.get('title', '')
-                pattern_match = next(
-                    (note for pattern, note in CANON_TITLE_PATTERNS.items() if pattern in title),
-                    None
-                )
-                if pattern_match:
-                    row['is_canon'] = 'TRUE'
-                    row['prerequisite_episode'] = 'None'
-                    row['prerequisite_notes'] = pattern_match
-                else:
-                    # Default to non-canon
-                    row['is_canon'] = 'FALSE'
-                    row['prerequisite_episode'] = ''
-                    row['prerequisite_notes'] = ''
+    canon_count = sum(1 for r in rows if r['is_canon'] == 'TRUE')
+    print(f"📖 {canon_count} of {len(rows)} episodes are canon")
 
-            rows.append(row)
+    if not changed and new_headers == headers and output_file == input_file:
+        print("✅ Canon fields already up to date - nothing to write")
+        return 0
+    if dry_run:
+        print(f"Dry run: {changed} episode(s) would change")
+        return changed
 
-    # Write updated CSV
-    with open(output_file, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=new_headers)
-        writer.writeheader()
-        writer.writerows(rows)
+    # Write updated CSV (with CR_TRACKER_DB set, only the changed rows are UPSERTed)
+    save_episodes(output_file, new_headers, rows, changed_rows=changed_rows)
+
+    print(f"✅ Updated canon fields on {changed} episode(s)")
+    return changed
 
-    print(f"✅ Updated {len(rows)} episodes")
-    canon_count = sum(1 for r in rows if r['is_canon'] == 'TRUE')
-    print(f"📖 Marked {canon_count} episodes as canon")
 
 if __name__ == '__main__':
-    input_file = '/Users/melinda/workspace/fun-things/cr-tracker/cr_episodes_series_airdates.csv'
-    output_file = '/Users/melinda/workspace/fun-things/cr-tracker/cr_episodes_series_airdates.csv'
-    update_csv(input_file, output_file)
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    rules_path = next((a.split('=', 1)[1] for a in sys.argv[1:] if a.startswith('--rules=')),
+                      DEFAULT_RULES_PATH)
+    csv_path = args[0] if args else DEFAULT_CSV_PATH
+    update_csv(csv_path, rules=load_rules(rules_path), dry_run='--dry-run' in sys.argv)
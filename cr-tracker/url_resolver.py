@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Resolve weekly programming-schedule URLs, remembering which slug form worked.
+
+critrole.com and beacon.tv don't agree on (or stick to) one slug format for
+the weekly schedule posts - some weeks use an ordinal day ("may-13th-2024"),
+some drop the suffix ("may-13-2024"), and early-January posts are sometimes
+filed under the previous year. Guessing means paying for a 404 round trip on
+every wrong guess, every run. SlugResolver keeps a small JSON cache of
+{host|week: url-that-actually-resolved} so later runs go straight to the
+known-good URL, and only fall back to guessing when the cache misses (or the
+remembered URL stops working).
+
+Shared by beacon_scraper.py and ../beacon-scheduler/beacon_scheduler.py.
+"""
+
+import json
+import os
+import re
+from urllib.parse import urlparse
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule_url_cache.json')
+
+# "...-may-13th-2024" -> "...-may-13-2024". Anchored on the day/year digits so
+# month names that happen to contain "st-"/"th-" (e.g. "august-") are left alone.
+_ORDINAL_DAY = re.compile(r'-(\d{1,2})(?:st|nd|rd|th)-(\d{4})')
+_YEAR = re.compile(r'-(\d{4})(/?)$')
+
+
+def strip_ordinal_suffix(url):
+    """Drop the ordinal suffix from the day in a schedule URL, if it has one."""
+    return _ORDINAL_DAY.sub(r'-\1-\2', url)
+
+
+def previous_year_variant(url):
+    """Same schedule URL filed under the previous year (early-January posts)."""
+    match = _YEAR.search(url)
+    if not match:
+        return url
+    return url[:match.start()] + f"-{int(match.group(1)) - 1}{match.group(2)}"
+
+
+def url_variants(url, include_previous_year=False):
+    """
+    Candidate URLs for one week's schedule post, most likely first: the URL
+    as generated, then without the ordinal suffix, then (optionally) both
+    forms under the previous year. Duplicates are dropped.
+    """
+    candidates = [url, strip_ordinal_suffix(url)]
+    if include_previous_year:
+        candidates += [previous_year_variant(u) for u in list(candidates)]
+    return list(dict.fromkeys(candidates))
+
+
+class SlugResolver:
+    """
+    Per-(host, week) memory of which schedule URL resolved last time.
+
+    Keys are "host|YYYY-MM-DD"; values are the final URL the fetch landed on
+    (after redirects). Call save() once at the end of a run - recording is
+    in-memory until then.
+    """
+
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH):
+        self.cache_path = cache_path
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        try:
+            with open(cache_path, encoding='utf-8') as f:
+                self._cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._cache = {}
+
+    @staticmethod
+    def _key(host, week_key):
+        return f"{host}|{week_key}"
+
+    def known_url(self, host, week_key):
+        return self._cache.get(self._key(host, week_key))
+
+    def candidates(self, host, week_key, urls):
+        """The remembered URL for this week (if any) first, then the guesses."""
+        known = self.known_url(host, week_key)
+        ordered = ([known] if known else []) + list(urls)
+        return list(dict.fromkeys(ordered))
+
+    def record(self, host, week_key, url):
+        key = self._key(host, week_key)
+        if self._cache.get(key) != url:
+            self._cache[key] = url
+            self._dirty = True
+
+    def forget(self, host, week_key):
+        if self._cache.pop(self._key(host, week_key), None) is not None:
+            self._dirty = True
+
+    def resolve(self, week_key, urls, fetch):
+        """
+        Try each candidate URL for a week until one fetches.
+
+        fetch(url) must return (content, final_url) on success, or
+        (None, None) on failure (404, timeout, ...). Returns
+        (content, final_url, attempted_urls); content is None if every
+        candidate failed. A remembered URL that no longer resolves is
+        forgotten so the next run doesn't keep trying it first.
+        """
+        host = urlparse(urls[0]).netloc if urls else ''
+        known = self.known_url(host, week_key)
+        attempted = []
+
+        for url in self.candidates(host, week_key, urls):
+            attempted.append(url)
+            content, final_url = fetch(url)
+            if content is not None:
+                if url == known:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                # Remember under the requested host - a redirect may land on
+                # another host, but the lookup next week starts from this one.
+                self.record(host, week_key, final_url or url)
+                return content, final_url or url, attempted
+            if url == known:
+                self.forget(host, week_key)
+
+        self.misses += 1
+        return None, None, attempted
+
+    def save(self):
+        if not self._dirty:
+            return
+        tmp_path = self.cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._cache, f, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
@@ -9,6 +9,9 @@ import re
 import sys
 from collections import Counter
 from datetime import datetime
+from functools import lru_cache
+
+from link_checker import DEFAULT_CACHE_PATH, TIMEOUT, check_links, collect_links, is_dead, is_timed_out
 
 
 def load_csv(filepath='cr_episodes_series_airdates.csv'):
@@ -117,6 +120,41 @@ def validate_urls(rows):
     return issues
 
 
+def validate_links(rows, cache_path=None, timeout=None):
+    """
+    Check that vod_url/wiki_url links still resolve (opt-in: --check-links).
+    Network-bound, so results are cached - see link_checker.py. Links that
+    time out are reported as unknown_link rather than dead_link.
+    """
+    issues = []
+    links = collect_links(rows)
+    results = check_links([url for _, _, url in links], cache_path=cache_path or DEFAULT_CACHE_PATH,
+                          timeout=timeout or TIMEOUT)
+
+    for i, field, url in links:
+        result = results[url]
+        if is_dead(result):
+            issues.append({
+                'row': i,
+                'type': 'dead_link',
+                'field': field,
+                'value': url,
+                'title': rows[i - 1].get('title', 'Unknown'),
+                'message': f"Dead link in {field}: {url} ({result['status'] or result['error']})"
+            })
+        elif is_timed_out(result):
+            issues.append({
+                'row': i,
+                'type': 'unknown_link',
+                'field': field,
+                'value': url,
+                'title': rows[i - 1].get('title', 'Unknown'),
+                'message': f"Link check timed out in {field}: {url} - status unknown"
+            })
+
+    return issues
+
+
 def validate_episode_numbers(rows):
     """Check for missing or invalid episode numbers for main content"""
     issues = []
@@ -261,76 +299,84 @@ def validate_stale_forthcoming(rows):
     return issues
 
 
+_ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+@lru_cache(maxsize=None)
+def _iso_date(airdate):
+    """airdate as a zero-padded YYYY-MM-DD string (so plain string comparison orders dates), or None."""
+    if _ISO_DATE.match(airdate):
+        try:
+            datetime.strptime(airdate, '%Y-%m-%d')
+            return airdate
+        except ValueError:
+            return None
+    try:
+        return datetime.strptime(airdate, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+
 def validate_chronological_order(rows):
     """Check that episodes within a series are in chronological order"""
     issues = []
 
-    # Group episodes by show_type, campaign, and arc (for seasons)
-    series_episodes = {}
+    # One sort over every numbered, dated episode keyed by (series, episode
+    # number, row) - series are grouped by show_type, campaign and arc (for
+    # seasons), in the order they first appear - then a single scan comparing
+    # each episode with the one before it in the same series.
+    series_order = {}
+    dated_episodes = []
     for i, row in enumerate(rows, 1):
-        show_type = row.get('show_type', '')
-        campaign = row.get('campaign', '')
-        arc = row.get('arc', '')  # Include arc/season to handle series with multiple seasons
-        key = (show_type, campaign, arc)
-
-        if key not in series_episodes:
-            series_episodes[key] = []
-        series_episodes[key].append((i, row))
-
-    for (show_type, campaign, arc), episodes in series_episodes.items():
-        # Filter to episodes with valid dates and episode numbers
-        dated_episodes = []
-        for i, row in episodes:
-            airdate = row.get('airdate', '').strip()
-            ep_num = row.get('episode_number', '').strip()
-            if airdate and airdate != 'Forthcoming' and ep_num:
-                try:
-                    # Handle numeric episode numbers
-                    if ep_num.isdigit():
-                        ep_date = datetime.strptime(airdate, '%Y-%m-%d')
-                        dated_episodes.append((i, int(ep_num), ep_date, row))
-                except ValueError:
-                    pass
-
-        # Sort by episode number and check dates are increasing
-        dated_episodes.sort(key=lambda x: x[1])
-        for j in range(1, len(dated_episodes)):
-            prev_row_num, prev_ep, prev_date, prev_row = dated_episodes[j - 1]
-            curr_row_num, curr_ep, curr_date, curr_row = dated_episodes[j]
+        key = (row.get('show_type', ''), row.get('campaign', ''), row.get('arc', ''))
+        series = series_order.setdefault(key, len(series_order))
 
-            if curr_date < prev_date:
-                issues.append({
-                    'row': curr_row_num,
-                    'type': 'chronological_order',
-                    'show_type': show_type,
-                    'campaign': campaign,
-                    'arc': arc,
-                    'title': curr_row.get('title', 'Unknown'),
-                    'episode_number': curr_ep,
-                    'airdate': curr_row.get('airdate', ''),
-                    'prev_episode': prev_ep,
-                    'prev_airdate': prev_row.get('airdate', ''),
-                    'message': f"Episode {curr_ep} ({curr_row.get('airdate')}) airs before episode {prev_ep} ({prev_row.get('airdate')})"
-                })
+        airdate = row.get('airdate', '').strip()
+        ep_num = row.get('episode_number', '').strip()
+        if airdate and airdate != 'Forthcoming' and ep_num.isdigit():
+            ep_date = _iso_date(airdate)
+            if ep_date:
+                dated_episodes.append((series, int(ep_num), i, ep_date, row))
+
+    dated_episodes.sort(key=lambda x: x[:3])
+    series_keys = list(series_order)
+    for prev, curr in zip(dated_episodes, dated_episodes[1:]):
+        series, curr_ep, curr_row_num, curr_date, curr_row = curr
+        prev_series, prev_ep, _, prev_date, prev_row = prev
+
+        if series == prev_series and curr_date < prev_date:
+            show_type, campaign, arc = series_keys[series]
+            issues.append({
+                'row': curr_row_num,
+                'type': 'chronological_order',
+                'show_type': show_type,
+                'campaign': campaign,
+                'arc': arc,
+                'title': curr_row.get('title', 'Unknown'),
+                'episode_number': curr_ep,
+                'airdate': curr_row.get('airdate', ''),
+                'prev_episode': prev_ep,
+                'prev_airdate': prev_row.get('airdate', ''),
+                'message': f"Episode {curr_ep} ({curr_row.get('airdate')}) airs before episode {prev_ep} ({prev_row.get('airdate')})"
+            })
 
     return issues
 
 
+# Patterns that suggest placeholder titles, as one alternation so each title
+# is matched once: "Campaign 3 Episode 12", "C3E12", "Episode 12", TBA/TBD,
+# "Untitled...", and just "Cooldown" with no episode name (case-sensitive)
+PLACEHOLDER_TITLE = re.compile(
+    r'(?i:Campaign \d+ Episode \d+|C\d+E\d+|Episode \d+|TBA|TBD)$'
+    r'|(?i:Untitled)'
+    r'|Cooldown$'
+)
+
+
 def validate_placeholder_titles(rows):
     """Check for placeholder-looking titles on episodes with past airdates"""
     issues = []
-    today = datetime.now().date()
-
-    # Patterns that suggest placeholder titles
-    placeholder_patterns = [
-        re.compile(r'^Campaign \d+ Episode \d+$', re.IGNORECASE),
-        re.compile(r'^C\d+E\d+$', re.IGNORECASE),
-        re.compile(r'^Episode \d+$', re.IGNORECASE),
-        re.compile(r'^TBA$', re.IGNORECASE),
-        re.compile(r'^TBD$', re.IGNORECASE),
-        re.compile(r'^Untitled', re.IGNORECASE),
-        re.compile(r'Cooldown$'),  # Just "Cooldown" without episode name
-    ]
+    today = datetime.now().date().isoformat()
 
     for i, row in enumerate(rows, 1):
         title = row.get('title', '').strip()
@@ -338,24 +384,18 @@ def validate_placeholder_titles(rows):
 
         if not title or not airdate or airdate == 'Forthcoming':
             continue
+        if not PLACEHOLDER_TITLE.match(title):
+            continue
 
-        try:
-            ep_date = datetime.strptime(airdate, '%Y-%m-%d').date()
-            if ep_date >= today:
-                continue  # Future episodes can have placeholders
-
-            for pattern in placeholder_patterns:
-                if pattern.match(title):
-                    issues.append({
-                        'row': i,
-                        'type': 'placeholder_title',
-                        'title': title,
-                        'airdate': airdate,
-                        'message': f"Placeholder title '{title}' on past episode (aired {airdate})"
-                    })
-                    break
-        except ValueError:
-            pass
+        ep_date = _iso_date(airdate)
+        if ep_date and ep_date < today:  # Future episodes can have placeholders
+            issues.append({
+                'row': i,
+                'type': 'placeholder_title',
+                'title': title,
+                'airdate': airdate,
+                'message': f"Placeholder title '{title}' on past episode (aired {airdate})"
+            })
 
     return issues
 
@@ -397,7 +437,8 @@ def generate_report(all_issues):
 
 
 def main():
-    csv_file = sys.argv[1] if len(sys.argv) > 1 else 'cr_episodes_series_airdates.csv'
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    csv_file = args[0] if args else 'cr_episodes_series_airdates.csv'
 
     print(f"Loading {csv_file}...")
     rows, fieldnames = load_csv(csv_file)
@@ -424,6 +465,11 @@ def main():
     all_issues.extend(validate_chronological_order(rows))
     all_issues.extend(validate_placeholder_titles(rows))
 
+    # Link liveness (network, opt-in)
+    if '--check-links' in sys.argv:
+        print("Checking links...")
+        all_issues.extend(validate_links(rows))
+
     generate_report(all_issues)
 
     # Return exit code based on critical issues
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Watch-time and backlog stats over the tracker CSV.
+
+Runtimes are parsed once into an integer-seconds array (NumPy if it's
+installed, plain lists otherwise) alongside the watched flags and airdates,
+and everything else is a grouped sum or a cumulative sum over those arrays:
+  - total / watched / remaining time per show_type, campaign and arc
+  - cumulative runtime by airdate (how big the backlog was on any date)
+  - "catch up by date X" - hours per day needed to clear everything aired by X
+
+watch_stats.json holds the per-group totals, the cumulative series and each
+episode's runtime in seconds, so index.html doesn't have to parse runtimes.
+It's rebuilt only when the CSV's content hash changes (same as the search
+index). Catch-up projections depend on today's date and on which episodes
+you've watched, so they're computed on demand - by the CLI below, or in the
+page from the cumulative series.
+
+Usage:
+  python3 watch_stats.py [csv_path] [--catch-up-by=YYYY-MM-DD] [--hours-per-day=N] [--force]
+"""
+
+import json
+import math
+import os
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from search_index import csv_hash, load_rows
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV_PATH = os.path.join(HERE, 'cr_episodes_series_airdates.csv')
+JSON_FILENAME = 'watch_stats.json'
+STATS_VERSION = 1
+
+GROUPINGS = {
+    'show_type': ('show_type',),
+    'campaign': ('show_type', 'campaign'),
+    'arc': ('show_type', 'campaign', 'arc'),
+}
+CATCH_UP_DAYS = (30, 90, 365)
+UNDATED = '9999-99-99'
+
+
+def parse_runtime_seconds(runtime):
+    """'H:MM:SS' or 'MM:SS' -> seconds; anything else (blank, '0:00:00', junk) -> 0."""
+    parts = (runtime or '').strip().split(':')
+    if len(parts) not in (2, 3) or not all(p.isdigit() for p in parts):
+        return 0
+    seconds = 0
+    for part in parts:
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def _is_watched(value):
+    return (value or '').strip().lower() in ('true', '1', 'yes')
+
+
+def _airdate(row):
+    """Sortable airdate - blank/'Forthcoming' sort last, like the scrapers do."""
+    airdate = (row.get('airdate') or '').strip()
+    return airdate if len(airdate) == 10 and airdate[4] == '-' else UNDATED
+
+
+def _array(values):
+    values = list(values)
+    return np.array(values, dtype=np.int64) if HAS_NUMPY else values
+
+
+def load_arrays(rows):
+    """
+    Column arrays for the rows, sorted by airdate: 'seconds' and 'watched'
+    (0/1) as int arrays, plus episode_id / airdate / grouping columns as lists.
+    """
+    rows = sorted(rows, key=_airdate)
+    data = {
+        'episode_id': [row['episode_id'] for row in rows],
+        'airdate': [_airdate(row) for row in rows],
+        'seconds': _array(parse_runtime_seconds(row.get('runtime')) for row in rows),
+        'watched': _array(int(_is_watched(row.get('watched'))) for row in rows),
+    }
+    for field in ('show_type', 'campaign', 'arc'):
+        data[field] = [row.get(field, '') for row in rows]
+    return data
+
+
+def _sum_by(codes, values, size):
+    """Per-group sums of values, where codes[i] is row i's group number."""
+    if HAS_NUMPY:
+        return np.bincount(codes, weights=values, minlength=size).astype(np.int64).tolist()
+    sums = [0] * size
+    for code, value in zip(codes, values):
+        sums[code] += value
+    return sums
+
+
+def _watched_seconds(data):
+    if HAS_NUMPY:
+        return data['seconds'] * data['watched']
+    return [s * w for s, w in zip(data['seconds'], data['watched'])]
+
+
+def group_totals(data, fields):
+    """
+    [{<fields>, episodes, watched_episodes, total_seconds, watched_seconds,
+    remaining_seconds}, ...] - one entry per distinct combination of fields,
+    in order of first airdate.
+    """
+    index = {}
+    codes = [index.setdefault(key, len(index)) for key in zip(*(data[f] for f in fields))]
+    if HAS_NUMPY:
+        codes = np.array(codes, dtype=np.int64)
+    size = len(index)
+
+    ones = [1] * len(data['episode_id'])
+    episodes = _sum_by(codes, ones, size)
+    watched_episodes = _sum_by(codes, data['watched'], size)
+    total = _sum_by(codes, data['seconds'], size)
+    watched = _sum_by(codes, _watched_seconds(data), size)
+
+    groups = []
+    for key, code in index.items():
+        group = dict(zip(fields, key))
+        group.update({
+            'episodes': episodes[code],
+            'watched_episodes': watched_episodes[code],
+            'total_seconds': total[code],
+            'watched_seconds': watched[code],
+            'remaining_seconds': total[code] - watched[code],
+        })
+        groups.append(group)
+    return groups
+
+
+def cumulative_by_airdate(data):
+    """{'dates': [...], 'seconds': [...], 'episodes': [...]} - running totals as of each airdate."""
+    airdates = data['airdate']
+    dated = bisect_left(airdates, UNDATED)
+    if HAS_NUMPY:
+        seconds = np.cumsum(data['seconds'][:dated]).tolist()
+    else:
+        seconds = list(accumulate(data['seconds'][:dated]))
+
+    # Rows are airdate-sorted, so each date's running total is at its last row
+    dates, cum_seconds, cum_episodes = [], [], []
+    for i in range(dated):
+        if i + 1 < dated and airdates[i + 1] == airdates[i]:
+            continue
+        dates.append(airdates[i])
+        cum_seconds.append(seconds[i])
+        cum_episodes.append(i + 1)
+    return {'dates': dates, 'seconds': cum_seconds, 'episodes': cum_episodes}
+
+
+def remaining_seconds(data, by_date):
+    """Unwatched runtime of everything that has aired (or is scheduled) by by_date."""
+    aired = bisect_right(data['airdate'], by_date)
+    seconds, watched = data['seconds'][:aired], data['watched'][:aired]
+    if HAS_NUMPY:
+        return int((seconds * (1 - watched)).sum())
+    return sum(s for s, w in zip(seconds, watched) if not w)
+
+
+def catch_up(data, target_date, today=None):
+    """What it takes to have watched everything aired by target_date, starting today."""
+    today = today or date.today()
+    target = datetime.strptime(target_date, '%Y-%m-%d').date()
+    days = max((target - today).days, 1)
+    remaining = remaining_seconds(data, target_date)
+    return {
+        'target_date': target_date,
+        'days': days,
+        'remaining_seconds': remaining,
+        'seconds_per_day': math.ceil(remaining / days),
+    }
+
+
+def finish_date(data, hours_per_day, today=None):
+    """When the current backlog (aired as of today) is cleared at hours_per_day - ignores new releases."""
+    today = today or date.today()
+    remaining = remaining_seconds(data, today.isoformat())
+    return today + timedelta(days=math.ceil(remaining / (hours_per_day * 3600)))
+
+
+def build_stats(rows, source_hash=''):
+    data = load_arrays(rows)
+    total = int(sum(data['seconds']))
+    watched = int(sum(_watched_seconds(data)))
+    return {
+        'version': STATS_VERSION,
+        'source_hash': source_hash,
+        'totals': {
+            'episodes': len(data['episode_id']),
+            'with_runtime': int(sum(1 for s in data['seconds'] if s)),
+            'total_seconds': total,
+            'watched_seconds': watched,
+            'remaining_seconds': total - watched,
+        },
+        'groups': {name: group_totals(data, fields) for name, fields in GROUPINGS.items()},
+        'cumulative': cumulative_by_airdate(data),
+        'runtime_seconds': {eid: int(s) for eid, s in zip(data['episode_id'], data['seconds']) if s},
+    }
+
+
+def _built_hash(json_path):
+    try:
+        with open(json_path, encoding='utf-8') as f:
+            return json.load(f).get('source_hash')
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def update_watch_stats(csv_path=DEFAULT_CSV_PATH, json_path=None, force=False):
+    """Rebuild watch_stats.json (next to the CSV) if the CSV changed. Returns True if rebuilt."""
+    json_path = json_path or os.path.join(os.path.dirname(os.path.abspath(csv_path)), JSON_FILENAME)
+    source_hash = csv_hash(csv_path)
+    if not force and _built_hash(json_path) == source_hash:
+        return False
+
+    stats = build_stats(load_rows(csv_path), source_hash)
+    tmp_path = json_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, json_path)
+    return True
+
+
+def format_hours(seconds):
+    return f"{seconds / 3600:,.1f}h"
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    opts = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+    csv_path = args[0] if args else DEFAULT_CSV_PATH
+
+    if update_watch_stats(csv_path, force='--force' in sys.argv):
+        print(f"✓ Wrote {JSON_FILENAME}")
+    data = load_arrays(load_rows(csv_path))
+
+    print(f"\nWatch time by campaign ({'numpy' if HAS_NUMPY else 'pure Python'}):")
+    for group in group_totals(data, GROUPINGS['campaign']):
+        print(f"  {group['campaign'] or group['show_type']}: {group['episodes']} episodes, "
+              f"{format_hours(group['total_seconds'])} total, {format_hours(group['remaining_seconds'])} remaining")
+
+    today = date.today()
+    targets = [opts['catch-up-by']] if 'catch-up-by' in opts else \
+        [(today + timedelta(days=d)).isoformat() for d in CATCH_UP_DAYS]
+    print("\nCatch-up:")
+    for target in targets:
+        plan = catch_up(data, target, today)
+        print(f"  by {plan['target_date']}: {format_hours(plan['remaining_seconds'])} to go, "
+              f"{format_hours(plan['seconds_per_day'])}/day for {plan['days']} days")
+    if 'hours-per-day' in opts:
+        print(f"  at {opts['hours-per-day']}h/day: caught up on {finish_date(data, float(opts['hours-per-day']), today)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,7 +7,6 @@ Uses the Fandom MediaWiki API (action=parse) to render arc pages server-side,
 bypassing Cloudflare entirely. No Playwright required.
 """
 
-import csv
 import json
 import re
 import sys
@@ -17,6 +16,9 @@ import urllib.parse
 from datetime import datetime
 from bs4 import BeautifulSoup
 
+from episode_store import load_episodes, save_episodes
+from update_canon import classify_canon
+
 
 API_BASE = "https://criticalrole.fandom.com/api.php"
 
@@ -252,10 +254,7 @@ def merge_into_main_csv(new_episodes, main_csv='cr_episodes_series_airdates.csv'
         return 0
 
     try:
-        with open(main_csv, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            existing_rows = list(reader)
-            fieldnames = reader.fieldnames
+        existing_rows, fieldnames = load_episodes(main_csv)
     except FileNotFoundError:
         print(f"Error: {main_csv} not found")
         return 0
@@ -275,6 +274,8 @@ def merge_into_main_csv(new_episodes, main_csv='cr_episodes_series_airdates.csv'
 
     added = []
     updated = []
+    changed_rows = []
+    renamed_ids = {}
 
     for ep in new_episodes:
         key = (ep['campaign'], ep['episode_number'])
@@ -296,12 +297,11 @@ def merge_into_main_csv(new_episodes, main_csv='cr_episodes_series_airdates.csv'
                 'notes': '',
                 'has_cooldown': 'False',
                 'cooldown_date': '',
-                'is_canon': 'TRUE',
-                'prerequisite_episode': '',
-                'prerequisite_notes': '',
             }
+            new_row.update(classify_canon(new_row))
             existing_rows.append(new_row)
             existing_episodes[key] = len(existing_rows) - 1
+            changed_rows.append(new_row)
             added.append(ep)
             print(f"  + {ep['campaign']} E{ep['episode_number']}: {ep['title']}")
 
@@ -313,7 +313,10 @@ def merge_into_main_csv(new_episodes, main_csv='cr_episodes_series_airdates.csv'
 
             if is_placeholder(existing_title) and not is_placeholder(new_title):
                 row['title'] = new_title
+                old_id = row['episode_id']
                 row['episode_id'] = f"Main Campaign|{ep['campaign']}|{ep['episode_number']}|{new_title}"
+                renamed_ids[old_id] = row['episode_id']
+                row.update(classify_canon(row))  # new episode_id may have its own canon rule
                 if ep.get('wiki_url') and not row.get('wiki_url'):
                     row['wiki_url'] = ep['wiki_url']
                 if ep.get('arc') and not row.get('arc'):
@@ -322,6 +325,7 @@ def merge_into_main_csv(new_episodes, main_csv='cr_episodes_series_airdates.csv'
                     row['runtime'] = ep['runtime']
                 if 'wiki pending' in row.get('notes', '').lower():
                     row['notes'] = ''
+                changed_rows.append(row)
                 updated.append(ep)
                 print(f"  ~ {ep['campaign']} E{ep['episode_number']}: {existing_title!r} -> {new_title!r}")
 
@@ -346,10 +350,7 @@ def merge_into_main_csv(new_episodes, main_csv='cr_episodes_series_airdates.csv'
 
     existing_rows.sort(key=lambda x: x.get('airdate', '') or '9999-99-99')
 
-    with open(main_csv, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(existing_rows)
+    save_episodes(main_csv, fieldnames, existing_rows, changed_rows=changed_rows, renamed_ids=renamed_ids)
 
     if updated:
         print(f"\n✓ Updated {len(updated)} episode(s) with real titles")